@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent scanner/tracker database access
+
+Runs the same mixed workload against two DatabaseManagers on fresh SQLite
+files:
+  - legacy: plain create_engine (rollback journal) + a new sessionmaker per session
+  - tuned:  connection.create_db_engine (WAL, synchronous=NORMAL, pooled, cached sessionmaker)
+
+Workload (threads, like the asyncio.to_thread calls in the bot):
+  - scanner writers: create_signal()
+  - tracker writer:  update_signal_prices() for a fixed set of active signals
+  - readers:         get_signal_by_id() / get_active_sequences()
+
+Usage:
+    python benchmarks/db_contention_benchmark.py [--seconds 10] [--writers 4] [--readers 4]
+"""
+
+import sys
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.database.connection import session_factory
+from src.database.db_manager import DatabaseManager
+from src.database.models import Base, init_db
+
+
+def legacy_manager(database_url: str, lock_timeout: float) -> DatabaseManager:
+    """DatabaseManager wired the way it was before the connection layer"""
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.engine = create_engine(database_url, connect_args={'timeout': lock_timeout})
+    Base.metadata.create_all(manager.engine)
+    manager.Session = lambda: sessionmaker(bind=manager.engine)()
+    return manager
+
+
+def tuned_manager(database_url: str, lock_timeout: float) -> DatabaseManager:
+    """DatabaseManager on the tuned connection layer"""
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.engine = init_db(database_url, busy_timeout=lock_timeout, pool_size=16)
+    manager.Session = session_factory(manager.engine)
+    return manager
+
+
+def signal_data(rng):
+    entry = rng.uniform(1, 100)
+    return {
+        'symbol': f"C{rng.randint(0, 199)}-USDT", 'side': 'SHORT', 'entry_price': entry,
+        'stop_loss': entry * 1.5, 'take_profit_1': entry * 0.5, 'take_profit_2': entry * 0.4,
+    }
+
+
+def run_workload(db: DatabaseManager, seconds: float, writers: int, readers: int, tracked: int):
+    # The tracker always updates the same seeded signals so batches stay comparable
+    seed_rng = random.Random(0)
+    seeded = [db.create_signal(signal_data(seed_rng)) for _ in range(tracked)]
+    tracked_entries = {signal.id: signal.entry_price for signal in seeded}
+
+    stop_at = time.monotonic() + seconds
+    lock = threading.Lock()
+    stats = {'latencies': {}, 'locked': 0, 'errors': 0}
+
+    def record(kind, started):
+        with lock:
+            stats['latencies'].setdefault(kind, []).append(time.perf_counter() - started)
+
+    def loop(kind, op):
+        rng = random.Random(hash(kind) ^ threading.get_ident())
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                op(rng)
+                record(kind, started)
+            except OperationalError as e:
+                with lock:
+                    if 'locked' in str(e):
+                        stats['locked'] += 1
+                    else:
+                        stats['errors'] += 1
+
+    def scan(rng):
+        db.create_signal(signal_data(rng))
+
+    def track(rng):
+        db.update_signal_prices({
+            signal_id: entry * rng.uniform(0.99, 1.01) for signal_id, entry in tracked_entries.items()
+        })
+
+    tracked_ids = list(tracked_entries)
+
+    def read(rng):
+        if rng.random() < 0.8:
+            db.get_signal_by_id(rng.choice(tracked_ids))
+        else:
+            db.get_active_sequences()
+
+    threads = [threading.Thread(target=loop, args=('scanner write', scan)) for _ in range(writers)]
+    threads.append(threading.Thread(target=loop, args=('tracker batch', track)))
+    threads += [threading.Thread(target=loop, args=('read', read)) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else float('nan')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Concurrent DB access benchmark')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--tracked', type=int, default=200, help='Signals in each tracker batch')
+    parser.add_argument('--lock-timeout', type=float, default=5.0,
+                        help='Seconds SQLite waits on a lock (pysqlite default: 5)')
+    args = parser.parse_args()
+
+    print(f"{args.writers} scanner writers, 1 tracker, {args.readers} readers, {args.seconds:.0f}s each")
+    print()
+    print(f"{'config':<8}{'operation':<16}{'ops/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    print("-" * 59)
+
+    for name, factory in (('legacy', legacy_manager), ('tuned', tuned_manager)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = factory(f"sqlite:///{tmp}/contention.db", args.lock_timeout)
+            stats = run_workload(db, args.seconds, args.writers, args.readers, args.tracked)
+            db.engine.dispose()
+
+        for kind, latencies in sorted(stats['latencies'].items()):
+            print(
+                f"{name:<8}{kind:<16}{len(latencies) / args.seconds:>8.0f}"
+                f"{percentile(latencies, 0.5):>9.2f}{percentile(latencies, 0.99):>9.2f}"
+                f"{percentile(latencies, 1.0):>9.1f}"
+            )
+        print(f"{name:<8}{'locked errors':<16}{stats['locked']:>8}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark hot DatabaseManager queries with and without the model indexes
+
+Builds a throwaway SQLite database with --price-updates rows in
+signal_price_updates (default one million), times each query without
+indexes, creates the indexes (migrations/add_query_indexes.py) and
+times the queries again.
+
+Usage:
+    python benchmarks/db_query_benchmark.py [--price-updates 1000000] [--signals 5000]
+"""
+
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from src.database.models import Base, BotSignal, PositionSequence, SignalPriceUpdate, UserTrade
+
+SYMBOLS = [f"C{i}-USDT" for i in range(200)]
+
+QUERIES = {
+    'active standalone signals': (
+        "SELECT id FROM bot_signals WHERE status = 'ACTIVE' AND sequence_id IS NULL", {}
+    ),
+    'signals of a sequence': (
+        "SELECT id FROM bot_signals WHERE sequence_id = :sequence_id", {'sequence_id': 7}
+    ),
+    'active sequences': (
+        "SELECT id FROM position_sequences WHERE status = 'ACTIVE'", {}
+    ),
+    'price range of one signal': (
+        "SELECT MIN(current_price), MAX(current_price) FROM signal_price_updates "
+        "WHERE signal_id = :signal_id", {'signal_id': 1234}
+    ),
+    'latest price of one signal': (
+        "SELECT current_price FROM signal_price_updates WHERE signal_id = :signal_id "
+        "ORDER BY timestamp DESC LIMIT 1", {'signal_id': 1234}
+    ),
+    'closed signals last 30 days': (
+        "SELECT id FROM bot_signals WHERE signal_time >= :since AND status = 'CLOSED'",
+        {'since': datetime(2024, 12, 1)}
+    ),
+    'user trades of a symbol in range': (
+        "SELECT id FROM user_trades WHERE symbol = :symbol AND entry_time >= :since "
+        "ORDER BY entry_time DESC", {'symbol': 'C42-USDT', 'since': datetime(2024, 11, 1)}
+    ),
+}
+
+
+def populate(engine, n_signals: int, n_updates: int, n_trades: int, n_sequences: int):
+    """Insert synthetic rows with Core executemany (fast)"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(PositionSequence.__table__.insert(), [
+            {
+                'symbol': rng.choice(SYMBOLS), 'direction': 'SHORT',
+                'status': 'ACTIVE' if i % 50 == 0 else 'CLOSED_TP1',
+                'first_entry_price': 1.0, 'weighted_avg_entry': 1.0, 'total_margin': 10.0,
+                'opened_at': start,
+            }
+            for i in range(n_sequences)
+        ])
+
+        conn.execute(BotSignal.__table__.insert(), [
+            {
+                'symbol': rng.choice(SYMBOLS), 'direction': 'SHORT', 'entry_price': 1.0,
+                'stop_loss': 1.05, 'take_profit_1': 0.92, 'take_profit_2': 0.87,
+                'signal_time': start + timedelta(minutes=i * 100),
+                'status': 'ACTIVE' if i % 100 == 0 else 'CLOSED',
+                'signal_type': 'STANDALONE' if i % 3 else 'INITIAL',
+                'sequence_id': None if i % 3 else rng.randint(1, n_sequences),
+            }
+            for i in range(n_signals)
+        ])
+
+        conn.execute(UserTrade.__table__.insert(), [
+            {
+                'order_id': str(i), 'symbol': rng.choice(SYMBOLS), 'position_side': 'SHORT',
+                'entry_price': 1.0, 'quantity': 1.0, 'margin': 10.0, 'leverage': 20.0,
+                'entry_time': start + timedelta(minutes=i * 30),
+            }
+            for i in range(n_trades)
+        ])
+
+        batch = 100_000
+        for offset in range(0, n_updates, batch):
+            conn.execute(SignalPriceUpdate.__table__.insert(), [
+                {
+                    'signal_id': (offset + i) % n_signals + 1,
+                    'current_price': 1.0 + rng.random() * 0.1,
+                    'timestamp': start + timedelta(seconds=offset + i),
+                }
+                for i in range(min(batch, n_updates - offset))
+            ])
+
+
+def drop_indexes(engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(engine, checkfirst=True)
+
+
+def create_indexes(engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def time_queries(engine, repeats: int):
+    """Median wall time (ms) per query"""
+    timings = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = sorted(samples)[len(samples) // 2]
+    return timings
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark DB queries with/without indexes')
+    parser.add_argument('--price-updates', type=int, default=1_000_000)
+    parser.add_argument('--signals', type=int, default=5000)
+    parser.add_argument('--trades', type=int, default=20000)
+    parser.add_argument('--sequences', type=int, default=500)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/benchmark.db")
+        Base.metadata.create_all(engine)
+        drop_indexes(engine)
+
+        print(f"Populating {args.price_updates:,} price updates, {args.signals:,} signals...")
+        started = time.time()
+        populate(engine, args.signals, args.price_updates, args.trades, args.sequences)
+        print(f"  done in {time.time() - started:.1f}s")
+
+        before = time_queries(engine, args.repeats)
+
+        started = time.time()
+        create_indexes(engine)
+        print(f"Indexes created in {time.time() - started:.1f}s")
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        after = time_queries(engine, args.repeats)
+        engine.dispose()
+
+    print()
+    print(f"{'query':<36}{'no index (ms)':>15}{'indexed (ms)':>15}{'speedup':>10}")
+    print("-" * 76)
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] > 0 else float('inf')
+        print(f"{name:<36}{before[name]:>15.3f}{after[name]:>15.3f}{speedup:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
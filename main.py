@@ -6,19 +6,29 @@ Generate SHORT signals based on historical analysis (81.1% win rate)
 
 import asyncio
 import logging
-import pandas as pd
 import os
 from pathlib import Path
 
 from config.settings import Settings
 from src.api.bingx_client import BingXClient
+from src.api.async_bingx_client import AsyncBingXClient
 from src.api.symbol_selector import SymbolSelector
+from src.api.rate_limiter import RequestBudget
+from src.api.market_stream import MarketDataStream
+from src.api.kline_cache import KlineCache
 from src.strategies.data_driven_short_strategy import DataDrivenShortStrategy
 from src.strategies.martingale_manager import MartingaleManager
 from src.bot.telegram_bot import TradingSignalBot
+from src.bot.message_dispatcher import LOW
+from src.bot.subscribers import SubscriberRegistry
 from src.bot.signal_manager import SignalManager
+from src.bot.market_scanner import MarketScanner
+from src.bot.candle_scheduler import CandleScheduler, INTRABAR
 from src.database.db_manager import DatabaseManager
+from src.database.async_db_manager import AsyncDatabaseManager
 from src.database.signal_tracker import SignalTracker
+from src.database.retention import PriceRetention
+from src.database.kline_store import KlineStore
 
 # Configure logging
 Path('logs').mkdir(exist_ok=True)
@@ -40,13 +50,20 @@ class SignalABot:
     def __init__(self):
         self.settings = Settings()
         self.bingx_client = None
+        self.async_bingx_client = None
+        self.rate_budget = None
         self.telegram_bot = None
         self.db = None
+        self.async_db = None
         self.symbol_selector = None
         self.strategy = None
+        self.scanner = None
+        self.scheduler = None
         self.martingale_manager = None
         self.signal_manager = SignalManager(cooldown_minutes=30)
         self.signal_tracker = None
+        self.price_retention = None
+        self.market_stream = None
         self.is_running = False
 
     async def initialize(self):
@@ -59,28 +76,62 @@ class SignalABot:
         # Validate settings
         self.settings.validate()
 
+        # One request budget for every client (scanner, tracker, symbol selector)
+        public_rate = float(os.getenv('BINGX_PUBLIC_RATE', os.getenv('SCAN_RATE_LIMIT', '10')))
+        signed_rate = float(os.getenv('BINGX_SIGNED_RATE', '5'))
+        self.rate_budget = RequestBudget(public_rate=public_rate, signed_rate=signed_rate)
+
         # Initialize BingX client
         logger.info("📡 Connecting to BingX API...")
         self.bingx_client = BingXClient(
             api_key=self.settings.BINGX_API_KEY,
             secret_key=self.settings.BINGX_SECRET_KEY,
-            base_url=self.settings.BINGX_BASE_URL
+            base_url=self.settings.BINGX_BASE_URL,
+            rate_budget=self.rate_budget
         )
 
         if not self.bingx_client.test_connection():
             raise Exception("Failed to connect to BingX API")
         logger.info("✅ BingX API connected")
 
+        # Async client for the scanner and tracker (pooled, non-blocking)
+        self.async_bingx_client = AsyncBingXClient(
+            api_key=self.settings.BINGX_API_KEY,
+            secret_key=self.settings.BINGX_SECRET_KEY,
+            base_url=self.settings.BINGX_BASE_URL,
+            rate_budget=self.rate_budget
+        )
+
         # Initialize Database
         logger.info("🗄️  Initializing database...")
         self.db = DatabaseManager(self.settings.DATABASE_URL)
-        logger.info("✅ Database initialized")
+
+        # Scanner/tracker writes go through SQLAlchemy asyncio so commits don't block the loop
+        if os.getenv('DATABASE_ASYNC', 'true').lower() == 'true':
+            try:
+                self.async_db = AsyncDatabaseManager(self.settings.DATABASE_URL)
+                await self.async_db.init()
+            except ImportError as e:
+                logger.warning(f"⚠️  Async DB driver unavailable ({e}), using sync DB in worker threads")
+                self.async_db = None
+        logger.info(f"✅ Database initialized ({'async' if self.async_db else 'sync'})")
+
+        # Chats/channels that receive broadcast signals besides TELEGRAM_CHAT_ID
+        subscribers = SubscriberRegistry(self.db)
+        subscribers.load()
 
         # Initialize Telegram bot
         logger.info("📱 Starting Telegram bot...")
         self.telegram_bot = TradingSignalBot(
             bot_token=self.settings.TELEGRAM_BOT_TOKEN,
-            chat_id=self.settings.TELEGRAM_CHAT_ID
+            chat_id=self.settings.TELEGRAM_CHAT_ID,
+            global_rate=float(os.getenv('TELEGRAM_GLOBAL_RATE', '25')),
+            chat_rate=float(os.getenv('TELEGRAM_CHAT_RATE', '1')),
+            max_queue=int(os.getenv('TELEGRAM_QUEUE_SIZE', '1000')),
+            send_concurrency=int(os.getenv('TELEGRAM_SEND_CONCURRENCY', '8')),
+            subscribers=subscribers,
+            # Chats that may approve /subscribe (default: TELEGRAM_CHAT_ID)
+            admin_chat_ids=[c.strip() for c in os.getenv('TELEGRAM_ADMIN_CHAT_IDS', '').split(',') if c.strip()]
         )
         await self.telegram_bot.initialize()
         await self.telegram_bot.start()
@@ -102,9 +153,41 @@ class SignalABot:
         # Initialize Data-Driven SHORT Strategy
         logger.info("📊 Loading Data-Driven SHORT Strategy...")
         enable_martingale = os.getenv('ENABLE_MARTINGALE', 'true').lower() == 'true'
+        # No indicator cache: the incremental engine costs O(1) per closed candle
         self.strategy = DataDrivenShortStrategy(enable_martingale=enable_martingale)
         logger.info(f"✅ Strategy loaded (based on 95 trades, 81.1% win rate, martingale: {enable_martingale})")
 
+        # Initialize concurrent market scanner
+        max_concurrency = int(os.getenv('SCAN_MAX_CONCURRENCY', '10'))
+        # Vectorized evaluation pays off for large volatility-mode universes
+        default_batch = 'true' if symbol_mode == 'volatility' else 'false'
+        batch_mode = os.getenv('SCAN_BATCH_MODE', default_batch).lower() == 'true'
+        # Closed candles persist on disk so restarts don't re-download history
+        store_dir = os.getenv('KLINE_STORE_DIR', 'data/klines')
+        kline_store = KlineStore(store_dir) if store_dir else None
+        self.scanner = MarketScanner(
+            bingx_client=self.async_bingx_client,
+            strategy=self.strategy,
+            interval='4h',
+            limit=200,
+            max_concurrency=max_concurrency,
+            kline_cache=KlineCache(self.async_bingx_client, max_candles=200, store=kline_store),
+            batch_mode=batch_mode
+        )
+        logger.info(
+            f"✅ Market scanner ready (concurrency: {max_concurrency}, "
+            f"rate: {public_rate} public / {signed_rate} signed weight/s, batch: {batch_mode})"
+        )
+
+        # Scan on candle closes (plus optional intrabar moves) instead of a fixed timer
+        intrabar_move_pct = float(os.getenv('SCAN_INTRABAR_MOVE_PCT', '0'))
+        self.scheduler = CandleScheduler(
+            interval=self.scanner.interval,
+            close_delay=float(os.getenv('SCAN_CLOSE_DELAY', '5')),
+            intrabar_move_pct=intrabar_move_pct,
+            intrabar_cooldown=float(os.getenv('SCAN_INTRABAR_COOLDOWN', '60'))
+        )
+
         # Initialize Martingale Manager
         if enable_martingale:
             logger.info("🎲 Initializing Martingale Manager...")
@@ -121,67 +204,78 @@ class SignalABot:
             )
             logger.info(f"✅ Martingale Manager initialized (max steps: {max_steps}, trigger: {trigger_pct}%)")
 
+        # Initialize WebSocket price feed (TP/SL checked on every tick)
+        if os.getenv('ENABLE_MARKET_STREAM', 'true').lower() == 'true':
+            logger.info("📡 Starting market data stream...")
+            self.market_stream = MarketDataStream(bingx_client=self.async_bingx_client)
+            await self.market_stream.start()
+            self.scheduler.attach(self.market_stream)
+            logger.info("✅ Market data stream started")
+
         # Initialize Signal Tracker
         logger.info("👁️  Starting signal tracker...")
         self.signal_tracker = SignalTracker(
-            db_manager=self.db,
-            bingx_client=self.bingx_client,
+            db_manager=self.async_db or self.db,
+            bingx_client=self.async_bingx_client,
             telegram_bot=self.telegram_bot,
-            martingale_manager=self.martingale_manager
+            martingale_manager=self.martingale_manager,
+            market_stream=self.market_stream,
+            snapshot_mode=os.getenv('TRACKER_SNAPSHOT_MODE', 'true').lower() == 'true',
+            reconcile_interval=float(os.getenv('TRACKER_RECONCILE_SECONDS', '600'))
         )
         # Start tracker in background
         asyncio.create_task(self.signal_tracker.start_tracking())
         logger.info("✅ Signal tracker started (monitoring every 60s)")
 
+        # Roll old per-minute price rows into hourly summaries (0 disables)
+        retention_days = float(os.getenv('PRICE_RETENTION_DAYS', '7'))
+        if retention_days > 0:
+            self.price_retention = PriceRetention(
+                self.db,
+                raw_days=retention_days,
+                bucket=os.getenv('PRICE_RETENTION_BUCKET', '1h')
+            )
+            asyncio.create_task(self.price_retention.start())
+
         logger.info("")
         logger.info("=" * 80)
         logger.info("  ✅ ALL COMPONENTS INITIALIZED SUCCESSFULLY")
         logger.info("=" * 80)
         logger.info("")
 
+    async def _db(self, method: str, *args):
+        """Run a DB operation on the async manager, or the sync one in a worker thread"""
+        if self.async_db:
+            return await getattr(self.async_db, method)(*args)
+        return await asyncio.to_thread(getattr(self.db, method), *args)
+
     async def monitor_markets(self):
         """Monitor markets và generate SHORT signals"""
         logger.info("🔍 Starting market monitoring...")
         logger.info("")
 
+        symbols = []
         while self.is_running:
             try:
-                # Get symbols to scan
-                symbols = self.symbol_selector.get_symbols()
-                logger.info(f"📊 Scanning {len(symbols)} symbols for SHORT opportunities...")
-
-                for symbol in symbols:
+                # Sleep until a candle closes (or a watched symbol moves intrabar)
+                trigger, moved = await self.scheduler.wait()
+
+                if trigger == INTRABAR:
+                    scan_symbols = [s for s in symbols if s in moved]
+                    logger.info(f"⚡ Intrabar scan of {len(scan_symbols)} moved symbols...")
+                else:
+                    # Get symbols to scan
+                    symbols = await asyncio.to_thread(self.symbol_selector.get_symbols)
+                    self.scheduler.watch(symbols)
+                    scan_symbols = symbols
+                    logger.info(f"📊 Scanning {len(symbols)} symbols for SHORT opportunities ({trigger})...")
+
+                # Fetch and evaluate all symbols concurrently
+                signals = await self.scanner.scan(scan_symbols)
+
+                for signal in signals:
+                    symbol = signal['symbol']
                     try:
-                        # Get 4h klines (200 candles)
-                        klines = self.bingx_client.get_klines(
-                            symbol=symbol,
-                            interval='4h',
-                            limit=200
-                        )
-
-                        if not klines:
-                            logger.debug(f"{symbol}: No kline data")
-                            continue
-
-                        # Convert to DataFrame
-                        df = pd.DataFrame(klines)
-                        df['close'] = df['close'].astype(float)
-                        df['high'] = df['high'].astype(float)
-                        df['low'] = df['low'].astype(float)
-                        df['open'] = df['open'].astype(float)
-
-                        # Prepare market data
-                        market_data = {
-                            'symbol': symbol,
-                            'klines': df
-                        }
-
-                        # Generate signal
-                        signal = self.strategy.generate_signal(market_data)
-
-                        if not signal:
-                            continue
-
                         # Check cooldown
                         if not self.signal_manager.should_send_signal(symbol, signal['side']):
                             logger.info(f"⏸️  {symbol} SHORT - cooldown active, skipping")
@@ -191,13 +285,13 @@ class SignalABot:
                         sequence_id = None
                         if signal.get('signal_type') == 'INITIAL':
                             logger.info(f"🎲 Creating position sequence for {symbol}...")
-                            sequence = self.db.create_sequence(signal)
+                            sequence = await self._db('create_sequence', signal)
                             sequence_id = sequence.id
                             logger.info(f"✅ Sequence created (ID: {sequence_id}, max steps: {sequence.max_steps})")
 
                         # Save signal to database
                         logger.info(f"💾 Saving {symbol} SHORT signal to database...")
-                        db_signal = self.db.create_signal(signal, sequence_id=sequence_id)
+                        db_signal = await self._db('create_signal', signal, sequence_id)
                         signal['id'] = db_signal.id
 
                         # Send to Telegram
@@ -218,17 +312,16 @@ class SignalABot:
                             logger.info(f"   📊 Sequence ID: {sequence_id} (will monitor for martingale triggers)")
                         logger.info("")
 
-                        # Small delay between symbols to avoid rate limits
-                        await asyncio.sleep(2)
-
                     except Exception as e:
                         logger.error(f"Error processing {symbol}: {e}")
                         continue
 
-                # Wait 5 minutes before next scan
-                logger.info("⏰ Waiting 5 minutes before next scan...")
+                logger.info(
+                    f"⏰ Next scan at {self.scheduler.interval} candle close "
+                    f"(in {self.scheduler.seconds_until_close() / 60:.0f} min, "
+                    f"skipped so far: {self.scheduler.skipped})"
+                )
                 logger.info("")
-                await asyncio.sleep(300)
 
             except Exception as e:
                 logger.error(f"Error in market monitoring: {e}", exc_info=True)
@@ -250,11 +343,11 @@ class SignalABot:
 🎯 <b>Leverage:</b> 20-25x
 💰 <b>Margin:</b> $15-20 per signal
 
-Bot is now scanning markets for HIGH-PROBABILITY SHORT signals every 5 minutes.
+Bot is now scanning markets for HIGH-PROBABILITY SHORT signals at every 4h candle close.
 
 <i>Martingale sequences track weighted average entry for optimal TP calculation</i>
 """
-            await self.telegram_bot.send_message(startup_msg)
+            await self.telegram_bot.send_message(startup_msg, priority=LOW)
 
             # Start monitoring
             self.is_running = True
@@ -272,8 +365,21 @@ Bot is now scanning markets for HIGH-PROBABILITY SHORT signals every 5 minutes.
         if self.signal_tracker:
             self.signal_tracker.stop_tracking()
 
+        if self.price_retention:
+            self.price_retention.stop()
+
+        if self.market_stream:
+            await self.market_stream.stop()
+
         if self.telegram_bot:
             await self.telegram_bot.stop()
+            logger.info(f"Telegram dispatcher: {self.telegram_bot.dispatcher.stats()}")
+
+        if self.async_bingx_client:
+            await self.async_bingx_client.close()
+
+        if self.async_db:
+            await self.async_db.close()
 
         logger.info("Bot stopped")
 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Migration script to add indexes on hot query columns
+- bot_signals (status, sequence_id), (sequence_id), (signal_time)
+- position_sequences (status)
+- signal_results (signal_id)
+- signal_price_updates (signal_id, timestamp)
+- user_trades (symbol, entry_time)
+
+Indexes are declared in models.py (__table_args__); create_all() only adds
+them to new tables, so existing databases need this script.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, inspect
+from src.database.models import Base
+from config.settings import Settings
+
+
+def model_indexes():
+    """(table name, Index) for every index declared on the models"""
+    return [
+        (table.name, index)
+        for table in Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda i: i.name)
+    ]
+
+
+def existing_index_names(engine, table_name):
+    """Index names already present on a table"""
+    inspector = inspect(engine)
+    if table_name not in inspector.get_table_names():
+        return None
+    return {index['name'] for index in inspector.get_indexes(table_name)}
+
+
+def migrate(database_url=None):
+    """Run the migration"""
+    database_url = database_url or Settings().DATABASE_URL
+
+    print(f"🔧 Starting index migration for: {database_url}")
+    print("=" * 60)
+
+    engine = create_engine(database_url)
+    created = 0
+
+    for table_name, index in model_indexes():
+        existing = existing_index_names(engine, table_name)
+        columns = ', '.join(col.name for col in index.columns)
+
+        if existing is None:
+            print(f"   ℹ️  Table {table_name} does not exist - skipping {index.name}")
+        elif index.name in existing:
+            print(f"   ℹ️  {index.name} already exists - skipping")
+        else:
+            started = time.time()
+            index.create(engine)
+            created += 1
+            print(f"   ✅ Created {index.name} on {table_name} ({columns}) in {time.time() - started:.1f}s")
+
+    print()
+    print("=" * 60)
+    print(f"🎉 Migration completed: {created} index(es) created")
+
+
+def rollback(database_url=None):
+    """Drop the indexes added by this migration"""
+    database_url = database_url or Settings().DATABASE_URL
+
+    print(f"⚠️  Rolling back index migration for: {database_url}")
+    print("=" * 60)
+
+    engine = create_engine(database_url)
+    for table_name, index in model_indexes():
+        existing = existing_index_names(engine, table_name)
+        if existing and index.name in existing:
+            index.drop(engine)
+            print(f"   Dropped {index.name}")
+
+    print()
+    print("✅ Rollback completed")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Add indexes on hot query columns')
+    parser.add_argument('--rollback', action='store_true', help='Drop the indexes again')
+    parser.add_argument('--database-url', help='Override DATABASE_URL from settings')
+    args = parser.parse_args()
+
+    if args.rollback:
+        confirm = input("Are you sure you want to rollback? (yes/no): ")
+        if confirm.lower() == 'yes':
+            rollback(args.database_url)
+        else:
+            print("Rollback cancelled")
+    else:
+        migrate(args.database_url)
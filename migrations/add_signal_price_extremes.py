@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Migration script to add running price extremes to bot_signals
+- Adds max_price_reached / min_price_reached columns
+- Backfills them from signal_price_updates in one aggregate UPDATE
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, inspect, text
+from src.database.models import Base
+from config.settings import Settings
+
+COLUMNS = ['max_price_reached', 'min_price_reached']
+
+
+def check_column_exists(engine, table_name, column_name):
+    """Check if a column exists in a table"""
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def migrate(database_url=None):
+    """Run the migration"""
+    database_url = database_url or Settings().DATABASE_URL
+
+    print(f"🔧 Starting migration for: {database_url}")
+    print("=" * 60)
+
+    engine = create_engine(database_url)
+
+    if 'bot_signals' not in inspect(engine).get_table_names():
+        print("📊 Fresh database detected - creating all tables...")
+        Base.metadata.create_all(engine)
+        print("✅ All tables created successfully!")
+        return
+
+    print("1️⃣  Updating bot_signals table...")
+    with engine.connect() as conn:
+        for col_name in COLUMNS:
+            if not check_column_exists(engine, 'bot_signals', col_name):
+                conn.execute(text(f"ALTER TABLE bot_signals ADD COLUMN {col_name} FLOAT"))
+                conn.commit()
+                print(f"   ✅ Added column: {col_name}")
+            else:
+                print(f"   ℹ️  Column {col_name} already exists - skipping")
+
+    print()
+    print("2️⃣  Backfilling from signal_price_updates...")
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            UPDATE bot_signals
+            SET max_price_reached = (
+                    SELECT MAX(current_price) FROM signal_price_updates
+                    WHERE signal_price_updates.signal_id = bot_signals.id
+                ),
+                min_price_reached = (
+                    SELECT MIN(current_price) FROM signal_price_updates
+                    WHERE signal_price_updates.signal_id = bot_signals.id
+                )
+            WHERE max_price_reached IS NULL OR min_price_reached IS NULL
+        """))
+        conn.commit()
+        print(f"   ✅ Backfilled {result.rowcount} signals")
+
+    print()
+    print("=" * 60)
+    print("🎉 Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Add running price extremes to bot_signals')
+    parser.add_argument('--database-url', help='Override DATABASE_URL from settings')
+    args = parser.parse_args()
+
+    migrate(args.database_url)
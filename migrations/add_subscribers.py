@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the subscribers table
+- Chats/channels that receive broadcast signals (/subscribe)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, inspect
+from src.database.models import Base, Subscriber
+from config.settings import Settings
+
+
+def migrate(database_url=None):
+    """Run the migration"""
+    database_url = database_url or Settings().DATABASE_URL
+
+    print(f"🔧 Starting migration for: {database_url}")
+    print("=" * 60)
+
+    engine = create_engine(database_url)
+    tables = inspect(engine).get_table_names()
+
+    if 'bot_signals' not in tables:
+        print("📊 Fresh database detected - creating all tables...")
+        Base.metadata.create_all(engine)
+        print("✅ All tables created successfully!")
+        return
+
+    print("1️⃣  Creating subscribers table...")
+    if 'subscribers' in tables:
+        print("   ℹ️  Table subscribers already exists - skipping")
+    else:
+        Subscriber.__table__.create(engine, checkfirst=True)
+        print("   ✅ Created table: subscribers")
+
+    print()
+    print("=" * 60)
+    print("🎉 Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Add the subscribers table')
+    parser.add_argument('--database-url', help='Override DATABASE_URL from settings')
+    args = parser.parse_args()
+
+    migrate(args.database_url)
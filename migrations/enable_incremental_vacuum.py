@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Migration script to switch an existing SQLite database to incremental auto_vacuum
+- Sets auto_vacuum = INCREMENTAL and runs the one-off full VACUUM
+- Stop the bot first: VACUUM holds an exclusive lock for its whole run
+- Databases created by the bot already use incremental auto_vacuum
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from config.settings import Settings
+
+INCREMENTAL = 2
+
+
+def migrate(database_url=None):
+    """Run the migration"""
+    database_url = database_url or Settings().DATABASE_URL
+
+    print(f"🔧 Starting migration for: {database_url}")
+    print("=" * 60)
+
+    engine = create_engine(database_url)
+    if engine.dialect.name != 'sqlite':
+        print("ℹ️  Not a SQLite database - nothing to do")
+        return
+
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if mode == INCREMENTAL:
+            print("ℹ️  auto_vacuum is already INCREMENTAL - skipping")
+            return
+
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        size_before = conn.execute(text("PRAGMA page_count")).scalar() * page_size
+
+        print("1️⃣  Rebuilding database with auto_vacuum = INCREMENTAL (full VACUUM)...")
+        conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+
+        size_after = conn.execute(text("PRAGMA page_count")).scalar() * page_size
+        print(f"   ✅ auto_vacuum = {conn.execute(text('PRAGMA auto_vacuum')).scalar()}")
+        print(f"   ✅ {size_before / 1024 / 1024:.1f} MB -> {size_after / 1024 / 1024:.1f} MB")
+
+    print()
+    print("=" * 60)
+    print("🎉 Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Switch SQLite to incremental auto_vacuum (run while the bot is stopped)')
+    parser.add_argument('--database-url', help='Override DATABASE_URL from settings')
+    args = parser.parse_args()
+
+    migrate(args.database_url)
@@ -0,0 +1,268 @@
+"""
+Async BingX Client - Pooled aiohttp sessions with retries and a shared rate budget
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from .bingx_client import generate_signature
+from .rate_limiter import RequestBudget, kline_weight, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying (rate limit + transient server errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncBingXClient:
+    """BingX API Client (asyncio) - Read-only operations"""
+
+    def __init__(self, api_key: str, secret_key: str, base_url: str = "https://open-api.bingx.com",
+                 timeout: float = 10.0, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, pool_size: int = 50,
+                 rate_budget: Optional[RequestBudget] = None):
+        """
+        Initialize async client
+
+        Args:
+            api_key: BingX API key
+            secret_key: BingX secret key
+            base_url: API base URL
+            timeout: Per-request timeout in seconds
+            max_retries: Retries for network errors, 429 and 5xx responses
+            backoff_base: First backoff step in seconds
+            backoff_max: Upper bound for a single backoff sleep
+            pool_size: Max pooled keep-alive connections
+            rate_budget: Request budget shared with other clients (None: unthrottled)
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.rate_budget = rate_budget
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session on first use (must run inside the event loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'X-BX-APIKEY': self.api_key,
+                    'Content-Type': 'application/json'
+                }
+            )
+        return self._session
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    async def _request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                       signed: bool = True, timeout: Optional[float] = None,
+                       weight: float = 1.0) -> Dict:
+        """Make API request with retries"""
+        url = f"{self.base_url}{endpoint}"
+        session = await self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        bucket = self.rate_budget.bucket(signed) if self.rate_budget else None
+
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                await bucket.acquire(weight)
+
+            request_params = dict(params or {})
+
+            if signed:
+                # Re-sign every attempt so the timestamp stays fresh
+                request_params['timestamp'] = int(time.time() * 1000)
+                request_params['signature'] = generate_signature(self.secret_key, request_params)
+
+            request_params = {k: str(v) for k, v in request_params.items()}
+
+            try:
+                if method == 'GET':
+                    response_ctx = session.get(url, params=request_params, timeout=request_timeout)
+                elif method == 'POST':
+                    response_ctx = session.post(url, json=request_params, timeout=request_timeout)
+                else:
+                    raise ValueError(f"Unsupported method: {method}")
+
+                async with response_ctx as response:
+                    if response.status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                        delay = self._backoff_delay(attempt)
+                        if response.status == 429:
+                            delay = retry_after_seconds(response.headers.get('Retry-After'), delay)
+                        logger.warning(
+                            f"{endpoint} returned {response.status}, "
+                            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                        )
+                        if bucket and response.status == 429:
+                            # Pause every caller sharing the budget, not just this one
+                            bucket.penalize(delay)
+                        else:
+                            await asyncio.sleep(delay)
+                        continue
+
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+
+            except aiohttp.ClientResponseError as e:
+                # Retryable statuses were handled above; bad signature / params won't succeed on retry
+                logger.error(f"Request failed: {e}")
+                raise
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"Request failed: {e}")
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    f"{endpoint} failed ({e.__class__.__name__}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            if data.get('code') != 0:
+                logger.error(f"API error: {data.get('msg')}")
+                raise Exception(f"BingX API error: {data.get('msg')}")
+
+            return data
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_trade_history(self, symbol: str, start_time: Optional[int] = None,
+                                end_time: Optional[int] = None, limit: int = 500) -> List[Dict]:
+        """
+        Get historical orders
+
+        Args:
+            symbol: Trading pair (e.g., 'BTC-USDT')
+            start_time: Start timestamp in milliseconds
+            end_time: End timestamp in milliseconds
+            limit: Number of records (max 500)
+
+        Returns:
+            List of order records
+        """
+        params = {
+            'symbol': symbol,
+            'limit': limit
+        }
+
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        response = await self._request('GET', '/openApi/swap/v2/trade/allOrders', params)
+        return response.get('data', {}).get('orders', [])
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 500,
+                         start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[Dict]:
+        """
+        Get candlestick data
+
+        Args:
+            symbol: Trading pair (e.g., 'BTC-USDT')
+            interval: Timeframe (1m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 12h, 1d, 1w)
+            limit: Number of candles (max 1440)
+            start_time: Start timestamp in milliseconds
+            end_time: End timestamp in milliseconds
+
+        Returns:
+            List of OHLCV data
+        """
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        response = await self._request('GET', '/openApi/swap/v3/quote/klines', params, signed=False,
+                                       weight=kline_weight(limit))
+        return response.get('data', [])
+
+    async def get_ticker_price(self, symbol: Optional[str] = None) -> Dict:
+        """Get current ticker price (all symbols if symbol is None)"""
+        params = {}
+        if symbol:
+            params['symbol'] = symbol
+
+        response = await self._request('GET', '/openApi/swap/v2/quote/price', params, signed=False)
+        return response.get('data', {})
+
+    async def get_24hr_tickers(self) -> List[Dict]:
+        """Get 24hr ticker price change statistics for all symbols"""
+        try:
+            response = await self._request('GET', '/openApi/swap/v2/quote/ticker',
+                                           params={}, signed=False)
+            return response.get('data', [])
+        except Exception as e:
+            logger.error(f"Failed to get 24hr tickers: {e}")
+            return []
+
+    async def get_all_positions(self) -> List[Dict]:
+        """Get all current positions"""
+        response = await self._request('GET', '/openApi/swap/v2/user/positions')
+        return response.get('data', [])
+
+    async def get_income_history(self, symbol: Optional[str] = None, income_type: Optional[str] = None,
+                                 start_time: Optional[int] = None, end_time: Optional[int] = None,
+                                 limit: int = 100) -> List[Dict]:
+        """
+        Get income history (PnL records)
+
+        Args:
+            symbol: Trading pair
+            income_type: Type of income (REALIZED_PNL, FUNDING_FEE, etc.)
+            start_time: Start timestamp
+            end_time: End timestamp
+            limit: Number of records
+
+        Returns:
+            List of income records
+        """
+        params = {'limit': limit}
+
+        if symbol:
+            params['symbol'] = symbol
+        if income_type:
+            params['incomeType'] = income_type
+        if start_time:
+            params['startTime'] = start_time
+        if end_time:
+            params['endTime'] = end_time
+
+        response = await self._request('GET', '/openApi/swap/v2/user/income', params)
+        return response.get('data', [])
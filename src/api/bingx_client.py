@@ -6,15 +6,48 @@ import logging
 from typing import Dict, List, Optional
 from urllib.parse import urlencode
 
+from .rate_limiter import RequestBudget, kline_weight, retry_after_seconds
+
 logger = logging.getLogger(__name__)
 
+
+def generate_signature(secret_key: str, params: Dict) -> str:
+    """Generate HMAC SHA256 signature for BingX API"""
+    # Sort parameters and create query string
+    query_string = '&'.join([f"{k}={params[k]}" for k in sorted(params.keys())])
+
+    # Generate signature
+    signature = hmac.new(
+        secret_key.encode('utf-8'),
+        query_string.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    return signature
+
+
 class BingXClient:
     """BingX API Client - Read-only operations"""
 
-    def __init__(self, api_key: str, secret_key: str, base_url: str = "https://open-api.bingx.com"):
+    def __init__(self, api_key: str, secret_key: str, base_url: str = "https://open-api.bingx.com",
+                 timeout: float = 10.0, rate_budget: Optional[RequestBudget] = None,
+                 max_retries: int = 3):
+        """
+        Initialize client
+
+        Args:
+            api_key: BingX API key
+            secret_key: BingX secret key
+            base_url: API base URL
+            timeout: Per-request timeout in seconds
+            rate_budget: Request budget shared with other clients (None: unthrottled)
+            max_retries: Retries after a 429 response
+        """
         self.api_key = api_key
         self.secret_key = secret_key
         self.base_url = base_url
+        self.timeout = timeout
+        self.rate_budget = rate_budget
+        self.max_retries = max_retries
         self.session = requests.Session()
         self.session.headers.update({
             'X-BX-APIKEY': self.api_key,
@@ -23,50 +56,59 @@ class BingXClient:
 
     def _generate_signature(self, params: Dict) -> str:
         """Generate HMAC SHA256 signature for BingX API"""
-        # Sort parameters and create query string
-        query_string = '&'.join([f"{k}={params[k]}" for k in sorted(params.keys())])
-
-        # Generate signature
-        signature = hmac.new(
-            self.secret_key.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
-
-    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, signed: bool = True) -> Dict:
-        """Make API request"""
-        url = f"{self.base_url}{endpoint}"
-
-        if params is None:
-            params = {}
-
-        if signed:
-            params['timestamp'] = int(time.time() * 1000)
-            # Generate signature BEFORE adding it to params
-            signature = self._generate_signature(params)
-            params['signature'] = signature
-
-        try:
-            if method == 'GET':
-                response = self.session.get(url, params=params)
-            elif method == 'POST':
-                response = self.session.post(url, json=params)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
+        return generate_signature(self.secret_key, params)
 
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get('code') != 0:
-                logger.error(f"API error: {data.get('msg')}")
-                raise Exception(f"BingX API error: {data.get('msg')}")
-
-            return data
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
-            raise
+    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, signed: bool = True,
+                 weight: float = 1.0) -> Dict:
+        """Make API request (throttled by the shared budget, retried on 429)"""
+        url = f"{self.base_url}{endpoint}"
+        bucket = self.rate_budget.bucket(signed) if self.rate_budget else None
+
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                bucket.acquire_sync(weight)
+
+            request_params = dict(params or {})
+
+            if signed:
+                # Sign after any throttling wait so the timestamp stays fresh
+                request_params['timestamp'] = int(time.time() * 1000)
+                # Generate signature BEFORE adding it to params
+                signature = self._generate_signature(request_params)
+                request_params['signature'] = signature
+
+            try:
+                if method == 'GET':
+                    response = self.session.get(url, params=request_params, timeout=self.timeout)
+                elif method == 'POST':
+                    response = self.session.post(url, json=request_params, timeout=self.timeout)
+                else:
+                    raise ValueError(f"Unsupported method: {method}")
+
+                if response.status_code == 429 and attempt < self.max_retries:
+                    retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                    logger.warning(
+                        f"{endpoint} returned 429, retry {attempt + 1}/{self.max_retries} "
+                        f"in {retry_after:.1f}s"
+                    )
+                    if bucket:
+                        bucket.penalize(retry_after)
+                    else:
+                        time.sleep(retry_after)
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+
+                if data.get('code') != 0:
+                    logger.error(f"API error: {data.get('msg')}")
+                    raise Exception(f"BingX API error: {data.get('msg')}")
+
+                return data
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed: {e}")
+                raise
 
     def get_account_info(self) -> Dict:
         """Get account information"""
@@ -134,7 +176,8 @@ class BingXClient:
         if end_time:
             params['endTime'] = end_time
 
-        response = self._request('GET', '/openApi/swap/v3/quote/klines', params, signed=False)
+        response = self._request('GET', '/openApi/swap/v3/quote/klines', params, signed=False,
+                                 weight=kline_weight(limit))
         return response.get('data', [])
 
     def get_ticker_price(self, symbol: Optional[str] = None) -> Dict:
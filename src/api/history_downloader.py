@@ -0,0 +1,282 @@
+"""
+History Downloader - Paginated, resumable bulk backfill of klines and orders
+
+BingX caps kline pages at 1440 candles and order pages at 500, so long
+histories are walked window by window with startTime/endTime. Symbols
+download concurrently under a shared rate budget; windows of one symbol
+run in order so candles can be appended to the KlineStore. Progress is
+checkpointed to a JSON file after every completed window, so an
+interrupted backfill resumes where it stopped.
+
+The store is append-only, so backfills write to their own directory
+(data/history) rather than the live bot's data/klines, which already
+holds recent candles and could not take older ones.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .rate_limiter import TokenBucket, kline_weight
+from ..database.kline_store import KlineStore
+from ..utils.timeframes import interval_to_ms, candle_open_ms
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class DownloadCheckpoint:
+    """
+    Completed-window marks persisted as JSON
+
+    {"klines": {"BTC-USDT|1m": done_until_ms}, "orders": {"BTC-USDT": done_until_ms}}
+    """
+
+    def __init__(self, path: Union[str, Path], save_interval: float = 2.0):
+        """
+        Args:
+            path: Checkpoint file
+            save_interval: Min seconds between writes (save(force=True) always writes)
+        """
+        self.path = Path(path)
+        self.save_interval = save_interval
+        self._data = {'klines': {}, 'orders': {}}
+        self._saved_at = 0.0
+
+        if self.path.exists():
+            with open(self.path) as f:
+                loaded = json.load(f)
+            for section in self._data:
+                self._data[section].update(loaded.get(section, {}))
+
+    def get(self, section: str, key: str) -> Optional[int]:
+        return self._data[section].get(key)
+
+    def set(self, section: str, key: str, done_until: int, force: bool = False):
+        self._data[section][key] = int(done_until)
+        self.save(force)
+
+    def save(self, force: bool = False):
+        """Write atomically (temp file + rename)"""
+        if not force and time.monotonic() - self._saved_at < self.save_interval:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+
+
+class HistoryDownloader:
+    """Backfill klines into a KlineStore and orders into JSON-lines files"""
+
+    def __init__(self, bingx_client, store: Optional[KlineStore] = None,
+                 checkpoint_path: Union[str, Path] = 'data/download_checkpoint.json',
+                 max_concurrency: int = 5, rate_limiter: Optional[TokenBucket] = None,
+                 kline_page: int = 1440, order_page: int = 500, order_window_days: float = 7):
+        """
+        Initialize downloader
+
+        Args:
+            bingx_client: BingX API client (sync or async)
+            store: Destination for klines (default: data/history, separate from the live store)
+            checkpoint_path: JSON file recording completed windows
+            max_concurrency: Symbols downloading at the same time
+            rate_limiter: Shared limiter (default: 10 weight/second, or none when
+                the client already throttles through a RequestBudget)
+            kline_page: Candles per kline request (BingX max 1440)
+            order_page: Orders per request (BingX max 500)
+            order_window_days: Time window per order query
+        """
+        self.bingx = bingx_client
+        self.store = store or KlineStore('data/history')
+        self.checkpoint = DownloadCheckpoint(checkpoint_path)
+        self.max_concurrency = max_concurrency
+        # A budgeted client already waits for its tokens; don't throttle twice
+        if rate_limiter is None and getattr(bingx_client, 'rate_budget', None) is None:
+            rate_limiter = TokenBucket(10.0, name='downloader')
+        self.rate_limiter = rate_limiter
+        self.kline_page = kline_page
+        self.order_page = order_page
+        self.order_window_ms = int(order_window_days * DAY_MS)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Stats
+        self.requests = 0
+        self.windows = 0
+        self.candles = 0
+        self.orders = 0
+
+    # ==================== KLINES ====================
+
+    async def download_klines(self, symbols: List[str], interval: str, start_ms: int,
+                              end_ms: Optional[int] = None) -> Dict:
+        """
+        Backfill closed candles for every symbol into the store
+
+        Args:
+            symbols: Trading symbols
+            interval: Kline timeframe
+            start_ms: Oldest candle wanted
+            end_ms: Newest candle wanted (default: now)
+
+        Returns:
+            Dict with per-run stats and symbols that failed
+        """
+        step = interval_to_ms(interval)
+        now_ms = int(time.time() * 1000)
+        # Last closed candle
+        last_open = candle_open_ms(min(end_ms or now_ms, now_ms - step), interval)
+
+        results = await asyncio.gather(
+            *(self._download_symbol_klines(s, interval, start_ms, last_open) for s in symbols),
+            return_exceptions=True
+        )
+        self.checkpoint.save(force=True)
+        return self._summary(symbols, results)
+
+    async def _download_symbol_klines(self, symbol: str, interval: str, start_ms: int, last_open: int):
+        step = interval_to_ms(interval)
+        key = f"{symbol}|{interval}"
+
+        # Resume after the last checkpointed window
+        cursor = candle_open_ms(start_ms + step - 1, interval)
+        done = self.checkpoint.get('klines', key)
+        if done is not None:
+            cursor = max(cursor, done + step)
+
+        # The store is append-only: candles that start after the cursor (e.g.
+        # the live bot's recent 4h candles) would turn every older append into
+        # a no-op, so fail loudly instead of skipping the range
+        first_stored = self.store.first_time(symbol, interval)
+        if first_stored is not None and cursor <= last_open:
+            if first_stored > cursor:
+                raise ValueError(
+                    f"{symbol} {interval}: store already holds candles from {first_stored}, "
+                    f"after the backfill start {cursor}; backfill into a separate KlineStore"
+                )
+            cursor = max(cursor, self.store.last_time(symbol, interval) + step)
+
+        async with self._semaphore:
+            while cursor <= last_open:
+                window_end = min(cursor + (self.kline_page - 1) * step, last_open)
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire(kline_weight(self.kline_page))
+                klines = await self._call(
+                    self.bingx.get_klines, symbol=symbol, interval=interval,
+                    limit=self.kline_page, start_time=cursor, end_time=window_end + step - 1
+                )
+                written = self.store.append(symbol, interval, klines) if klines else 0
+
+                self.windows += 1
+                self.candles += written
+                # Saved at once when candles were written so the store never runs ahead of it
+                self.checkpoint.set('klines', key, window_end, force=written > 0)
+                cursor = window_end + step
+
+        logger.info(f"{symbol} {interval}: history complete up to {last_open}")
+
+    # ==================== ORDERS ====================
+
+    async def download_orders(self, symbols: List[str], start_ms: int, end_ms: Optional[int] = None,
+                              output_dir: Union[str, Path] = 'data/orders') -> Dict:
+        """
+        Backfill order history to {output_dir}/{symbol}.jsonl
+
+        Each time window is paged until a short page comes back, then
+        written and checkpointed as a unit.
+        """
+        end_ms = end_ms or int(time.time() * 1000)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        results = await asyncio.gather(
+            *(self._download_symbol_orders(s, start_ms, end_ms, output_dir) for s in symbols),
+            return_exceptions=True
+        )
+        self.checkpoint.save(force=True)
+        return self._summary(symbols, results)
+
+    async def _download_symbol_orders(self, symbol: str, start_ms: int, end_ms: int, output_dir: Path):
+        done = self.checkpoint.get('orders', symbol)
+        cursor = max(start_ms, done + 1) if done is not None else start_ms
+
+        async with self._semaphore:
+            while cursor <= end_ms:
+                window_end = min(cursor + self.order_window_ms - 1, end_ms)
+                orders = await self._fetch_order_window(symbol, cursor, window_end)
+
+                if orders:
+                    with open(output_dir / f"{symbol}.jsonl", 'a') as f:
+                        for order in orders:
+                            f.write(json.dumps(order) + '\n')
+
+                self.windows += 1
+                self.orders += len(orders)
+                self.checkpoint.set('orders', symbol, window_end)
+                cursor = window_end + 1
+
+    async def _fetch_order_window(self, symbol: str, start_ms: int, end_ms: int) -> List[Dict]:
+        """All orders in [start_ms, end_ms], paging on order time"""
+        orders: Dict = {}
+        cursor = start_ms
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            page = await self._call(
+                self.bingx.get_trade_history, symbol=symbol,
+                start_time=cursor, end_time=end_ms, limit=self.order_page
+            )
+            for order in page:
+                orders[order.get('orderId', id(order))] = order
+
+            if len(page) < self.order_page:
+                break
+            newest = max(int(o.get('time', o.get('updateTime', 0))) for o in page)
+            if newest < cursor:
+                break
+            cursor = newest + 1
+
+        return sorted(orders.values(), key=lambda o: int(o.get('time', 0)))
+
+    @staticmethod
+    def load_orders(path: Union[str, Path]) -> List[Dict]:
+        """Read a downloaded orders file (deduplicated by orderId)"""
+        orders = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    order = json.loads(line)
+                    orders[order.get('orderId', len(orders))] = order
+        return sorted(orders.values(), key=lambda o: int(o.get('time', 0)))
+
+    # ==================== HELPERS ====================
+
+    async def _call(self, method, **kwargs):
+        """Call a sync or async client method"""
+        self.requests += 1
+        if inspect.iscoroutinefunction(method):
+            return await method(**kwargs)
+        return await asyncio.to_thread(method, **kwargs)
+
+    def _summary(self, symbols: List[str], results: List) -> Dict:
+        failed = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"{symbol}: download stopped ({result}); rerun to resume")
+                failed[symbol] = str(result)
+        return {
+            'symbols': len(symbols),
+            'requests': self.requests,
+            'windows': self.windows,
+            'candles': self.candles,
+            'orders': self.orders,
+            'failed': failed,
+        }
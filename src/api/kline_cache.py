@@ -0,0 +1,194 @@
+"""
+Kline Cache - Rolling in-memory candle store per (symbol, interval)
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..database.kline_store import KlineStore
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class KlineCache:
+    """
+    Keep the last N candles per (symbol, interval) in memory
+
+    First request loads the full window. After that only candles with
+    time >= last cached time are requested: the still-open last candle is
+    replaced and newly opened candles are appended, so a scan
+    usually transfers 1-2 candles instead of the whole window.
+
+    A first load shorter than the window means the symbol has no more
+    history (e.g. newly listed); the window then grows incrementally.
+
+    With a KlineStore, closed candles are written through to disk (in a
+    worker thread) and a restart warm-starts from the store, fetching only
+    candles since the last stored one.
+
+    Returned frames are never modified afterwards, so callers may keep
+    evaluating them while the next update is merged.
+    """
+
+    def __init__(self, bingx_client, max_candles: int = 200, update_limit: int = 10,
+                 store: Optional[KlineStore] = None):
+        """
+        Initialize kline cache
+
+        Args:
+            bingx_client: BingX API client (sync or async)
+            max_candles: Candles kept per (symbol, interval)
+            update_limit: Page size for incremental requests. A full page
+                means candles may be missing, so the window is reloaded.
+            store: On-disk history for warm starts and write-through
+        """
+        self.bingx = bingx_client
+        self.max_candles = max_candles
+        self.update_limit = update_limit
+        self.store = store
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+        # Stats
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.warm_starts = 0
+
+    def next_fetch_limit(self, symbol: str, interval: str) -> int:
+        """Number of candles the next get() for this key will request"""
+        if (symbol, interval) not in self._frames:
+            return self.max_candles
+        return self.update_limit
+
+    async def get(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Get up-to-date candles for symbol/interval
+
+        Returns:
+            DataFrame with time + float OHLCV columns (ascending by time),
+            or None if BingX returned no data
+        """
+        key = (symbol, interval)
+        df = self._frames.get(key)
+
+        if df is None:
+            return await self._full_load(symbol, interval)
+
+        last_time = int(df['time'].iloc[-1])
+        klines = await self._fetch(symbol, interval, self.update_limit, start_time=last_time)
+
+        if len(klines) >= self.update_limit:
+            # Could not cover the gap in one page - rebuild the window
+            logger.debug(f"{symbol} {interval}: gap since last update, reloading")
+            return await self._full_load(symbol, interval)
+
+        self.incremental_loads += 1
+        if not klines:
+            return df
+
+        self._frames[key] = self._merge(df, self._to_dataframe(klines))
+        if int(self._frames[key]['time'].iloc[-1]) > last_time:
+            await self._persist(symbol, interval, self._frames[key])
+        return self._frames[key]
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop cached candles (one symbol or everything)"""
+        if symbol is None:
+            self._frames.clear()
+            return
+        for key in [k for k in self._frames if k[0] == symbol]:
+            del self._frames[key]
+
+    async def _full_load(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Load the whole window (from the store if it is recent enough)"""
+        df = await self._warm_start(symbol, interval)
+        if df is not None:
+            return df
+
+        klines = await self._fetch(symbol, interval, self.max_candles)
+        self.full_loads += 1
+
+        if not klines:
+            return None
+
+        df = self._to_dataframe(klines).tail(self.max_candles).reset_index(drop=True)
+        self._frames[(symbol, interval)] = df
+        await self._persist(symbol, interval, df)
+        return df
+
+    async def _warm_start(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Seed the window from the store and fetch only what is newer"""
+        if self.store is None:
+            return None
+
+        stored = await asyncio.to_thread(self.store.tail, symbol, interval, self.max_candles)
+        if len(stored['time']) < self.max_candles:
+            return None
+
+        df = pd.DataFrame({col: np.array(values) for col, values in stored.items()})
+        klines = await self._fetch(symbol, interval, self.update_limit, start_time=int(df['time'].iloc[-1]))
+        if len(klines) >= self.update_limit:
+            # Store is too far behind - cheaper to load the window directly
+            return None
+
+        self.warm_starts += 1
+        if klines:
+            df = self._merge(df, self._to_dataframe(klines))
+        self._frames[(symbol, interval)] = df
+        await self._persist(symbol, interval, df)
+        return df
+
+    async def _persist(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Write closed candles through to the store off the event loop (never fails a scan)"""
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.append, symbol, interval, df)
+        except Exception as e:
+            logger.warning(f"{symbol} {interval}: could not persist candles: {e}")
+
+    def _merge(self, df: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """Replace the open candle and append newer candles (on a copy of df)"""
+        last_time = int(df['time'].iloc[-1])
+
+        same = new[new['time'] == last_time]
+        if not same.empty:
+            # df may still be in use by callers of the previous get()
+            df = df.copy()
+            df.loc[df.index[-1], OHLCV_COLUMNS] = same.iloc[-1][OHLCV_COLUMNS].to_numpy()
+
+        newer = new[new['time'] > last_time]
+        if newer.empty:
+            return df
+
+        merged = pd.concat([df, newer], ignore_index=True)
+        return merged.tail(self.max_candles).reset_index(drop=True)
+
+    async def _fetch(self, symbol: str, interval: str, limit: int,
+                     start_time: Optional[int] = None) -> List[Dict]:
+        """Call get_klines on either an async or a sync client"""
+        kwargs = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        if start_time is not None:
+            kwargs['start_time'] = start_time
+
+        if inspect.iscoroutinefunction(self.bingx.get_klines):
+            return await self.bingx.get_klines(**kwargs)
+        return await asyncio.to_thread(self.bingx.get_klines, **kwargs)
+
+    @staticmethod
+    def _to_dataframe(klines: List[Dict]) -> pd.DataFrame:
+        """Convert raw kline list to DataFrame sorted by open time"""
+        df = pd.DataFrame(klines)
+        df['time'] = df['time'].astype('int64')
+        for col in OHLCV_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype(float)
+            else:
+                df[col] = 0.0
+        return df.sort_values('time').reset_index(drop=True)
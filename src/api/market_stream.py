@@ -0,0 +1,319 @@
+"""
+Market Stream - BingX WebSocket price/kline feed with REST fallback
+"""
+
+import asyncio
+import gzip
+import inspect
+import io
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Set
+
+import websocket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WS_URL = "wss://open-api-swap.bingx.com/swap-market"
+
+
+class MarketDataStream:
+    """
+    Push last-price and kline updates to subscribers
+
+    - websocket-client runs in a background thread; messages are handed
+      to the asyncio loop with call_soon_threadsafe
+    - Reconnects with exponential backoff and resubscribes every topic
+    - While disconnected (or when a symbol goes quiet) prices are filled
+      from one bulk REST snapshot, so subscribers keep getting ticks
+    """
+
+    def __init__(self, bingx_client=None, url: str = DEFAULT_WS_URL,
+                 stale_after: float = 30.0, snapshot_interval: float = 15.0,
+                 reconnect_base: float = 1.0, reconnect_max: float = 60.0):
+        """
+        Initialize market stream
+
+        Args:
+            bingx_client: REST client for snapshot fallback (sync or async)
+            url: BingX swap market WebSocket URL
+            stale_after: Seconds without a tick before a price is stale
+            snapshot_interval: Seconds between REST fallback checks
+            reconnect_base: First reconnect delay in seconds
+            reconnect_max: Max reconnect delay in seconds
+        """
+        self.bingx = bingx_client
+        self.url = url
+        self.stale_after = stale_after
+        self.snapshot_interval = snapshot_interval
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+
+        self.is_running = False
+        self.is_connected = False
+
+        self._topics: Set[str] = set()
+        self._price_listeners: List[Callable] = []
+        self._kline_listeners: List[Callable] = []
+        self._last_prices: Dict[str, tuple] = {}  # symbol -> (price, monotonic time)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._topics_lock = threading.Lock()
+
+        # Stats
+        self.ws_ticks = 0
+        self.rest_ticks = 0
+        self.reconnects = 0
+
+    # ==================== SUBSCRIPTIONS ====================
+
+    def add_price_listener(self, callback: Callable):
+        """Register callback(symbol, price); may be a coroutine function"""
+        self._price_listeners.append(callback)
+
+    def add_kline_listener(self, callback: Callable):
+        """Register callback(symbol, interval, kline); may be a coroutine function"""
+        self._kline_listeners.append(callback)
+
+    def subscribe_price(self, symbol: str):
+        """Stream last price for symbol"""
+        self._subscribe(f"{symbol}@lastPrice")
+
+    def unsubscribe_price(self, symbol: str):
+        """Stop streaming last price for symbol"""
+        self._unsubscribe(f"{symbol}@lastPrice")
+        self._last_prices.pop(symbol, None)
+
+    def subscribe_kline(self, symbol: str, interval: str):
+        """Stream kline updates for symbol/interval"""
+        self._subscribe(f"{symbol}@kline_{interval}")
+
+    def unsubscribe_kline(self, symbol: str, interval: str):
+        """Stop streaming kline updates for symbol/interval"""
+        self._unsubscribe(f"{symbol}@kline_{interval}")
+
+    def set_price_symbols(self, symbols):
+        """Make the set of price subscriptions exactly `symbols`"""
+        wanted = set(symbols)
+        current = self.price_symbols
+        for symbol in wanted - current:
+            self.subscribe_price(symbol)
+        for symbol in current - wanted:
+            self.unsubscribe_price(symbol)
+
+    @property
+    def price_symbols(self) -> Set[str]:
+        """Symbols with an active price subscription"""
+        with self._topics_lock:
+            return {t.split('@')[0] for t in self._topics if t.endswith('@lastPrice')}
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Latest price for symbol, or None if missing or stale"""
+        entry = self._last_prices.get(symbol)
+        if not entry:
+            return None
+        price, updated_at = entry
+        if time.monotonic() - updated_at > self.stale_after:
+            return None
+        return price
+
+    def _subscribe(self, topic: str):
+        with self._topics_lock:
+            if topic in self._topics:
+                return
+            self._topics.add(topic)
+        self._send({'id': str(uuid.uuid4()), 'reqType': 'sub', 'dataType': topic})
+
+    def _unsubscribe(self, topic: str):
+        with self._topics_lock:
+            if topic not in self._topics:
+                return
+            self._topics.discard(topic)
+        self._send({'id': str(uuid.uuid4()), 'reqType': 'unsub', 'dataType': topic})
+
+    def _send(self, payload: Dict):
+        """Send a message if connected (topics are replayed on reconnect anyway)"""
+        if self._ws and self.is_connected:
+            try:
+                self._ws.send(json.dumps(payload))
+            except Exception as e:
+                logger.debug(f"WebSocket send failed: {e}")
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        """Start WebSocket thread and REST fallback loop"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run_forever, name='market-stream', daemon=True)
+        self._thread.start()
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+        logger.info("Market stream started")
+
+    async def stop(self):
+        """Stop streaming"""
+        self.is_running = False
+
+        if self._ws:
+            self._ws.close()
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 5)
+
+        self.is_connected = False
+        logger.info("Market stream stopped")
+
+    def _run_forever(self):
+        """Connect, and reconnect with backoff until stopped (runs in thread)"""
+        attempt = 0
+
+        while self.is_running:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            connected_at = time.monotonic()
+            self._ws.run_forever()
+            self.is_connected = False
+
+            if not self.is_running:
+                break
+
+            # Reset backoff after a connection that stayed up for a while
+            if time.monotonic() - connected_at > 60:
+                attempt = 0
+
+            delay = min(self.reconnect_max, self.reconnect_base * (2 ** attempt))
+            attempt += 1
+            self.reconnects += 1
+            logger.warning(f"Market stream disconnected, reconnecting in {delay:.0f}s")
+            time.sleep(delay)
+
+    def _on_open(self, ws):
+        self.is_connected = True
+        with self._topics_lock:
+            topics = list(self._topics)
+
+        # Resubscribe everything after (re)connect
+        for topic in topics:
+            ws.send(json.dumps({'id': str(uuid.uuid4()), 'reqType': 'sub', 'dataType': topic}))
+
+        logger.info(f"Market stream connected ({len(topics)} topics)")
+
+    def _on_error(self, ws, error):
+        logger.warning(f"Market stream error: {error}")
+
+    def _on_close(self, ws, status_code, message):
+        self.is_connected = False
+
+    def _on_message(self, ws, message):
+        """Decode a frame and hand updates to the event loop"""
+        if isinstance(message, bytes):
+            try:
+                message = gzip.GzipFile(fileobj=io.BytesIO(message)).read().decode('utf-8')
+            except OSError:
+                message = message.decode('utf-8')
+
+        # BingX heartbeat
+        if message == 'Ping':
+            ws.send('Pong')
+            return
+
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+
+        data_type = payload.get('dataType', '')
+        data = payload.get('data')
+        if not data_type or data is None or '@' not in data_type:
+            return
+
+        symbol, channel = data_type.split('@', 1)
+
+        if channel == 'lastPrice':
+            price = data.get('c') if isinstance(data, dict) else None
+            if price is not None:
+                self.ws_ticks += 1
+                self._loop.call_soon_threadsafe(self._dispatch_price, symbol, float(price))
+
+        elif channel.startswith('kline_'):
+            interval = channel[len('kline_'):]
+            klines = data if isinstance(data, list) else [data]
+            for kline in klines:
+                self._loop.call_soon_threadsafe(self._dispatch_kline, symbol, interval, kline)
+
+    # ==================== DISPATCH ====================
+
+    def _dispatch_price(self, symbol: str, price: float):
+        """Record price and notify listeners (runs on the event loop)"""
+        self._last_prices[symbol] = (price, time.monotonic())
+        for callback in self._price_listeners:
+            self._invoke(callback, symbol, price)
+
+    def _dispatch_kline(self, symbol: str, interval: str, kline: Dict):
+        """Notify kline listeners (runs on the event loop)"""
+        close = kline.get('c')
+        if close is not None:
+            self._last_prices[symbol] = (float(close), time.monotonic())
+        for callback in self._kline_listeners:
+            self._invoke(callback, symbol, interval, kline)
+
+    def _invoke(self, callback: Callable, *args):
+        try:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                task.add_done_callback(self._log_listener_error)
+        except Exception as e:
+            logger.error(f"Market stream listener error: {e}", exc_info=True)
+
+    @staticmethod
+    def _log_listener_error(task: asyncio.Future):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Market stream listener error: {task.exception()}")
+
+    # ==================== REST FALLBACK ====================
+
+    async def _snapshot_loop(self):
+        """Fill stale or missing prices from one bulk REST call"""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.snapshot_interval)
+                stale = [s for s in self.price_symbols if self.get_price(s) is None]
+                if stale and self.bingx:
+                    await self._apply_snapshot(stale)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Market stream snapshot error: {e}")
+
+    async def _apply_snapshot(self, symbols: List[str]):
+        if inspect.iscoroutinefunction(self.bingx.get_ticker_price):
+            tickers = await self.bingx.get_ticker_price()
+        else:
+            tickers = await asyncio.to_thread(self.bingx.get_ticker_price)
+
+        if isinstance(tickers, dict):
+            tickers = [tickers]
+
+        wanted = set(symbols)
+        for ticker in tickers or []:
+            symbol = ticker.get('symbol')
+            price = ticker.get('price', ticker.get('lastPrice'))
+            if symbol in wanted and price is not None:
+                self.rest_ticks += 1
+                self._dispatch_price(symbol, float(price))
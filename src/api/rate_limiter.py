@@ -0,0 +1,179 @@
+"""
+Rate Limiter - Token bucket throttling for BingX API calls
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def kline_weight(limit: int) -> float:
+    """Request weight for a kline call (larger pages count as heavier requests)"""
+    if limit <= 500:
+        return 1.0
+    elif limit <= 1000:
+        return 2.0
+    return 5.0
+
+
+def retry_after_seconds(value, default: float = 1.0) -> float:
+    """Parse a Retry-After header (seconds; HTTP dates fall back to default)"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from threads and asyncio alike
+
+    Callers reserve tokens up front: the bucket may go into debt and
+    each caller is told how long to wait for its share, so waiting
+    happens outside the lock and requests are served in arrival order.
+    A 429 response blocks the bucket until Retry-After has passed.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, name: str = 'bucket'):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens (request weight) added per second
+            capacity: Maximum burst size (default: one second of tokens)
+            name: Label for logs and stats
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.name = name
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+        # Stats
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.rate_limited = 0
+
+    def reserve(self, weight: float = 1.0) -> float:
+        """Consume `weight` tokens and return how long the caller must wait"""
+        weight = min(weight, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated_at:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+            self._tokens -= weight
+            delay = max(self._updated_at - now, 0.0) + max(-self._tokens, 0.0) / self.rate
+
+            self.requests += 1
+            if delay > 0:
+                self.throttled += 1
+                self.wait_seconds += delay
+            return delay
+
+    def available_in(self, weight: float = 1.0) -> float:
+        """Seconds until `weight` tokens are free, without consuming them"""
+        weight = min(weight, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._tokens
+            if now > self._updated_at:
+                tokens = min(self.capacity, tokens + (now - self._updated_at) * self.rate)
+            return max(self._updated_at - now, 0.0) + max(weight - tokens, 0.0) / self.rate
+
+    def acquire_sync(self, weight: float = 1.0):
+        """Block the calling thread until the request may be sent"""
+        delay = self.reserve(weight)
+        if delay > 0:
+            self._track_waiting(1)
+            try:
+                time.sleep(delay)
+            finally:
+                self._track_waiting(-1)
+
+    async def acquire(self, weight: float = 1.0):
+        """Wait (asyncio) until the request may be sent"""
+        delay = self.reserve(weight)
+        if delay > 0:
+            self._track_waiting(1)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._track_waiting(-1)
+
+    def penalize(self, retry_after: float):
+        """Stop issuing tokens for `retry_after` seconds (server returned 429)"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated_at:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            # Keep outstanding reservations queued behind the pause
+            self._tokens = min(self._tokens, 0.0)
+            self._updated_at = max(self._updated_at, now + retry_after)
+            self.rate_limited += 1
+        logger.warning(f"{self.name} rate limited by server, pausing {retry_after:.1f}s")
+
+    def _track_waiting(self, delta: int):
+        with self._lock:
+            self._waiting += delta
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting for tokens"""
+        return self._waiting
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            'rate': self.rate,
+            'queue_depth': self._waiting,
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'wait_seconds': round(self.wait_seconds, 3),
+            'rate_limited': self.rate_limited,
+        }
+
+
+class RequestBudget:
+    """
+    Separate token buckets for public (market data) and signed (account)
+    endpoints, shared by every BingX client in the process
+    """
+
+    def __init__(self, public_rate: float = 10.0, signed_rate: float = 5.0,
+                 public_capacity: Optional[float] = None, signed_capacity: Optional[float] = None):
+        """
+        Initialize request budget
+
+        Args:
+            public_rate: Weight per second for unsigned market endpoints
+            signed_rate: Weight per second for signed account endpoints
+            public_capacity: Burst size for public endpoints
+            signed_capacity: Burst size for signed endpoints
+        """
+        self.public = TokenBucket(public_rate, public_capacity, name='public')
+        self.signed = TokenBucket(signed_rate, signed_capacity, name='signed')
+
+    def bucket(self, signed: bool) -> TokenBucket:
+        return self.signed if signed else self.public
+
+    @property
+    def queue_depth(self) -> Dict[str, int]:
+        return {'public': self.public.queue_depth, 'signed': self.signed.queue_depth}
+
+    @property
+    def stats(self) -> Dict:
+        return {'public': self.public.stats, 'signed': self.signed.stats}
@@ -0,0 +1 @@
+# Backtesting
@@ -0,0 +1,590 @@
+"""
+Backtest Engine - Replay stored klines through the live strategy and martingale code
+
+Signals come from DataDrivenShortStrategy.generate_signal and sequences are
+driven by MartingaleManager.trigger_price / should_add_martingale /
+check_sequence_close, so the backtest exercises exactly the code the bot runs.
+
+To replay a year of 1m candles over ~100 symbols in minutes:
+- Indicators are computed once per symbol over the whole history and a
+  slightly relaxed vectorized version of the SHORT conditions picks
+  candidate bars. Only candidates are confirmed with generate_signal on
+  the same 200-candle window the scanner would pass.
+- An open sequence jumps straight to the next bar where a TP, SL or
+  martingale level is touched (chunked NumPy search) instead of
+  stepping every bar in Python. Like SignalTracker, which screens all
+  sequences with evaluate_batch, only touched bars take the scalar path.
+"""
+
+import logging
+import math
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..database.models import TradeDirection, SequenceStatus
+from ..strategies.martingale_manager import MartingaleManager
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60 * 1000
+
+# Relaxation of the prefilter versus the windowed indicators generate_signal
+# sees (EMA50 seeded 200 candles back differs from the full-history EMA by
+# well under 0.1%); candidates are always confirmed with generate_signal.
+PREFILTER_RSI_SLACK = 0.5
+PREFILTER_REL_TOL = 1e-3
+
+WIN_OUTCOMES = ('HIT_TP1', 'HIT_TP2')
+
+# One row per simulated sequence
+TRADE_COLUMNS = [
+    'symbol', 'signal_type', 'direction', 'opened_at', 'closed_at', 'first_entry',
+    'weighted_avg_entry', 'exit_price', 'outcome', 'steps', 'total_margin', 'leverage',
+    'pnl', 'pnl_pct', 'worst_pnl', 'bars_held', 'confidence',
+]
+
+
+def indicator_series(close: np.ndarray, rsi_period: int = 14, macd_fast: int = 12,
+                     macd_slow: int = 26, macd_signal: int = 9, ema_period: int = 50):
+    """
+    Full-history RSI / MACD / signal / EMA using pandas' C ewm loops
+
+    Same recursions as IndicatorEngine (EMA = ewm(span, adjust=False),
+    Wilder RSI seeded with the simple mean of the first `period` changes).
+
+    Returns:
+        (rsi, macd, macd_signal, ema) arrays aligned with close
+    """
+    series = pd.Series(close, dtype=float)
+
+    def ema(values: pd.Series, period: int) -> pd.Series:
+        return values.ewm(span=period, adjust=False).mean()
+
+    macd = ema(series, macd_fast) - ema(series, macd_slow)
+    signal = ema(macd, macd_signal)
+    ema_line = ema(series, ema_period)
+
+    rsi = np.full(len(close), np.nan)
+    if len(close) > rsi_period:
+        delta = np.diff(close)
+        gains = np.clip(delta, 0, None)
+        losses = np.clip(-delta, 0, None)
+
+        def wilder(values: np.ndarray) -> np.ndarray:
+            seeded = np.concatenate([[values[:rsi_period].mean()], values[rsi_period:]])
+            return pd.Series(seeded).ewm(alpha=1 / rsi_period, adjust=False).mean().to_numpy()
+
+        avg_gain, avg_loss = wilder(gains), wilder(losses)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = 100 - (100 / (1 + avg_gain / avg_loss))
+        values = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+        rsi[rsi_period:] = values
+
+    return rsi, macd.to_numpy(), signal.to_numpy(), ema_line.to_numpy()
+
+
+class SimulatedEntry:
+    """One entry of a simulated sequence (stands in for BotSignal)"""
+
+    def __init__(self, step_number: int, entry_price: float, margin: float, time: int):
+        self.step_number = step_number
+        self.entry_price = entry_price
+        self.recommended_margin = margin
+        self.actual_margin = margin
+        self.time = time
+
+
+class SimulatedSequence:
+    """
+    In-memory stand-in for PositionSequence
+
+    Has the attributes MartingaleManager reads, so the manager's own
+    trigger / close / PnL logic runs unchanged. The cooldown is enforced
+    by the engine in simulated time, so last_martingale_suggestion_at
+    stays None.
+    """
+
+    def __init__(self, seq_id: int, signal: Dict, opened_at: int, max_steps: int,
+                 use_stop_loss: bool = True):
+        entry_price = signal['entry_price']
+        margin = signal.get('recommended_margin', 20)
+
+        self.id = seq_id
+        self.symbol = signal['symbol']
+        self.direction = TradeDirection.SHORT if signal['side'] == 'SHORT' else TradeDirection.LONG
+        self.status = SequenceStatus.ACTIVE
+        self.signal_type = signal.get('signal_type', 'STANDALONE')
+        self.confidence = signal.get('confidence')
+
+        self.current_step = 1
+        self.max_steps = max_steps
+        self.first_entry_price = entry_price
+        self.last_entry_price = entry_price
+        self.weighted_avg_entry = entry_price
+        self.total_margin = margin
+        self.total_leverage = signal.get('recommended_leverage', 20)
+
+        self.current_tp1 = signal.get('take_profit_1')
+        self.current_tp2 = signal.get('take_profit_2')
+        self.current_sl = signal.get('stop_loss') if use_stop_loss else None
+        self.last_martingale_suggestion_at = None
+
+        self.signals = [SimulatedEntry(1, entry_price, margin, opened_at)]
+        self.opened_at = opened_at
+
+    def add_entry(self, suggestion: Dict, time: int):
+        """Apply a martingale suggestion as a filled entry"""
+        self.current_step = suggestion['next_step']
+        self.last_entry_price = suggestion['suggested_entry']
+        self.weighted_avg_entry = suggestion['new_weighted_avg']
+        self.total_margin = suggestion['new_total_margin']
+        self.current_tp1 = suggestion['new_tp1']
+        self.current_tp2 = suggestion['new_tp2']
+        self.signals.append(
+            SimulatedEntry(self.current_step, suggestion['suggested_entry'], suggestion['suggested_margin'], time)
+        )
+
+
+class BacktestResult:
+    """Closed sequences plus portfolio-level PnL, drawdown and exposure"""
+
+    def __init__(self, trades: pd.DataFrame, margin_events: List[Tuple[int, float]],
+                 initial_capital: float, start_time: Optional[int], end_time: Optional[int],
+                 n_symbols: int):
+        self.trades = trades
+        self.margin_events = margin_events
+        self.initial_capital = initial_capital
+        self.start_time = start_time
+        self.end_time = end_time
+        self.n_symbols = n_symbols
+
+    @property
+    def equity(self) -> pd.Series:
+        """Realized equity after each sequence close (indexed by close time)"""
+        if self.trades.empty:
+            return pd.Series([self.initial_capital], dtype=float)
+        closed = self.trades.sort_values('closed_at')
+        equity = self.initial_capital + closed['pnl'].cumsum()
+        equity.index = pd.to_datetime(closed['closed_at'], unit='ms')
+        return equity
+
+    def summary(self) -> Dict:
+        """Headline statistics"""
+        trades = self.trades
+        span = (self.end_time - self.start_time) if self.start_time is not None else 0
+
+        summary = {
+            'sequences': len(trades),
+            'wins': 0,
+            'losses': 0,
+            'expired': 0,
+            'win_rate': 0.0,
+            'total_pnl': 0.0,
+            'avg_pnl': 0.0,
+            'profit_factor': 0.0,
+            'max_drawdown': 0.0,
+            'max_drawdown_pct': 0.0,
+            'worst_open_pnl': 0.0,
+            'steps': {},
+        }
+        summary.update(self._exposure(span))
+        if trades.empty:
+            return summary
+
+        wins = trades['outcome'].isin(WIN_OUTCOMES)
+        gross_win = trades.loc[trades['pnl'] > 0, 'pnl'].sum()
+        gross_loss = -trades.loc[trades['pnl'] < 0, 'pnl'].sum()
+
+        equity = np.concatenate([[self.initial_capital], self.equity.to_numpy()])
+        peak = np.maximum.accumulate(equity)
+        drawdown = peak - equity
+
+        summary.update({
+            'wins': int(wins.sum()),
+            'losses': int((trades['outcome'] == 'HIT_SL').sum()),
+            'expired': int((trades['outcome'] == 'EXPIRED').sum()),
+            'win_rate': float(wins.mean()),
+            'total_pnl': float(trades['pnl'].sum()),
+            'avg_pnl': float(trades['pnl'].mean()),
+            'profit_factor': float(gross_win / gross_loss) if gross_loss > 0 else math.inf,
+            'max_drawdown': float(drawdown.max()),
+            'max_drawdown_pct': float((drawdown / peak).max() * 100),
+            'worst_open_pnl': float(trades['worst_pnl'].min()),
+            'steps': {int(k): int(v) for k, v in trades['steps'].value_counts().sort_index().items()},
+        })
+        return summary
+
+    def _exposure(self, span: int) -> Dict:
+        """Time in market and margin in use, from open/add/close margin events"""
+        exposure = {
+            'time_in_market_pct': 0.0,
+            'max_concurrent_sequences': 0,
+            'max_margin_in_use': 0.0,
+            'avg_margin_in_use': 0.0,
+        }
+        if self.trades.empty or span <= 0:
+            return exposure
+
+        held = (self.trades['closed_at'] - self.trades['opened_at']).sum()
+        exposure['time_in_market_pct'] = float(held / (span * max(self.n_symbols, 1)) * 100)
+
+        # Concurrent sequences: +1 at open, -1 at close (closes first on ties)
+        opens = np.sort(self.trades['opened_at'].to_numpy())
+        closes = np.sort(self.trades['closed_at'].to_numpy())
+        open_counts = np.arange(1, len(opens) + 1) - np.searchsorted(closes, opens, side='right')
+        exposure['max_concurrent_sequences'] = int(open_counts.max())
+
+        events = sorted(self.margin_events, key=lambda e: (e[0], e[1]))
+        times = np.array([e[0] for e in events], dtype=np.int64)
+        in_use = np.cumsum([e[1] for e in events])
+        exposure['max_margin_in_use'] = float(in_use.max())
+        durations = np.diff(np.append(times, self.end_time))
+        exposure['avg_margin_in_use'] = float((in_use * durations).sum() / span)
+        return exposure
+
+
+class BacktestEngine:
+    """
+    Replay historical klines bar by bar through a strategy and MartingaleManager
+
+    Conventions:
+    - A signal is evaluated at the close of bar i with the last
+      `window` candles (the scanner's 200) and entered at that close.
+    - From bar i + 1 on, each bar is checked adverse-side first (SL, then
+      martingale triggers at the trigger price), then TP on the favorable
+      side - the conservative ordering when one bar touches both.
+    - INITIAL signals become martingale sequences; STANDALONE signals (or
+      no manager) are single entries that expire after 48h as in the bot.
+    - Live sequences keep the INITIAL signal's stop loss, which sits below
+      the martingale trigger. sequence_stop_loss=False replays the
+      SL-less martingale mode instead.
+    """
+
+    def __init__(self, strategy, martingale_manager: Optional[MartingaleManager] = None,
+                 interval: str = '1m', window: Optional[int] = None,
+                 sequence_stop_loss: bool = True, allow_overlap: bool = False,
+                 signal_cooldown_minutes: float = 30, standalone_expiry_hours: float = 48,
+                 initial_capital: float = 1000.0, prefilter: bool = True, quiet: bool = True,
+                 condition_cache: Optional[Dict] = None):
+        """
+        Initialize backtest engine
+
+        Args:
+            strategy: Strategy with generate_signal(market_data)
+            martingale_manager: Manager driving martingale steps (None = no martingale)
+            interval: Kline timeframe of the replayed data
+            window: Candles passed to generate_signal (default: strategy.min_candles)
+            sequence_stop_loss: Keep the INITIAL signal's SL on sequences (as live)
+            allow_overlap: Allow a new signal while a sequence on the symbol is open
+            signal_cooldown_minutes: Min time between signals per symbol (SignalManager)
+            standalone_expiry_hours: STANDALONE signals expire after this long
+            initial_capital: Starting equity for drawdown
+            prefilter: Use the vectorized candidate filter (False = evaluate every bar)
+            quiet: Silence per-signal INFO logs from strategy/manager during runs
+            condition_cache: Dict reused across runs on the same data to keep the
+                prefilter's per-bar condition counts (parameter sweeps)
+        """
+        self.strategy = strategy
+        self.martingale = martingale_manager
+        self.interval = interval
+        self.window = window or getattr(strategy, 'min_candles', 200)
+        self.sequence_stop_loss = sequence_stop_loss
+        self.allow_overlap = allow_overlap
+        self.signal_cooldown_ms = int(signal_cooldown_minutes * MINUTE_MS)
+        self.standalone_expiry_ms = int(standalone_expiry_hours * 60 * MINUTE_MS)
+        self.initial_capital = initial_capital
+        self.prefilter = prefilter
+        self.quiet = quiet
+        self.condition_cache = condition_cache
+
+        # TP/SL checks and PnL for single entries use the same formulas
+        self._closer = martingale_manager or MartingaleManager(max_steps=1)
+        self._next_id = 1
+
+        # Stats from last run
+        self.candidates = 0
+        self.evaluations = 0
+
+    # ==================== RUN ====================
+
+    def run(self, klines: Dict[str, pd.DataFrame]) -> BacktestResult:
+        """
+        Backtest all symbols
+
+        Args:
+            klines: symbol -> DataFrame with time (ms), open, high, low, close
+
+        Returns:
+            BacktestResult
+        """
+        self.candidates = 0
+        self.evaluations = 0
+        rows, margin_events = [], []
+        start_time, end_time = None, None
+
+        with self._quiet_logs():
+            for symbol, df in klines.items():
+                if len(df) < self.window:
+                    logger.warning(f"{symbol}: Not enough data for backtest ({len(df)} candles)")
+                    continue
+                symbol_rows, symbol_events = self.run_symbol(symbol, df)
+                rows.extend(symbol_rows)
+                margin_events.extend(symbol_events)
+
+                first, last = int(df['time'].iloc[0]), int(df['time'].iloc[-1])
+                start_time = first if start_time is None else min(start_time, first)
+                end_time = last if end_time is None else max(end_time, last)
+
+        trades = pd.DataFrame(rows, columns=TRADE_COLUMNS)
+        logger.info(
+            f"Backtest: {len(klines)} symbols, {self.candidates} candidate bars, "
+            f"{self.evaluations} evaluations, {len(trades)} sequences"
+        )
+        return BacktestResult(trades, margin_events, self.initial_capital, start_time, end_time, len(klines))
+
+    def run_symbol(self, symbol: str, df: pd.DataFrame) -> Tuple[List[Dict], List[Tuple[int, float]]]:
+        """
+        Backtest one symbol
+
+        Returns:
+            (trade rows, margin events as (time, delta))
+        """
+        df = df.reset_index(drop=True)
+        times = df['time'].to_numpy(dtype=np.int64)
+        bars = {col: df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close')}
+
+        candidates = self._candidate_bars(symbol, bars['close'])
+        self.candidates += len(candidates)
+
+        rows, events = [], []
+        idx = 0
+        while idx < len(candidates):
+            i = int(candidates[idx])
+            idx += 1
+
+            self.evaluations += 1
+            signal = self.strategy.generate_signal({
+                'symbol': symbol,
+                'interval': self.interval,
+                'klines': df.iloc[i - self.window + 1:i + 1],
+            })
+            if not signal:
+                continue
+
+            row, seq_events, close_idx = self._simulate(signal, i, times, bars)
+            rows.append(row)
+            events.extend(seq_events)
+
+            # Next signal: after cooldown (and after this sequence closed)
+            next_time = times[i] + self.signal_cooldown_ms
+            next_bar = int(np.searchsorted(times, next_time, side='left'))
+            if not self.allow_overlap:
+                next_bar = max(next_bar, close_idx + 1)
+            idx = max(idx, int(np.searchsorted(candidates, next_bar, side='left')))
+
+        return rows, events
+
+    # ==================== SIGNALS ====================
+
+    def _candidate_bars(self, symbol: str, close: np.ndarray) -> np.ndarray:
+        """Bars where generate_signal could fire (superset, confirmed later)"""
+        first = self.window - 1
+        strategy = self.strategy
+        if not self.prefilter or not all(
+            hasattr(strategy, a) for a in ('rsi_overbought', 'min_confidence', 'symbol_boost')
+        ):
+            return np.arange(first, len(close))
+
+        key = (symbol, len(close), strategy.rsi_overbought)
+        conditions = self.condition_cache.get(key) if self.condition_cache is not None else None
+        if conditions is None:
+            conditions = self._condition_counts(close, strategy.rsi_overbought)
+            if self.condition_cache is not None:
+                self.condition_cache[key] = conditions
+
+        # Fewest conditions (of 4) that can reach min_confidence with this symbol's boost
+        boost = strategy.symbol_boost.get(symbol, 0)
+        needed = max(math.ceil(round((strategy.min_confidence - boost) * 4, 9)), 0)
+
+        mask = conditions >= needed
+        mask[:first] = False
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def _condition_counts(close: np.ndarray, rsi_overbought: float) -> np.ndarray:
+        """Relaxed SHORT conditions met per bar (0-4)"""
+        rsi, macd, signal, ema = indicator_series(close)
+        macd_tol = np.abs(close) * PREFILTER_REL_TOL * 0.01
+        prev_macd = np.concatenate([[np.nan], macd[:-1]])
+        prev_signal = np.concatenate([[np.nan], signal[:-1]])
+
+        with np.errstate(invalid='ignore'):
+            return (
+                (rsi > rsi_overbought - PREFILTER_RSI_SLACK).astype(int)
+                + (macd < signal + macd_tol)
+                + ((prev_macd >= prev_signal - macd_tol) & (macd < signal + macd_tol))
+                + (close < ema * (1 + PREFILTER_REL_TOL))
+            )
+
+    # ==================== SEQUENCES ====================
+
+    def _simulate(self, signal: Dict, i: int, times: np.ndarray, bars: Dict[str, np.ndarray]):
+        """
+        Run one signal's sequence from entry at bar i to its close
+
+        Returns:
+            (trade row, margin events, close bar index)
+        """
+        martingale = self.martingale if signal.get('signal_type') == 'INITIAL' else None
+        seq = SimulatedSequence(
+            self._next_id, signal, int(times[i]),
+            max_steps=martingale.max_steps if martingale else 1,
+            use_stop_loss=self.sequence_stop_loss or martingale is None
+        )
+        self._next_id += 1
+        events = [(int(times[i]), seq.total_margin)]
+
+        # SHORT: adverse = high going up. LONG mirrors it through negation.
+        short = seq.direction == TradeDirection.SHORT
+        sign = 1.0 if short else -1.0
+        adverse = bars['high'] if short else -bars['low']
+        favorable = bars['low'] if short else -bars['high']
+        opens = bars['open'] * sign
+
+        stop = len(times)
+        if martingale is None:
+            stop = int(np.searchsorted(times, times[i] + self.standalone_expiry_ms, side='right'))
+
+        worst_pnl = 0.0
+        j = i + 1
+        outcome, exit_price, close_idx = None, None, stop - 1
+
+        while j < stop:
+            trigger = martingale.trigger_price(seq) if martingale else None
+            up_levels = [sign * level for level in (seq.current_sl, trigger) if level is not None]
+            up_level = min(up_levels) if up_levels else math.inf
+            down_level = sign * seq.current_tp1 if seq.current_tp1 else -math.inf
+
+            k = _first_touch(adverse, favorable, j, stop, up_level, down_level)
+            end = stop - 1 if k is None else k - 1
+            if end >= j:
+                worst_pnl = min(worst_pnl, self._open_pnl(seq, sign * adverse[j:end + 1].max()))
+            if k is None:
+                break
+
+            outcome, exit_price = self._process_bar(seq, martingale, k, times, adverse, favorable, opens,
+                                                    sign, events)
+            worst_pnl = min(worst_pnl, self._open_pnl(seq, sign * adverse[k]))
+            if outcome:
+                close_idx = k
+                break
+            j = k + 1
+
+        if outcome is None:
+            # Still open at expiry / end of data: mark to market
+            close_idx = max(min(stop, len(times)) - 1, i)
+            outcome, exit_price = 'EXPIRED', float(bars['close'][close_idx])
+
+        pnl = self._closer.calculate_sequence_pnl(seq, exit_price)
+        closed_at = int(times[close_idx])
+        events.append((closed_at, -seq.total_margin))
+
+        row = {
+            'symbol': seq.symbol,
+            'signal_type': seq.signal_type,
+            'direction': seq.direction.value,
+            'opened_at': seq.opened_at,
+            'closed_at': closed_at,
+            'first_entry': seq.first_entry_price,
+            'weighted_avg_entry': seq.weighted_avg_entry,
+            'exit_price': exit_price,
+            'outcome': outcome,
+            'steps': seq.current_step,
+            'total_margin': seq.total_margin,
+            'leverage': seq.total_leverage,
+            'pnl': pnl['total_pnl'],
+            'pnl_pct': pnl['pnl_pct'],
+            'worst_pnl': worst_pnl,
+            'bars_held': close_idx - i,
+            'confidence': seq.confidence,
+        }
+        return row, events, close_idx
+
+    def _process_bar(self, seq: SimulatedSequence, martingale: Optional[MartingaleManager], k: int,
+                     times: np.ndarray, adverse: np.ndarray, favorable: np.ndarray, opens: np.ndarray,
+                     sign: float, events: List) -> Tuple[Optional[str], Optional[float]]:
+        """Apply SL, martingale adds and TP for bar k (adverse side first)"""
+        time = int(times[k])
+
+        should_close, outcome = self._closer.check_sequence_close(seq, sign * adverse[k])
+        if should_close and outcome == 'HIT_SL':
+            # Gapped through the stop: filled at the open
+            return outcome, sign * max(sign * seq.current_sl, opens[k])
+
+        while martingale:
+            trigger = martingale.trigger_price(seq)
+            if trigger is None or sign * trigger > adverse[k]:
+                break
+            # Manager cooldown between suggestions, in simulated time
+            if seq.current_step > 1 and time - seq.signals[-1].time < martingale.cooldown_minutes * MINUTE_MS:
+                break
+            fill = sign * max(sign * trigger, opens[k])
+            should_add, suggestion = martingale.should_add_martingale(seq, fill)
+            if not should_add:
+                break
+            seq.add_entry(suggestion, time)
+            events.append((time, suggestion['suggested_margin']))
+
+        should_close, outcome = self._closer.check_sequence_close(seq, sign * favorable[k])
+        if should_close and outcome in WIN_OUTCOMES:
+            level = seq.current_tp2 if outcome == 'HIT_TP2' else seq.current_tp1
+            return outcome, level
+
+        return None, None
+
+    @staticmethod
+    def _open_pnl(seq: SimulatedSequence, price: float) -> float:
+        """Unrealized PnL of the sequence at price"""
+        sign = 1 if seq.direction == TradeDirection.SHORT else -1
+        pnl_pct = sign * (seq.weighted_avg_entry - price) / seq.weighted_avg_entry
+        return seq.total_margin * (seq.total_leverage or 20) * pnl_pct
+
+    @contextmanager
+    def _quiet_logs(self):
+        """Raise strategy/manager loggers to WARNING for the duration of a run"""
+        if not self.quiet:
+            yield
+            return
+        names = {type(self.strategy).__module__, MartingaleManager.__module__}
+        loggers = [logging.getLogger(name) for name in names]
+        levels = [log.level for log in loggers]
+        for log in loggers:
+            log.setLevel(logging.WARNING)
+        try:
+            yield
+        finally:
+            for log, level in zip(loggers, levels):
+                log.setLevel(level)
+
+
+def _first_touch(adverse: np.ndarray, favorable: np.ndarray, start: int, stop: int,
+                 up_level: float, down_level: float) -> Optional[int]:
+    """
+    First bar in [start, stop) with adverse >= up_level or favorable <= down_level
+
+    Searches in doubling chunks so cost is proportional to the bars the
+    sequence actually stays open.
+    """
+    size = 256
+    while start < stop:
+        end = min(start + size, stop)
+        hit = (adverse[start:end] >= up_level) | (favorable[start:end] <= down_level)
+        found = np.flatnonzero(hit)
+        if found.size:
+            return start + int(found[0])
+        start = end
+        size = min(size * 2, 65536)
+    return None
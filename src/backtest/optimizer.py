@@ -0,0 +1,254 @@
+"""
+Parameter Optimizer - Grid / random search of backtests over a process pool
+
+Kline data is copied once into a multiprocessing shared memory block;
+every worker maps it read-only and builds zero-copy DataFrame views, so
+a sweep uses every core without pickling the market data per run.
+"""
+
+import itertools
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .engine import BacktestEngine
+from ..strategies.data_driven_short_strategy import DataDrivenShortStrategy
+from ..strategies.martingale_manager import MartingaleManager
+
+logger = logging.getLogger(__name__)
+
+KLINE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+# Sweepable parameters -> attribute on the strategy / MartingaleManager argument
+STRATEGY_PARAMS = {
+    'tp1_percent': 'tp1_percent',
+    'tp2_percent': 'tp2_percent',
+    'sl_percent': 'sl_percent',
+    'min_confidence': 'min_confidence',
+    'rsi_overbought': 'rsi_overbought',
+    'symbol_boost': 'symbol_boost',
+}
+MARTINGALE_PARAMS = {
+    'trigger_percent': 'trigger_percent',
+    'step1_multiplier': 'step1_multiplier',
+    'step2_plus_multiplier': 'step2_plus_multiplier',
+    'max_steps': 'max_steps',
+    'martingale_tp1_percent': 'tp1_percent',
+    'martingale_tp2_percent': 'tp2_percent',
+}
+
+# Hardcoded values from DataDrivenShortStrategy / MartingaleManager and neighbours
+DEFAULT_GRID = {
+    'tp1_percent': [6, 8, 10],
+    'tp2_percent': [10, 13, 16],
+    'sl_percent': [3, 5, 8],
+    'min_confidence': [0.7, 0.75, 0.85],
+    'symbol_boost_scale': [0.0, 1.0],
+    'trigger_percent': [10, 15, 20],
+    'step1_multiplier': [2.0, 2.5, 3.0],
+    'step2_plus_multiplier': [1.2, 1.35, 1.5],
+}
+
+
+def default_constraint(params: Dict) -> bool:
+    """Skip combinations where TP2 is not beyond TP1"""
+    tp1, tp2 = params.get('tp1_percent'), params.get('tp2_percent')
+    return tp1 is None or tp2 is None or tp2 > tp1
+
+
+def build_strategy(params: Dict) -> DataDrivenShortStrategy:
+    """DataDrivenShortStrategy with swept parameters applied"""
+    strategy = DataDrivenShortStrategy(enable_martingale=True)
+    for name, attr in STRATEGY_PARAMS.items():
+        if name in params:
+            setattr(strategy, attr, params[name])
+
+    if 'symbol_boost_scale' in params:
+        scale = params['symbol_boost_scale']
+        strategy.symbol_boost = {s: b * scale for s, b in strategy.symbol_boost.items()}
+
+    # Signals carry the sequence parameters too
+    for name in ('trigger_percent', 'step1_multiplier', 'step2_plus_multiplier'):
+        if name in params:
+            setattr(strategy, 'martingale_trigger_pct' if name == 'trigger_percent' else name, params[name])
+    if 'max_steps' in params:
+        strategy.max_martingale_steps = params['max_steps']
+
+    return strategy
+
+
+def build_martingale(params: Dict) -> MartingaleManager:
+    """MartingaleManager with swept parameters applied"""
+    kwargs = {arg: params[name] for name, arg in MARTINGALE_PARAMS.items() if name in params}
+    return MartingaleManager(**kwargs)
+
+
+# ==================== WORKER ====================
+
+# Per-process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(shm_name: str, layout: Dict, interval: str, engine_kwargs: Dict):
+    """Attach shared klines and build read-only DataFrame views"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = np.ndarray(layout['shape'], dtype=np.float64, buffer=shm.buf)
+    buffer.flags.writeable = False
+
+    klines = {}
+    for symbol, (start, rows) in layout['symbols'].items():
+        klines[symbol] = pd.DataFrame(buffer[start:start + rows], columns=KLINE_COLUMNS, copy=False)
+
+    # Silence per-run INFO logs (manager init, strategy init) in workers
+    logging.getLogger().setLevel(logging.WARNING)
+
+    _worker.update({
+        'shm': shm,  # Keep mapping alive
+        'klines': klines,
+        'interval': interval,
+        'engine_kwargs': engine_kwargs,
+        'condition_cache': {},
+    })
+
+
+def _run_combo(params: Dict) -> Dict:
+    """Backtest one parameter combination in a worker"""
+    try:
+        engine = BacktestEngine(
+            build_strategy(params),
+            build_martingale(params),
+            interval=_worker['interval'],
+            condition_cache=_worker['condition_cache'],
+            **_worker['engine_kwargs']
+        )
+        summary = engine.run(_worker['klines']).summary()
+        summary.pop('steps', None)
+        return {**params, **summary, 'error': None}
+    except Exception as e:
+        logger.error(f"Backtest failed for {params}: {e}")
+        return {**params, 'error': str(e)}
+
+
+# ==================== OPTIMIZER ====================
+
+class ParameterOptimizer:
+    """
+    Fan backtests of parameter combinations out over a ProcessPoolExecutor
+
+    Returns a DataFrame with one row per combination (parameters plus
+    BacktestResult.summary() metrics), ranked by `rank_by`.
+    """
+
+    def __init__(self, klines: Dict[str, pd.DataFrame], interval: str = '1m',
+                 max_workers: Optional[int] = None, rank_by: str = 'total_pnl',
+                 ascending: bool = False, engine_kwargs: Optional[Dict] = None,
+                 constraint: Optional[Callable[[Dict], bool]] = default_constraint):
+        """
+        Initialize optimizer
+
+        Args:
+            klines: symbol -> DataFrame with time, open, high, low, close (volume optional)
+            interval: Kline timeframe of the data
+            max_workers: Worker processes (default: all cores)
+            rank_by: Summary metric to rank by
+            ascending: Rank ascending (e.g. for max_drawdown)
+            engine_kwargs: Extra BacktestEngine arguments (e.g. sequence_stop_loss)
+            constraint: Predicate that filters out invalid combinations
+        """
+        self.klines = klines
+        self.interval = interval
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.rank_by = rank_by
+        self.ascending = ascending
+        self.engine_kwargs = engine_kwargs or {}
+        self.constraint = constraint
+
+    def grid_search(self, grid: Optional[Dict[str, List]] = None) -> pd.DataFrame:
+        """Backtest every combination of the grid values"""
+        grid = grid or DEFAULT_GRID
+        names = list(grid)
+        combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+        return self.evaluate(combos)
+
+    def random_search(self, space: Optional[Dict] = None, n_iter: int = 100,
+                      seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Backtest n_iter random combinations
+
+        Args:
+            space: name -> list of choices, or (low, high) tuple sampled uniformly
+            n_iter: Number of combinations
+            seed: Random seed
+        """
+        space = space or DEFAULT_GRID
+        rng = random.Random(seed)
+
+        combos, attempts = [], 0
+        while len(combos) < n_iter and attempts < n_iter * 20:
+            attempts += 1
+            params = {
+                name: rng.uniform(*values) if isinstance(values, tuple) else rng.choice(values)
+                for name, values in space.items()
+            }
+            if self.constraint is None or self.constraint(params):
+                combos.append(params)
+        return self.evaluate(combos)
+
+    def evaluate(self, combos: List[Dict]) -> pd.DataFrame:
+        """Backtest the given combinations in parallel and rank them"""
+        if self.constraint:
+            combos = [c for c in combos if self.constraint(c)]
+        if not combos:
+            return pd.DataFrame()
+
+        shm, layout = self._share_klines()
+        try:
+            workers = min(self.max_workers, len(combos))
+            chunksize = max(1, len(combos) // (workers * 4))
+            logger.info(f"Optimizing {len(combos)} combinations on {workers} workers")
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shm.name, layout, self.interval, self.engine_kwargs)
+            ) as executor:
+                rows = list(executor.map(_run_combo, combos, chunksize=chunksize))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        results = pd.DataFrame(rows)
+        failed = results['error'].notna().sum()
+        if failed:
+            logger.warning(f"{failed} combinations failed")
+        if self.rank_by in results.columns:
+            results = results.sort_values(self.rank_by, ascending=self.ascending, na_position='last')
+        results = results.reset_index(drop=True)
+        results.index.name = 'rank'
+        return results
+
+    def _share_klines(self):
+        """Copy all klines into one shared memory block"""
+        sizes = {symbol: len(df) for symbol, df in self.klines.items()}
+        total = sum(sizes.values())
+        shape = (total, len(KLINE_COLUMNS))
+
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        buffer = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+        symbols, start = {}, 0
+        for symbol, df in self.klines.items():
+            rows = sizes[symbol]
+            for i, col in enumerate(KLINE_COLUMNS):
+                # time in ms is exact in float64 (< 2**53)
+                buffer[start:start + rows, i] = df[col].to_numpy(dtype=float) if col in df.columns else 0.0
+            symbols[symbol] = (start, rows)
+            start += rows
+
+        return shm, {'shape': shape, 'symbols': symbols}
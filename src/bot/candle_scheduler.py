@@ -0,0 +1,207 @@
+"""
+Candle Scheduler - Run strategy evaluation on candle closes instead of a fixed timer
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from ..utils.timeframes import interval_to_ms, candle_open_ms
+
+logger = logging.getLogger(__name__)
+
+# Evaluation triggers
+STARTUP = 'startup'
+CANDLE_CLOSE = 'candle_close'
+INTRABAR = 'intrabar'
+
+
+class CandleScheduler:
+    """
+    Decide when the market scan should run
+
+    - Once when a candle of `interval` closes (plus a short delay so the
+      exchange has published the final candle). A kline update from the
+      market stream with a newer open time fires the close early.
+    - Optionally between closes, for only the symbols whose price moved
+      at least `intrabar_move_pct` since they were last evaluated.
+
+    Everything else is skipped: with 4h candles and the old 5 minute
+    timer, 47 of every 48 scans saw unchanged closed candles.
+    """
+
+    def __init__(self, interval: str = '4h', close_delay: float = 5.0,
+                 intrabar_move_pct: Optional[float] = None, intrabar_cooldown: float = 60.0,
+                 baseline_poll: float = 300.0):
+        """
+        Initialize candle scheduler
+
+        Args:
+            interval: Kline timeframe the strategy evaluates
+            close_delay: Seconds to wait after a candle boundary
+            intrabar_move_pct: Price move % that triggers an intrabar scan
+                of that symbol (None or 0 disables intrabar scans)
+            intrabar_cooldown: Min seconds between intrabar scans
+            baseline_poll: Fixed timer the scheduler replaces, used only
+                to count skipped evaluations
+        """
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.close_delay = close_delay
+        self.intrabar_move_pct = intrabar_move_pct or None
+        self.intrabar_cooldown = intrabar_cooldown
+        self.baseline_poll = baseline_poll
+
+        self.market_stream = None
+        self._symbols: Set[str] = set()
+        self._last_prices: Dict[str, float] = {}
+        self._reference: Dict[str, float] = {}  # Price at last evaluation
+        self._moved: Set[str] = set()
+
+        self._started = False
+        self._last_boundary = candle_open_ms(self._now_ms(), interval)
+        self._early_boundary: Optional[int] = None
+        self._last_eval_at = time.time()
+        self._wakeup = asyncio.Event()
+
+        # Stats
+        self.candle_evaluations = 0
+        self.intrabar_evaluations = 0
+        self.skipped = 0  # Fixed-timer scans avoided
+        self.ignored_ticks = 0  # Price updates below the intrabar threshold
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    # ==================== MARKET STREAM ====================
+
+    def attach(self, market_stream):
+        """Listen to kline updates (early close detection + intrabar moves)"""
+        self.market_stream = market_stream
+        market_stream.add_kline_listener(self.on_kline)
+        for symbol in self._symbols:
+            market_stream.subscribe_kline(symbol, self.interval)
+
+    def watch(self, symbols: Iterable[str]):
+        """Set the symbols being scanned (kline subscriptions follow)"""
+        wanted = set(symbols)
+        if self.market_stream:
+            for symbol in wanted - self._symbols:
+                self.market_stream.subscribe_kline(symbol, self.interval)
+            for symbol in self._symbols - wanted:
+                self.market_stream.unsubscribe_kline(symbol, self.interval)
+
+        for symbol in self._symbols - wanted:
+            self._last_prices.pop(symbol, None)
+            self._reference.pop(symbol, None)
+            self._moved.discard(symbol)
+        self._symbols = wanted
+
+    def on_kline(self, symbol: str, interval: str, kline: Dict):
+        """Market stream kline listener"""
+        if interval != self.interval:
+            return
+
+        open_time = kline.get('T')
+        if open_time is not None and int(open_time) > self._last_boundary:
+            # Exchange already opened the next candle
+            self._early_boundary = int(open_time)
+            self._wakeup.set()
+
+        close = kline.get('c')
+        if close is not None:
+            self.on_price(symbol, float(close))
+
+    def on_price(self, symbol: str, price: float):
+        """Record a price and flag the symbol if it moved enough"""
+        if symbol not in self._symbols:
+            return
+        self._last_prices[symbol] = price
+
+        reference = self._reference.get(symbol)
+        if reference is None:
+            self._reference[symbol] = price
+            return
+        if not self.intrabar_move_pct or reference <= 0:
+            return
+
+        move_pct = abs(price / reference - 1) * 100
+        if move_pct >= self.intrabar_move_pct:
+            if symbol not in self._moved:
+                logger.debug(f"{symbol}: moved {move_pct:.2f}% intrabar")
+                self._moved.add(symbol)
+                self._wakeup.set()
+        else:
+            self.ignored_ticks += 1
+
+    # ==================== SCHEDULING ====================
+
+    def seconds_until_close(self) -> float:
+        """Seconds until the next candle-close evaluation is due"""
+        due = (self._last_boundary + self.interval_ms) / 1000 + self.close_delay
+        return max(due - time.time(), 0.0)
+
+    async def wait(self) -> Tuple[str, Optional[Set[str]]]:
+        """
+        Sleep until the next evaluation is due
+
+        Returns:
+            (trigger, symbols): symbols is None when every symbol should be
+            scanned (startup / candle close), else the set that moved intrabar
+        """
+        if not self._started:
+            self._started = True
+            return self._fire(STARTUP)
+
+        while True:
+            now = time.time()
+            closed = candle_open_ms(int((now - self.close_delay) * 1000), self.interval)
+            if closed > self._last_boundary or self._early_boundary is not None:
+                self._last_boundary = max(closed, self._early_boundary or 0)
+                self._early_boundary = None
+                return self._fire(CANDLE_CLOSE)
+
+            timeout = self.seconds_until_close()
+            if self._moved:
+                cooldown_left = self._last_eval_at + self.intrabar_cooldown - now
+                if cooldown_left <= 0:
+                    return self._fire(INTRABAR, self._moved)
+                timeout = min(timeout, cooldown_left)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, trigger: str, moved: Optional[Set[str]] = None) -> Tuple[str, Optional[Set[str]]]:
+        """Account for an evaluation and reset reference prices"""
+        now = time.time()
+        if self.baseline_poll:
+            self.skipped += max(int((now - self._last_eval_at) // self.baseline_poll) - 1, 0)
+        self._last_eval_at = now
+
+        if moved is None:
+            self.candle_evaluations += int(trigger == CANDLE_CLOSE)
+            self._reference = dict(self._last_prices)
+            self._moved = set()
+            return trigger, None
+
+        self.intrabar_evaluations += 1
+        moved = set(moved)
+        for symbol in moved:
+            if symbol in self._last_prices:
+                self._reference[symbol] = self._last_prices[symbol]
+        self._moved -= moved
+        return trigger, moved
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            'candle_evaluations': self.candle_evaluations,
+            'intrabar_evaluations': self.intrabar_evaluations,
+            'skipped': self.skipped,
+            'ignored_ticks': self.ignored_ticks,
+        }
@@ -0,0 +1,149 @@
+"""
+Market Scanner - Concurrent kline fetch và strategy evaluation
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from ..api.kline_cache import KlineCache
+from ..api.rate_limiter import TokenBucket, kline_weight
+
+logger = logging.getLogger(__name__)
+
+
+class MarketScanner:
+    """
+    Scan many symbols in parallel without blocking the event loop
+
+    - Works with AsyncBingXClient natively; a sync BingXClient and the
+      indicator math run in worker threads
+    - A semaphore bounds how many symbols are in flight at once
+    - A shared token bucket keeps the request rate under BingX limits
+    - Candles come from a rolling KlineCache, so repeat scans only fetch
+      the candles that changed
+    """
+
+    def __init__(self, bingx_client, strategy, interval: str = '4h', limit: int = 200,
+                 max_concurrency: int = 10, rate_limiter: Optional[TokenBucket] = None,
+                 kline_cache: Optional[KlineCache] = None, batch_mode: bool = False):
+        """
+        Initialize market scanner
+
+        Args:
+            bingx_client: BingX API client
+            strategy: Strategy with generate_signal(market_data)
+            interval: Kline timeframe to scan
+            limit: Number of candles per symbol
+            max_concurrency: Max symbols processed at the same time
+            rate_limiter: Shared limiter (default: 10 requests/second, or none when
+                the client already throttles through a RequestBudget)
+            kline_cache: Shared candle cache (default: private cache of `limit` candles)
+            batch_mode: Evaluate all symbols in one vectorized call when the
+                strategy supports generate_signals_batch
+        """
+        self.bingx = bingx_client
+        self.strategy = strategy
+        self.interval = interval
+        self.limit = limit
+        self.max_concurrency = max_concurrency
+        if rate_limiter is None and getattr(bingx_client, 'rate_budget', None) is None:
+            rate_limiter = TokenBucket(10.0, name='scanner')
+        self.rate_limiter = rate_limiter
+        self.kline_cache = kline_cache or KlineCache(bingx_client, max_candles=limit)
+        self.batch_mode = batch_mode and hasattr(strategy, 'generate_signals_batch')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Stats from last scan
+        self.last_scan_stats = {}
+
+    async def scan(self, symbols: List[str]) -> List[Dict]:
+        """
+        Fetch and evaluate all symbols concurrently
+
+        Args:
+            symbols: Symbols to scan
+
+        Returns:
+            List of generated signals (in the same order as symbols)
+        """
+        started = time.monotonic()
+
+        if self.batch_mode:
+            results = await self._scan_batch(symbols)
+        else:
+            results = await asyncio.gather(
+                *(self._scan_symbol(symbol) for symbol in symbols),
+                return_exceptions=True
+            )
+
+        signals = []
+        errors = 0
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                errors += 1
+                logger.error(f"Error processing {symbol}: {result}")
+            elif result:
+                signals.append(result)
+
+        elapsed = time.monotonic() - started
+        self.last_scan_stats = {
+            'symbols': len(symbols),
+            'signals': len(signals),
+            'errors': errors,
+            'duration_seconds': round(elapsed, 2),
+        }
+
+        logger.info(
+            f"Scan finished: {len(symbols)} symbols in {elapsed:.1f}s "
+            f"({len(signals)} signals, {errors} errors)"
+        )
+
+        return signals
+
+    async def _scan_batch(self, symbols: List[str]) -> List:
+        """Fetch all symbols, then score them in one vectorized strategy call"""
+        frames = await asyncio.gather(
+            *(self._fetch_symbol(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+
+        market_data_list = [
+            {'symbol': symbol, 'interval': self.interval, 'klines': df}
+            for symbol, df in zip(symbols, frames)
+            if not isinstance(df, Exception) and df is not None and not df.empty
+        ]
+        batch_signals = await asyncio.to_thread(self.strategy.generate_signals_batch, market_data_list)
+        by_symbol = {signal['symbol']: signal for signal in batch_signals}
+
+        # Same shape as the per-symbol path: one entry per symbol
+        return [df if isinstance(df, Exception) else by_symbol.get(symbol)
+                for symbol, df in zip(symbols, frames)]
+
+    async def _fetch_symbol(self, symbol: str):
+        """Fetch up-to-date klines for one symbol through the cache"""
+        async with self._semaphore:
+            fetch_limit = self.kline_cache.next_fetch_limit(symbol, self.interval)
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(kline_weight(fetch_limit))
+            df = await self.kline_cache.get(symbol, self.interval)
+
+        if df is None or df.empty:
+            logger.debug(f"{symbol}: No kline data")
+        return df
+
+    async def _scan_symbol(self, symbol: str) -> Optional[Dict]:
+        """Fetch klines and run strategy for one symbol"""
+        df = await self._fetch_symbol(symbol)
+        if df is None or df.empty:
+            return None
+
+        market_data = {
+            'symbol': symbol,
+            'interval': self.interval,
+            'klines': df
+        }
+
+        # Indicator math is CPU work - keep it off the event loop
+        return await asyncio.to_thread(self.strategy.generate_signal, market_data)
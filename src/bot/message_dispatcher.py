@@ -0,0 +1,328 @@
+"""
+Message Dispatcher - Background queue for outbound Telegram messages
+
+Producers (scanner, tracker) enqueue without awaiting the Telegram API.
+A small pool of workers drains the queue, at most one send per chat at a
+time so each chat sees its messages in order:
+
+- Bounded priority queue: signals before notifications before reports;
+  when full, the lowest-priority newest message is dropped.
+- Rate limits: one global TokenBucket (Telegram allows ~30 msg/s per bot)
+  plus one per chat (~1 msg/s). A chat waiting for its bucket does not
+  hold up other chats.
+- Bursts of coalescible messages for one chat are merged into a single
+  message (up to Telegram's 4096 character limit).
+- Flood-wait (RetryAfter) pauses the buckets for the requested time and
+  requeues the message; timeouts are retried, other errors dropped and
+  reported to `on_error` (e.g. to unsubscribe a chat that blocked the bot).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from telegram.error import TimedOut
+
+from ..api.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Priorities (lower is sent first)
+HIGH = 0    # New signals
+NORMAL = 1  # Closes, martingale suggestions
+LOW = 2     # Reports, startup messages
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+class _Outgoing:
+    """One queued message"""
+
+    __slots__ = ('chat_id', 'text', 'priority', 'seq', 'coalesce', 'parse_mode', 'enqueued_at', 'attempts')
+
+    def __init__(self, chat_id, text: str, priority: int, seq: int, coalesce: bool, parse_mode: Optional[str]):
+        self.chat_id = chat_id
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.coalesce = coalesce
+        self.parse_mode = parse_mode
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+    def __lt__(self, other: '_Outgoing') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Flood-wait from a RetryAfter error (int seconds or timedelta), else None"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is None:
+        return None
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class MessageDispatcher:
+    """Rate-limited priority queue in front of a send coroutine"""
+
+    def __init__(self, send: Callable[..., Awaitable], max_queue: int = 1000,
+                 global_rate: float = 25.0, chat_rate: float = 1.0, chat_burst: float = 3.0,
+                 max_retries: int = 5, latency_window: int = 1000, concurrency: int = 8,
+                 on_error: Optional[Callable[..., Awaitable]] = None):
+        """
+        Initialize dispatcher
+
+        Args:
+            send: async send(chat_id, text, parse_mode) that raises on failure
+            max_queue: Maximum queued messages across all chats
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second per chat
+            chat_burst: Messages a chat may send back to back
+            max_retries: Attempts per message on flood-wait / timeout
+            latency_window: Recent sends kept for latency percentiles
+            concurrency: Sends in flight at once (different chats)
+            on_error: async on_error(chat_id, error) for messages that failed permanently
+        """
+        self.send = send
+        self.max_queue = max_queue
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.on_error = on_error
+
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate, name='telegram')
+        self._chat_buckets: Dict[object, TokenBucket] = {}
+        self._queues: Dict[object, List[_Outgoing]] = {}
+        self._size = 0
+        self._seq = itertools.count()
+        self._in_flight = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self.is_running = False
+
+        # Stats
+        self.enqueued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    # ==================== PRODUCERS ====================
+
+    def enqueue(self, chat_id, text: str, priority: int = NORMAL, coalesce: bool = True,
+                parse_mode: Optional[str] = 'HTML') -> bool:
+        """
+        Queue a message (never blocks)
+
+        Returns:
+            False if the message was dropped (queue full of higher priority messages, or stopped)
+        """
+        if self._closed:
+            logger.warning("Message dispatcher stopped, dropping message")
+            self.dropped += 1
+            return False
+
+        message = _Outgoing(chat_id, text, priority, next(self._seq), coalesce, parse_mode)
+        if self._size >= self.max_queue and not self._evict_for(message):
+            logger.warning(f"Message queue full ({self._size}), dropping priority {priority} message")
+            self.dropped += 1
+            return False
+
+        self._push(message)
+        self.enqueued += 1
+        self._wakeup.set()
+        return True
+
+    def _push(self, message: _Outgoing):
+        heapq.heappush(self._queues.setdefault(message.chat_id, []), message)
+        self._size += 1
+
+    def _evict_for(self, message: _Outgoing) -> bool:
+        """Drop the worst queued message if `message` outranks it"""
+        worst_chat, worst = None, None
+        for chat_id, queue in self._queues.items():
+            candidate = max(queue)
+            if worst is None or worst < candidate:
+                worst_chat, worst = chat_id, candidate
+        if worst is None or not message < worst:
+            return False
+
+        queue = self._queues[worst_chat]
+        queue.remove(worst)
+        heapq.heapify(queue)
+        if not queue:
+            del self._queues[worst_chat]
+        self._size -= 1
+        self.dropped += 1
+        logger.warning(f"Message queue full, evicted priority {worst.priority} message for chat {worst_chat}")
+        return True
+
+    # ==================== WORKER ====================
+
+    def start(self):
+        """Start the background workers (call from the event loop)"""
+        if not self._tasks:
+            self.is_running = True
+            self._closed = False
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+            logger.info(f"Message dispatcher started ({self.concurrency} workers)")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop accepting messages and flush what is queued (up to `timeout` seconds)"""
+        self._closed = True
+        self.is_running = False
+        self._wakeup.set()
+        if not self._tasks:
+            return
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*self._tasks), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Message dispatcher stopped with {self._size} unsent messages")
+        self._tasks = []
+        logger.info("Message dispatcher stopped")
+
+    async def _run(self):
+        while self.is_running or self._size:
+            ready = self._next_ready()
+            if ready is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_wait())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            chat_id = ready[0]
+            try:
+                await self._deliver(*ready)
+            except Exception as e:
+                logger.error(f"Message dispatcher error: {e}", exc_info=True)
+            finally:
+                # The chat's next message may go now
+                self._in_flight.discard(chat_id)
+                self._wakeup.set()
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(
+                self.chat_rate, capacity=self.chat_burst, name=f"telegram chat {chat_id}"
+            )
+        return bucket
+
+    def _next_ready(self):
+        """(chat_id, messages) for the best head among idle chats whose bucket has a token"""
+        best = None
+        for chat_id, queue in self._queues.items():
+            if (best is None or queue[0] < best[0]) and chat_id not in self._in_flight \
+                    and self._chat_bucket(chat_id).available_in() == 0:
+                best = (queue[0], chat_id)
+        if best is None:
+            return None
+
+        chat_id = best[1]
+        queue = self._queues[chat_id]
+        messages = [heapq.heappop(queue)]
+        length = len(messages[0].text)
+
+        # Merge the chat's backlog into this send while it fits
+        while queue and messages[0].coalesce and queue[0].coalesce \
+                and queue[0].parse_mode == messages[0].parse_mode \
+                and length + 2 + len(queue[0].text) <= MAX_MESSAGE_LENGTH:
+            length += 2 + len(queue[0].text)
+            messages.append(heapq.heappop(queue))
+
+        if not queue:
+            del self._queues[chat_id]
+        self._size -= len(messages)
+        self._in_flight.add(chat_id)
+        return chat_id, messages
+
+    def _next_wait(self) -> Optional[float]:
+        """Seconds until some idle queued chat has a token (None = wait for a wakeup)"""
+        waits = [
+            self._chat_bucket(chat_id).available_in()
+            for chat_id in self._queues if chat_id not in self._in_flight
+        ]
+        return max(min(waits), 0.01) if waits else None
+
+    async def _deliver(self, chat_id, messages: List[_Outgoing]):
+        text = '\n\n'.join(m.text for m in messages)
+        chat_bucket = self._chat_bucket(chat_id)
+        chat_bucket.reserve()
+        await self.global_bucket.acquire()
+
+        try:
+            await self.send(chat_id, text, messages[0].parse_mode)
+        except Exception as e:
+            retry_after = _retry_after_seconds(e)
+            if retry_after is None and not isinstance(e, TimedOut):
+                logger.error(f"Failed to send message to {chat_id}: {e}")
+                self.failed += len(messages)
+                if self.on_error:
+                    try:
+                        await self.on_error(chat_id, e)
+                    except Exception as handler_error:
+                        logger.error(f"Message error handler failed for {chat_id}: {handler_error}")
+                return
+
+            for m in messages:
+                m.attempts += 1
+            if messages[0].attempts > self.max_retries:
+                logger.error(f"Giving up on message to {chat_id} after {self.max_retries} retries: {e}")
+                self.failed += len(messages)
+                return
+
+            if retry_after is not None:
+                # Flood-wait applies to the bot, not just this chat
+                self.global_bucket.penalize(retry_after)
+                chat_bucket.penalize(retry_after)
+            self.retries += 1
+            for m in messages:
+                self._push(m)
+            return
+
+        now = time.monotonic()
+        for m in messages:
+            self._latencies.append(now - m.enqueued_at)
+        self.sent += len(messages)
+        self.coalesced += len(messages) - 1
+
+    # ==================== STATS ====================
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages waiting to be sent"""
+        return self._size
+
+    def stats(self) -> Dict:
+        """Counters plus enqueue-to-send latency percentiles (seconds)"""
+        latencies = sorted(self._latencies)
+
+        def percentile(q):
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)] if latencies else 0.0
+
+        return {
+            'queued': self._size,
+            'enqueued': self.enqueued,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'retries': self.retries,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
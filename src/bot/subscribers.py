@@ -0,0 +1,62 @@
+"""
+Subscribers - Registry of chats/channels that receive broadcast signals
+
+Persisted in the subscribers table; the set of chat ids is kept in memory
+so a broadcast never touches the database. Writes run in a worker thread.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberRegistry:
+    """In-memory view of active subscribers, written through to the DB"""
+
+    def __init__(self, db_manager):
+        """
+        Initialize registry
+
+        Args:
+            db_manager: DatabaseManager (add/remove/get_active_subscribers)
+        """
+        self.db = db_manager
+        self._chat_ids = set()
+
+    def load(self) -> int:
+        """Read active subscribers from the DB; returns how many"""
+        self._chat_ids = {s.chat_id for s in self.db.get_active_subscribers()}
+        logger.info(f"Loaded {len(self._chat_ids)} signal subscribers")
+        return len(self._chat_ids)
+
+    def chat_ids(self) -> List[str]:
+        """Active subscriber chat ids"""
+        return list(self._chat_ids)
+
+    def __contains__(self, chat_id) -> bool:
+        return str(chat_id) in self._chat_ids
+
+    def __len__(self) -> int:
+        return len(self._chat_ids)
+
+    async def subscribe(self, chat_id, title: Optional[str] = None) -> bool:
+        """Add a subscriber; returns False if it was already subscribed"""
+        chat_id = str(chat_id)
+        if chat_id in self._chat_ids:
+            return False
+        await asyncio.to_thread(self.db.add_subscriber, chat_id, title)
+        self._chat_ids.add(chat_id)
+        logger.info(f"Subscriber added: {chat_id} ({title or 'untitled'})")
+        return True
+
+    async def unsubscribe(self, chat_id, reason: Optional[str] = None) -> bool:
+        """Remove a subscriber; returns False if it was not subscribed"""
+        chat_id = str(chat_id)
+        if chat_id not in self._chat_ids:
+            return False
+        self._chat_ids.discard(chat_id)
+        await asyncio.to_thread(self.db.remove_subscriber, chat_id, reason)
+        logger.info(f"Subscriber removed: {chat_id}{f' ({reason})' if reason else ''}")
+        return True
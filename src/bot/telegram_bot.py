@@ -1,20 +1,33 @@
-import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
 from telegram import Update
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import Application, CommandHandler, ContextTypes
 from datetime import datetime
+from .message_dispatcher import MessageDispatcher, HIGH, NORMAL, LOW
+from .subscribers import SubscriberRegistry
 
 logger = logging.getLogger(__name__)
 
 class TradingSignalBot:
     """Telegram bot để gửi trading signals"""
 
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, global_rate: float = 25.0,
+                 chat_rate: float = 1.0, max_queue: int = 1000, send_concurrency: int = 8,
+                 subscribers: Optional[SubscriberRegistry] = None,
+                 admin_chat_ids: Optional[Iterable] = None):
         self.bot_token = bot_token
         self.chat_id = chat_id
+        self.subscribers = subscribers
+        # Chats allowed to manage subscriptions (default: the primary chat)
+        self.admin_chat_ids = {str(c) for c in (admin_chat_ids or [chat_id])}
         self.app = None
         self.is_running = False
+        # Outbound messages are queued; send_* never waits on the Telegram API
+        self.dispatcher = MessageDispatcher(
+            self._deliver, max_queue=max_queue, global_rate=global_rate, chat_rate=chat_rate,
+            concurrency=send_concurrency, on_error=self._on_delivery_error
+        )
 
     async def initialize(self):
         """Initialize bot application"""
@@ -24,6 +37,8 @@ class TradingSignalBot:
         self.app.add_handler(CommandHandler("start", self.cmd_start))
         self.app.add_handler(CommandHandler("status", self.cmd_status))
         self.app.add_handler(CommandHandler("help", self.cmd_help))
+        self.app.add_handler(CommandHandler("subscribe", self.cmd_subscribe))
+        self.app.add_handler(CommandHandler("unsubscribe", self.cmd_unsubscribe))
 
         logger.info("Telegram bot initialized")
 
@@ -36,6 +51,7 @@ Bot đang hoạt động và sẽ gửi tín hiệu giao dịch khi phát hiện
 
 Commands:
 /status - Kiểm tra trạng thái bot
+/subscribe - Yêu cầu nhận tín hiệu tại chat này
 /help - Xem hướng dẫn
         """
         await update.message.reply_text(welcome_msg, parse_mode='HTML')
@@ -48,6 +64,8 @@ Commands:
 ✅ Running
 ⏰ Server Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 🔄 Monitoring markets...
+📨 Queue: {self.dispatcher.queue_depth} pending, p95 latency {self.dispatcher.stats()['latency_p95']:.1f}s
+👥 Subscribers: {len(self.subscribers) if self.subscribers is not None else 0}
         """
         await update.message.reply_text(status_msg, parse_mode='HTML')
 
@@ -72,13 +90,55 @@ Bot tự động phân tích thị trường và gửi tín hiệu dựa trên:
 <b>Commands:</b>
 /start - Khởi động bot
 /status - Xem trạng thái
+/subscribe [chat_id] - Thêm chat nhận tín hiệu (admin)
+/unsubscribe - Ngừng nhận tín hiệu
 /help - Xem hướng dẫn này
         """
         await update.message.reply_text(help_msg, parse_mode='HTML')
 
+    def _is_admin(self, chat_id) -> bool:
+        return str(chat_id) in self.admin_chat_ids
+
+    async def cmd_subscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /subscribe [chat_id] command (admin chats only)"""
+        chat = update.effective_chat
+        if self.subscribers is None:
+            await update.effective_message.reply_text("Subscriptions are disabled")
+            return
+        if not self._is_admin(chat.id):
+            # Signals only go to chats an admin approved
+            logger.info(f"Subscription request from chat {chat.id} ({chat.title or chat.username})")
+            await update.effective_message.reply_text(
+                f"⛔ Subscriptions are approved by the bot admin. Ask them to run /subscribe {chat.id}"
+            )
+            return
+
+        target = context.args[0] if context.args else str(chat.id)
+        title = None if context.args else (chat.title or chat.username)
+        if await self.subscribers.subscribe(target, title):
+            await update.effective_message.reply_text(f"✅ Chat {target} subscribed to signals")
+        else:
+            await update.effective_message.reply_text(f"Chat {target} is already subscribed")
+
+    async def cmd_unsubscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /unsubscribe [chat_id] command (any chat may unsubscribe itself)"""
+        chat = update.effective_chat
+        if self.subscribers is None:
+            await update.effective_message.reply_text("Subscriptions are disabled")
+            return
+        if context.args and not self._is_admin(chat.id):
+            await update.effective_message.reply_text("⛔ Only an admin chat can unsubscribe other chats")
+            return
+
+        target = context.args[0] if context.args else str(chat.id)
+        if await self.subscribers.unsubscribe(target, 'unsubscribed by command'):
+            await update.effective_message.reply_text(f"✅ Chat {target} unsubscribed")
+        else:
+            await update.effective_message.reply_text(f"Chat {target} is not subscribed")
+
     async def send_signal(self, signal: Dict):
         """
-        Send trading signal to Telegram
+        Send trading signal to the primary chat and every subscriber
 
         Args:
             signal: Signal dictionary from strategy
@@ -86,14 +146,9 @@ Bot tự động phân tích thị trường và gửi tín hiệu dựa trên:
         try:
             message = self._format_signal_message(signal)
 
-            # Send to specified chat
-            await self.app.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode='HTML'
-            )
-
-            logger.info(f"Signal sent: {signal['side']} {signal['symbol']}")
+            # Rendered once; signals go first and are never merged
+            queued = self._broadcast(message, priority=HIGH, coalesce=False)
+            logger.info(f"Signal queued for {queued} chats: {signal['side']} {signal['symbol']}")
 
         except Exception as e:
             logger.error(f"Failed to send signal: {e}")
@@ -262,22 +317,52 @@ Close ALL positions in sequence when TP/SL hit.
 
         return message.strip()
 
-    async def send_message(self, message: str):
+    async def send_message(self, message: str, priority: int = NORMAL, broadcast: bool = False):
         """
         Generic send message method for notifications
 
         Args:
             message: HTML formatted message string
+            priority: Dispatcher priority (bursts of notifications may be merged)
+            broadcast: Also send to subscribers (signal follow-ups), not just the primary chat
         """
-        try:
-            await self.app.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode='HTML'
-            )
-            logger.debug("Message sent successfully")
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}", exc_info=True)
+        if broadcast:
+            self._broadcast(message, priority=priority)
+        elif self.dispatcher.enqueue(self.chat_id, message, priority=priority):
+            logger.debug("Message queued")
+
+    def _recipients(self) -> List[str]:
+        """Primary chat first, then subscribers (deduplicated)"""
+        recipients = [str(self.chat_id)]
+        if self.subscribers is not None:
+            recipients.extend(c for c in self.subscribers.chat_ids() if c != recipients[0])
+        return recipients
+
+    def _broadcast(self, message: str, priority: int = NORMAL, coalesce: bool = True) -> int:
+        """
+        Queue one rendered message for every recipient
+
+        Each chat has its own queue and rate limit in the dispatcher, and sends
+        run concurrently, so a slow or failing chat does not delay the others.
+
+        Returns:
+            Number of chats the message was queued for
+        """
+        return sum(
+            self.dispatcher.enqueue(chat_id, message, priority=priority, coalesce=coalesce)
+            for chat_id in self._recipients()
+        )
+
+    async def _deliver(self, chat_id, text: str, parse_mode: Optional[str]):
+        """Dispatcher send callback (errors propagate for retry handling)"""
+        await self.app.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+
+    async def _on_delivery_error(self, chat_id, error: Exception):
+        """Drop subscribers that blocked the bot or no longer exist"""
+        if self.subscribers is None or str(chat_id) == str(self.chat_id):
+            return
+        if isinstance(error, Forbidden) or (isinstance(error, BadRequest) and 'chat not found' in str(error).lower()):
+            await self.subscribers.unsubscribe(chat_id, str(error))
 
     async def send_analysis_report(self, report: str):
         """Send trade analysis report"""
@@ -287,20 +372,12 @@ Close ALL positions in sequence when TP/SL hit.
             if len(report) > max_length:
                 chunks = [report[i:i+max_length] for i in range(0, len(report), max_length)]
                 for chunk in chunks:
-                    await self.app.bot.send_message(
-                        chat_id=self.chat_id,
-                        text=f"<pre>{chunk}</pre>",
-                        parse_mode='HTML'
-                    )
-                    await asyncio.sleep(1)
+                    # Paced by the dispatcher's per-chat rate limit
+                    self.dispatcher.enqueue(self.chat_id, f"<pre>{chunk}</pre>", priority=LOW, coalesce=False)
             else:
-                await self.app.bot.send_message(
-                    chat_id=self.chat_id,
-                    text=f"<pre>{report}</pre>",
-                    parse_mode='HTML'
-                )
+                self.dispatcher.enqueue(self.chat_id, f"<pre>{report}</pre>", priority=LOW, coalesce=False)
 
-            logger.info("Analysis report sent")
+            logger.info("Analysis report queued")
 
         except Exception as e:
             logger.error(f"Failed to send report: {e}")
@@ -309,12 +386,18 @@ Close ALL positions in sequence when TP/SL hit.
         """Start the bot"""
         await self.app.initialize()
         await self.app.start()
+        # Receive commands (/status, /subscribe, ...)
+        await self.app.updater.start_polling()
+        self.dispatcher.start()
         self.is_running = True
         logger.info("Telegram bot started")
 
     async def stop(self):
         """Stop the bot"""
+        await self.dispatcher.stop()
         if self.app:
+            if self.app.updater and self.app.updater.running:
+                await self.app.updater.stop()
             await self.app.stop()
             await self.app.shutdown()
         self.is_running = False
@@ -0,0 +1,149 @@
+"""
+Active State - Write-through in-memory cache of open signals and sequences
+
+The tracker used to reload every active sequence (with its signals) and
+every active signal from the DB each minute, although only the bot itself
+changes them. ActiveStateStore is loaded once, kept current by the
+database managers' state events (create/close), and reconciled against
+the DB on a slow interval to catch writes made outside this process.
+
+State events (emitted after commit, see DatabaseManager.add_state_listener):
+    signal_created   BotSignal
+    signals_closed   list of signal ids
+    sequence_created PositionSequence
+    sequence_updated PositionSequence
+    sequence_closed  PositionSequence
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import BotSignal, PositionSequence, SequenceStatus
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_CREATED = 'signal_created'
+SIGNALS_CLOSED = 'signals_closed'
+SEQUENCE_CREATED = 'sequence_created'
+SEQUENCE_UPDATED = 'sequence_updated'
+SEQUENCE_CLOSED = 'sequence_closed'
+
+
+class ActiveStateStore:
+    """
+    Active standalone signals and active sequences, keyed by id
+
+    Signals that belong to a sequence live in that sequence's `signals`
+    collection, the way the tracker and MartingaleManager read them.
+    Events may arrive from worker threads (sync DatabaseManager), so all
+    access goes through a lock; readers get list snapshots.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signals: Dict[int, BotSignal] = {}
+        self._sequences: Dict[int, PositionSequence] = {}
+        self._pending: Optional[List] = None  # Events seen while a reload is in flight
+        self.loaded = False
+        self.version = 0  # Bumped on every change, for caches derived from the state
+
+    def signals(self) -> List[BotSignal]:
+        """Active standalone signals"""
+        with self._lock:
+            return list(self._signals.values())
+
+    def sequences(self) -> List[PositionSequence]:
+        """Active sequences (signals loaded)"""
+        with self._lock:
+            return list(self._sequences.values())
+
+    # ==================== RELOAD ====================
+
+    def start_reload(self):
+        """Begin recording events; call before reading the DB snapshot"""
+        with self._lock:
+            self._pending = []
+
+    def finish_reload(self, signals: Iterable[BotSignal], sequences: Iterable[PositionSequence]) -> Dict:
+        """
+        Replace the state with a DB snapshot, then replay events that raced the read
+
+        Args:
+            signals: Active signals (sequence members are ignored)
+            sequences: Active sequences with signals eagerly loaded
+
+        Returns:
+            Drift between the cache and the DB (0s when the cache was current)
+        """
+        fresh_signals = {s.id: s for s in signals if s.sequence_id is None}
+        fresh_sequences = {s.id: s for s in sequences}
+
+        with self._lock:
+            drift = {
+                'signals_added': len(fresh_signals.keys() - self._signals.keys()),
+                'signals_removed': len(self._signals.keys() - fresh_signals.keys()),
+                'sequences_added': len(fresh_sequences.keys() - self._sequences.keys()),
+                'sequences_removed': len(self._sequences.keys() - fresh_sequences.keys()),
+            }
+            pending, self._pending = self._pending or [], None
+
+            self._signals = fresh_signals
+            self._sequences = fresh_sequences
+            self.version += 1
+            for event, payload in pending:
+                self._apply(event, payload)
+
+        if self.loaded and any(drift.values()):
+            logger.warning(f"Active state drifted from DB, reconciled: {drift}")
+        self.loaded = True
+        return drift
+
+    # ==================== EVENTS ====================
+
+    def on_db_event(self, event: str, payload):
+        """State listener registered on the database manager"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event, payload))
+            self._apply(event, payload)
+
+    def _apply(self, event: str, payload):
+        self.version += 1
+        if event == SIGNAL_CREATED:
+            self._add_signal(payload)
+        elif event == SIGNALS_CLOSED:
+            for signal_id in payload:
+                self._signals.pop(signal_id, None)
+        elif event in (SEQUENCE_CREATED, SEQUENCE_UPDATED):
+            self._put_sequence(payload)
+        elif event == SEQUENCE_CLOSED:
+            self._sequences.pop(payload.id, None)
+
+    def _add_signal(self, signal: BotSignal):
+        if signal.status != 'ACTIVE':
+            return
+        if signal.sequence_id is None:
+            self._signals[signal.id] = signal
+            return
+
+        sequence = self._sequences.get(signal.sequence_id)
+        if sequence is not None:
+            members = [s for s in sequence.signals if s.id != signal.id]
+            set_committed_value(sequence, 'signals', members + [signal])
+
+    def _put_sequence(self, sequence: PositionSequence):
+        if sequence.status != SequenceStatus.ACTIVE:
+            self._sequences.pop(sequence.id, None)
+            return
+
+        # Returned objects are detached: carry the members over instead of lazy-loading
+        cached = self._sequences.get(sequence.id)
+        loaded = inspect(sequence).dict.get('signals')
+        if loaded is None:
+            loaded = list(cached.signals) if cached is not None else []
+        set_committed_value(sequence, 'signals', list(loaded))
+        self._sequences[sequence.id] = sequence
@@ -0,0 +1,138 @@
+"""
+Async database manager - DatabaseManager operations on SQLAlchemy asyncio
+
+Same signatures as DatabaseManager but awaitable, so commits no longer
+block the event loop. Write operations reuse DatabaseManager's session
+helpers through AsyncSession.run_sync, so the business logic (weighted
+averages, PnL, TP/SL closes) lives in one place.
+
+Requires an async driver: aiosqlite (SQLite) or asyncpg (PostgreSQL).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from .active_state import (
+    SIGNAL_CREATED, SIGNALS_CLOSED, SEQUENCE_CREATED, SEQUENCE_UPDATED, SEQUENCE_CLOSED
+)
+from .connection import create_async_db_engine
+from .db_manager import DatabaseManager, StateEvents
+from .models import Base, BotSignal, PositionSequence, SequenceStatus
+
+
+class AsyncDatabaseManager(StateEvents):
+    """Quản lý database operations (asyncio)"""
+
+    def __init__(self, database_url='sqlite:///signala.db', pool_size: int = 5):
+        super().__init__()
+        self.engine = create_async_db_engine(database_url, pool_size=pool_size)
+        # Objects are handed back after the session closes
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def init(self):
+        """Create missing tables"""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def close(self):
+        """Dispose pooled connections"""
+        await self.engine.dispose()
+
+    # ==================== BOT SIGNALS ====================
+
+    async def create_signal(self, signal_data: Dict, sequence_id: Optional[int] = None) -> BotSignal:
+        """Tạo signal mới khi bot gửi"""
+        async with self.Session() as session:
+            signal = await session.run_sync(DatabaseManager._add_signal, signal_data, sequence_id)
+            await session.commit()
+            self._notify(SIGNAL_CREATED, signal)
+            return signal
+
+    async def update_signal_prices(self, prices: Dict[int, float]) -> List[BotSignal]:
+        """Batched price update; returns the signals that closed (see DatabaseManager)"""
+        if not prices:
+            return []
+
+        async with self.Session() as session:
+            closed = await session.run_sync(DatabaseManager._apply_signal_prices, prices)
+            await session.commit()
+            if closed:
+                self._notify(SIGNALS_CLOSED, [signal.id for signal in closed])
+            return closed
+
+    async def get_active_signals(self) -> List[BotSignal]:
+        """Get all active signals để track"""
+        async with self.Session() as session:
+            result = await session.execute(select(BotSignal).filter_by(status='ACTIVE'))
+            return list(result.scalars())
+
+    async def get_signal_by_id(self, signal_id: int) -> Optional[BotSignal]:
+        """Get signal by ID (with result loaded for close notifications)"""
+        async with self.Session() as session:
+            result = await session.execute(
+                select(BotSignal).options(selectinload(BotSignal.result)).filter_by(id=signal_id)
+            )
+            return result.scalars().first()
+
+    # ==================== POSITION SEQUENCES (MARTINGALE) ====================
+
+    async def create_sequence(self, signal_data: Dict) -> PositionSequence:
+        """Create new position sequence from INITIAL signal"""
+        async with self.Session() as session:
+            sequence = await session.run_sync(DatabaseManager._add_sequence, signal_data)
+            await session.commit()
+            self._notify(SEQUENCE_CREATED, sequence)
+            return sequence
+
+    async def add_martingale_to_sequence(self, sequence_id: int, entry_price: float, margin: float,
+                                         leverage: Optional[float] = None) -> PositionSequence:
+        """Add martingale entry to sequence and recalculate weighted avg + TPs"""
+        async with self.Session() as session:
+            sequence = await session.run_sync(
+                DatabaseManager._apply_martingale, sequence_id, entry_price, margin, leverage
+            )
+            await session.commit()
+            self._notify(SEQUENCE_UPDATED, sequence)
+            return sequence
+
+    async def get_active_sequences(self) -> List[PositionSequence]:
+        """Get all active position sequences with eagerly loaded signals"""
+        async with self.Session() as session:
+            result = await session.execute(
+                select(PositionSequence)
+                .options(selectinload(PositionSequence.signals))
+                .filter_by(status=SequenceStatus.ACTIVE)
+            )
+            return list(result.scalars())
+
+    async def get_sequence_by_id(self, sequence_id: int) -> Optional[PositionSequence]:
+        """Get sequence by ID with eagerly loaded signals"""
+        async with self.Session() as session:
+            result = await session.execute(
+                select(PositionSequence)
+                .options(selectinload(PositionSequence.signals))
+                .filter_by(id=sequence_id)
+            )
+            return result.scalars().first()
+
+    async def close_sequence(self, sequence_id: int, exit_price: float, outcome: str) -> PositionSequence:
+        """Close position sequence and calculate final PnL"""
+        async with self.Session() as session:
+            sequence = await session.run_sync(
+                DatabaseManager._apply_sequence_close, sequence_id, exit_price, outcome
+            )
+            await session.commit()
+            self._notify(SEQUENCE_CLOSED, sequence)
+            return sequence
+
+    async def update_sequence_martingale_suggestion_time(self, sequence_id: int):
+        """Update last martingale suggestion time to prevent spam"""
+        async with self.Session() as session:
+            sequence = await session.get(PositionSequence, sequence_id)
+            if sequence:
+                sequence.last_martingale_suggestion_at = datetime.utcnow()
+                await session.commit()
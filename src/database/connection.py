@@ -0,0 +1,118 @@
+"""
+Connection management - Tuned engines and one cached sessionmaker per engine
+
+SQLite files are opened in WAL mode with synchronous=NORMAL and a busy
+timeout, so readers never block the writer and concurrent writers wait
+for the lock instead of failing with "database is locked". New files are
+created with incremental auto_vacuum so retention can return freed pages
+without a full VACUUM.
+"""
+
+import logging
+import weakref
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+logger = logging.getLogger(__name__)
+
+_session_factories = weakref.WeakKeyDictionary()
+
+
+def create_db_engine(database_url: str = 'sqlite:///signala.db', pool_size: int = 5,
+                     max_overflow: int = 10, busy_timeout: float = 30.0,
+                     journal_mode: str = 'WAL', synchronous: str = 'NORMAL') -> Engine:
+    """
+    Create a pooled engine
+
+    Args:
+        database_url: SQLAlchemy database URL
+        pool_size: Connections kept open in the pool
+        max_overflow: Extra connections allowed under load
+        busy_timeout: Seconds SQLite waits for a lock before raising
+        journal_mode: SQLite journal mode (WAL lets reads run during writes)
+        synchronous: SQLite sync level (NORMAL is durable in WAL mode except on power loss)
+
+    Returns:
+        SQLAlchemy engine
+    """
+    url = make_url(database_url)
+
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+
+    if not url.database or url.database == ':memory:':
+        # One shared connection, otherwise each connection gets its own empty DB
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+
+    engine = create_engine(
+        url,
+        connect_args={'check_same_thread': False, 'timeout': busy_timeout},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    _configure_sqlite(engine, busy_timeout, journal_mode, synchronous)
+    return engine
+
+
+def async_database_url(database_url: str) -> URL:
+    """Map a sync database URL onto its asyncio driver (aiosqlite / asyncpg)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+    if backend == 'postgresql':
+        return url.set(drivername='postgresql+asyncpg')
+    return url
+
+
+def create_async_db_engine(database_url: str = 'sqlite:///signala.db', pool_size: int = 5,
+                           max_overflow: int = 10, busy_timeout: float = 30.0,
+                           journal_mode: str = 'WAL', synchronous: str = 'NORMAL'):
+    """create_db_engine() for SQLAlchemy asyncio (same SQLite tuning)"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(database_url)
+
+    if url.get_backend_name() != 'sqlite':
+        return create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+
+    if not url.database or url.database == ':memory:':
+        return create_async_engine(url, poolclass=StaticPool)
+
+    engine = create_async_engine(
+        url,
+        connect_args={'timeout': busy_timeout},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    _configure_sqlite(engine.sync_engine, busy_timeout, journal_mode, synchronous)
+    return engine
+
+
+def _configure_sqlite(engine: Engine, busy_timeout: float, journal_mode: str, synchronous: str):
+    """Apply PRAGMAs to every new SQLite connection"""
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # Only takes effect before the first table exists; existing files
+            # are converted by migrations/enable_incremental_vacuum.py
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        finally:
+            cursor.close()
+
+
+def session_factory(engine: Engine) -> sessionmaker:
+    """The sessionmaker for an engine (created once, then reused)"""
+    factory = _session_factories.get(engine)
+    if factory is None:
+        factory = sessionmaker(bind=engine)
+        _session_factories[engine] = factory
+    return factory
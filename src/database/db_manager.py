@@ -2,24 +2,60 @@
 Database manager - CRUD operations và business logic
 """
 
+import logging
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from .models import (
     Base, UserTrade, BotSignal, SignalResult, SignalPriceUpdate,
-    Strategy, PerformanceMetric, PositionSequence,
+    Strategy, PerformanceMetric, PositionSequence, Subscriber,
     TradeDirection, SequenceStatus, SignalType,
     init_db, get_session
 )
+from .connection import session_factory
+from .active_state import (
+    SIGNAL_CREATED, SIGNALS_CLOSED, SEQUENCE_CREATED, SEQUENCE_UPDATED, SEQUENCE_CLOSED
+)
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+# Tracker outcomes (HIT_*) -> sequence status
+SEQUENCE_OUTCOME_STATUS = {
+    'HIT_TP1': SequenceStatus.CLOSED_TP1,
+    'HIT_TP2': SequenceStatus.CLOSED_TP2,
+    'HIT_SL': SequenceStatus.CLOSED_SL,
+    'EXPIRED': SequenceStatus.EXPIRED,
+}
+
+
+class StateEvents:
+    """State listeners for writes that change the set of active signals/sequences"""
+
+    def __init__(self):
+        self._state_listeners: List[Callable] = []
+
+    def add_state_listener(self, callback: Callable):
+        """Register callback(event, payload), called after commit (see active_state)"""
+        self._state_listeners.append(callback)
+
+    def _notify(self, event: str, payload):
+        for callback in self._state_listeners:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                logger.error(f"State listener error on {event}: {e}", exc_info=True)
+
 
-class DatabaseManager:
+class DatabaseManager(StateEvents):
     """Quản lý database operations"""
 
-    def __init__(self, database_url='sqlite:///signala.db'):
-        self.engine = init_db(database_url)
-        self.Session = lambda: get_session(self.engine)
+    def __init__(self, database_url='sqlite:///signala.db', pool_size: int = 5):
+        super().__init__()
+        self.engine = init_db(database_url, pool_size=pool_size)
+        self.Session = session_factory(self.engine)
 
     # ==================== USER TRADES ====================
 
@@ -149,37 +185,44 @@ class DatabaseManager:
         """Tạo signal mới khi bot gửi"""
         session = self.Session()
         try:
-            signal = BotSignal(
-                symbol=signal_data['symbol'],
-                direction=signal_data['side'],
-                entry_price=signal_data['entry_price'],
-                stop_loss=signal_data['stop_loss'],
-                take_profit_1=signal_data['take_profit_1'],
-                take_profit_2=signal_data['take_profit_2'],
-                confidence=signal_data.get('confidence', 0.5),
-                strategy_name=signal_data.get('strategy', 'Unknown'),
-                rsi=signal_data.get('indicators', {}).get('rsi'),
-                macd=signal_data.get('indicators', {}).get('macd'),
-                recommended_leverage=signal_data.get('recommended_leverage', 20),
-                recommended_margin=signal_data.get('recommended_margin', 10),
-                status='ACTIVE',
-                telegram_message_id=signal_data.get('telegram_message_id'),
-                chat_id=signal_data.get('chat_id'),
-                # Martingale fields
-                signal_type=SignalType[signal_data.get('signal_type', 'STANDALONE')],
-                sequence_id=sequence_id,
-                step_number=signal_data.get('step_number', 1),
-                actual_margin=signal_data.get('actual_margin', signal_data.get('recommended_margin', 10))
-            )
-
-            session.add(signal)
+            signal = self._add_signal(session, signal_data, sequence_id)
             session.commit()
             session.refresh(signal)
 
+            self._notify(SIGNAL_CREATED, signal)
             return signal
         finally:
             session.close()
 
+    @staticmethod
+    def _add_signal(session: Session, signal_data: Dict, sequence_id: Optional[int] = None) -> BotSignal:
+        """Add a new BotSignal to the session (caller commits)"""
+        signal = BotSignal(
+            symbol=signal_data['symbol'],
+            direction=signal_data['side'],
+            entry_price=signal_data['entry_price'],
+            stop_loss=signal_data['stop_loss'],
+            take_profit_1=signal_data['take_profit_1'],
+            take_profit_2=signal_data['take_profit_2'],
+            confidence=signal_data.get('confidence', 0.5),
+            strategy_name=signal_data.get('strategy', 'Unknown'),
+            rsi=signal_data.get('indicators', {}).get('rsi'),
+            macd=signal_data.get('indicators', {}).get('macd'),
+            recommended_leverage=signal_data.get('recommended_leverage', 20),
+            recommended_margin=signal_data.get('recommended_margin', 10),
+            status='ACTIVE',
+            telegram_message_id=signal_data.get('telegram_message_id'),
+            chat_id=signal_data.get('chat_id'),
+            # Martingale fields
+            signal_type=SignalType[signal_data.get('signal_type', 'STANDALONE')],
+            sequence_id=sequence_id,
+            step_number=signal_data.get('step_number', 1),
+            actual_margin=signal_data.get('actual_margin', signal_data.get('recommended_margin', 10))
+        )
+
+        session.add(signal)
+        return signal
+
     def update_signal_price(self, signal_id: int, current_price: float):
         """Cập nhật giá hiện tại cho signal"""
         session = self.Session()
@@ -188,27 +231,10 @@ class DatabaseManager:
             if not signal:
                 return None
 
-            # Calculate distances
-            price_change_pct = ((current_price - signal.entry_price) / signal.entry_price) * 100
-
-            if signal.direction == 'SHORT':
-                price_change_pct = -price_change_pct
-
-            distance_to_sl = abs(((signal.stop_loss - current_price) / current_price) * 100)
-            distance_to_tp1 = abs(((signal.take_profit_1 - current_price) / current_price) * 100)
-            distance_to_tp2 = abs(((signal.take_profit_2 - current_price) / current_price) * 100)
-
             # Create price update
-            update = SignalPriceUpdate(
-                signal_id=signal_id,
-                current_price=current_price,
-                price_change_pct=price_change_pct,
-                distance_to_sl_pct=distance_to_sl,
-                distance_to_tp1_pct=distance_to_tp1,
-                distance_to_tp2_pct=distance_to_tp2
-            )
-
+            update = SignalPriceUpdate(**self._price_update_row(signal, current_price))
             session.add(update)
+            self._track_price_extremes(signal, current_price)
 
             # Check if hit TP/SL
             outcome = self._check_signal_outcome(signal, current_price)
@@ -216,12 +242,96 @@ class DatabaseManager:
                 self._close_signal(session, signal, current_price, outcome)
 
             session.commit()
+            if outcome:
+                self._notify(SIGNALS_CLOSED, [signal_id])
             return update
 
         finally:
             session.close()
 
-    def _check_signal_outcome(self, signal: BotSignal, current_price: float) -> Optional[str]:
+    def update_signal_prices(self, prices: Dict[int, float]) -> List[BotSignal]:
+        """
+        Batched update_signal_price for many active signals
+
+        Loads all signals in one query, bulk-inserts the price rows, closes
+        those that hit TP/SL/expiry and commits once.
+
+        Args:
+            prices: signal_id -> current price
+
+        Returns:
+            Signals closed by this update (detached, with result loaded)
+        """
+        if not prices:
+            return []
+
+        session = self.Session()
+        # Closed signals are handed back after the session closes
+        session.expire_on_commit = False
+        try:
+            closed = self._apply_signal_prices(session, prices)
+            session.commit()
+            if closed:
+                self._notify(SIGNALS_CLOSED, [signal.id for signal in closed])
+            return closed
+
+        finally:
+            session.close()
+
+    @classmethod
+    def _apply_signal_prices(cls, session: Session, prices: Dict[int, float]) -> List[BotSignal]:
+        """Price rows + TP/SL closes for update_signal_prices (caller commits)"""
+        ids = list(prices)
+        signals = []
+        for i in range(0, len(ids), 500):  # Stay under SQLite's bound-parameter limit
+            signals.extend(
+                session.query(BotSignal)
+                .filter(BotSignal.id.in_(ids[i:i + 500]), BotSignal.status == 'ACTIVE')
+                .all()
+            )
+
+        session.bulk_insert_mappings(
+            SignalPriceUpdate,
+            [cls._price_update_row(signal, prices[signal.id]) for signal in signals]
+        )
+
+        closed = []
+        for signal in signals:
+            cls._track_price_extremes(signal, prices[signal.id])
+            outcome = cls._check_signal_outcome(signal, prices[signal.id])
+            if outcome:
+                cls._close_signal(session, signal, prices[signal.id], outcome)
+                closed.append(signal)
+        return closed
+
+    @staticmethod
+    def _price_update_row(signal: BotSignal, current_price: float) -> Dict:
+        """SignalPriceUpdate column values for a signal at current_price"""
+        # Calculate distances
+        price_change_pct = ((current_price - signal.entry_price) / signal.entry_price) * 100
+
+        if signal.direction == 'SHORT':
+            price_change_pct = -price_change_pct
+
+        return {
+            'signal_id': signal.id,
+            'current_price': current_price,
+            'price_change_pct': price_change_pct,
+            'distance_to_sl_pct': abs(((signal.stop_loss - current_price) / current_price) * 100),
+            'distance_to_tp1_pct': abs(((signal.take_profit_1 - current_price) / current_price) * 100),
+            'distance_to_tp2_pct': abs(((signal.take_profit_2 - current_price) / current_price) * 100),
+        }
+
+    @staticmethod
+    def _track_price_extremes(signal: BotSignal, current_price: float):
+        """Fold a price into the signal's running high/low"""
+        if signal.max_price_reached is None or current_price > signal.max_price_reached:
+            signal.max_price_reached = current_price
+        if signal.min_price_reached is None or current_price < signal.min_price_reached:
+            signal.min_price_reached = current_price
+
+    @staticmethod
+    def _check_signal_outcome(signal: BotSignal, current_price: float) -> Optional[str]:
         """Check if signal hit TP or SL"""
         if signal.direction == 'LONG':
             # LONG: giá tăng lên TP, giảm xuống SL
@@ -246,7 +356,8 @@ class DatabaseManager:
 
         return None
 
-    def _close_signal(self, session: Session, signal: BotSignal, exit_price: float, outcome: str):
+    @staticmethod
+    def _close_signal(session: Session, signal: BotSignal, exit_price: float, outcome: str):
         """Close signal và tạo result"""
         # Update signal status
         signal.status = 'CLOSED'
@@ -264,11 +375,16 @@ class DatabaseManager:
 
         is_win = outcome in ['HIT_TP1', 'HIT_TP2']
 
-        # Get price range
-        price_updates = session.query(SignalPriceUpdate).filter_by(signal_id=signal.id).all()
-        prices = [u.current_price for u in price_updates]
-        max_price = max(prices) if prices else exit_price
-        min_price = min(prices) if prices else exit_price
+        # Get price range (running values; one aggregate query for signals
+        # created before they were tracked)
+        max_price, min_price = signal.max_price_reached, signal.min_price_reached
+        if max_price is None or min_price is None:
+            max_price, min_price = session.query(
+                func.max(SignalPriceUpdate.current_price),
+                func.min(SignalPriceUpdate.current_price)
+            ).filter(SignalPriceUpdate.signal_id == signal.id).one()
+        max_price = max_price if max_price is not None else exit_price
+        min_price = min_price if min_price is not None else exit_price
 
         # Create result
         result = SignalResult(
@@ -286,6 +402,7 @@ class DatabaseManager:
             is_win=is_win
         )
 
+        signal.result = result
         session.add(result)
 
     def get_active_signals(self) -> List[BotSignal]:
@@ -297,10 +414,13 @@ class DatabaseManager:
             session.close()
 
     def get_signal_by_id(self, signal_id: int) -> Optional[BotSignal]:
-        """Get signal by ID"""
+        """Get signal by ID (with result loaded for close notifications)"""
+        from sqlalchemy.orm import joinedload
         session = self.Session()
         try:
-            return session.query(BotSignal).filter_by(id=signal_id).first()
+            return session.query(BotSignal).options(
+                joinedload(BotSignal.result)
+            ).filter_by(id=signal_id).first()
         finally:
             session.close()
 
@@ -318,44 +438,51 @@ class DatabaseManager:
         """
         session = self.Session()
         try:
-            # Convert direction string to enum
-            direction = TradeDirection.SHORT if signal_data['side'] == 'SHORT' else TradeDirection.LONG
-
-            # Get initial parameters
-            entry_price = signal_data['entry_price']
-            margin = signal_data.get('recommended_margin', 20)
-            leverage = signal_data.get('recommended_leverage', 20)
-
-            # Initially, weighted avg = first entry
-            sequence = PositionSequence(
-                symbol=signal_data['symbol'],
-                direction=direction,
-                status=SequenceStatus.ACTIVE,
-                current_step=1,
-                max_steps=signal_data.get('max_steps', 5),
-                first_entry_price=entry_price,
-                last_entry_price=entry_price,
-                weighted_avg_entry=entry_price,  # Initially same as first entry
-                total_margin=margin,
-                total_leverage=leverage,
-                current_tp1=signal_data.get('take_profit_1'),
-                current_tp2=signal_data.get('take_profit_2'),
-                current_sl=signal_data.get('stop_loss'),
-                trigger_percent=signal_data.get('trigger_percent', 15.0),
-                step1_multiplier=signal_data.get('step1_multiplier', 2.5),
-                step2_plus_multiplier=signal_data.get('step2_plus_multiplier', 1.35),
-                strategy_name=signal_data.get('strategy', 'Unknown'),
-                confidence=signal_data.get('confidence', 0.5)
-            )
-
-            session.add(sequence)
+            sequence = self._add_sequence(session, signal_data)
             session.commit()
             session.refresh(sequence)
 
+            self._notify(SEQUENCE_CREATED, sequence)
             return sequence
         finally:
             session.close()
 
+    @staticmethod
+    def _add_sequence(session: Session, signal_data: Dict) -> PositionSequence:
+        """Add a new PositionSequence to the session (caller commits)"""
+        # Convert direction string to enum
+        direction = TradeDirection.SHORT if signal_data['side'] == 'SHORT' else TradeDirection.LONG
+
+        # Get initial parameters
+        entry_price = signal_data['entry_price']
+        margin = signal_data.get('recommended_margin', 20)
+        leverage = signal_data.get('recommended_leverage', 20)
+
+        # Initially, weighted avg = first entry
+        sequence = PositionSequence(
+            symbol=signal_data['symbol'],
+            direction=direction,
+            status=SequenceStatus.ACTIVE,
+            current_step=1,
+            max_steps=signal_data.get('max_steps', 5),
+            first_entry_price=entry_price,
+            last_entry_price=entry_price,
+            weighted_avg_entry=entry_price,  # Initially same as first entry
+            total_margin=margin,
+            total_leverage=leverage,
+            current_tp1=signal_data.get('take_profit_1'),
+            current_tp2=signal_data.get('take_profit_2'),
+            current_sl=signal_data.get('stop_loss'),
+            trigger_percent=signal_data.get('trigger_percent', 15.0),
+            step1_multiplier=signal_data.get('step1_multiplier', 2.5),
+            step2_plus_multiplier=signal_data.get('step2_plus_multiplier', 1.35),
+            strategy_name=signal_data.get('strategy', 'Unknown'),
+            confidence=signal_data.get('confidence', 0.5)
+        )
+
+        session.add(sequence)
+        return sequence
+
     def add_martingale_to_sequence(
         self,
         sequence_id: int,
@@ -377,49 +504,56 @@ class DatabaseManager:
         """
         session = self.Session()
         try:
-            sequence = session.query(PositionSequence).filter_by(id=sequence_id).first()
-            if not sequence:
-                raise ValueError(f"Sequence {sequence_id} not found")
-
-            if sequence.status != SequenceStatus.ACTIVE:
-                raise ValueError(f"Sequence {sequence_id} is not active")
-
-            # Recalculate weighted average
-            current_total_value = sequence.weighted_avg_entry * sequence.total_margin
-            new_total_value = current_total_value + (entry_price * margin)
-            new_total_margin = sequence.total_margin + margin
-            new_weighted_avg = new_total_value / new_total_margin
-
-            # Recalculate TPs from new weighted avg
-            if sequence.direction == TradeDirection.SHORT:
-                # SHORT: TP below entry
-                new_tp1 = new_weighted_avg * 0.90  # -10%
-                new_tp2 = new_weighted_avg * 0.85  # -15%
-            else:  # LONG
-                # LONG: TP above entry
-                new_tp1 = new_weighted_avg * 1.10  # +10%
-                new_tp2 = new_weighted_avg * 1.15  # +15%
-
-            # Update sequence
-            sequence.current_step += 1
-            sequence.last_entry_price = entry_price
-            sequence.weighted_avg_entry = new_weighted_avg
-            sequence.total_margin = new_total_margin
-            sequence.current_tp1 = new_tp1
-            sequence.current_tp2 = new_tp2
-
-            if leverage:
-                sequence.total_leverage = leverage
-
-            sequence.updated_at = datetime.utcnow()
-
+            sequence = self._apply_martingale(session, sequence_id, entry_price, margin, leverage)
             session.commit()
             session.refresh(sequence)
 
+            self._notify(SEQUENCE_UPDATED, sequence)
             return sequence
         finally:
             session.close()
 
+    @staticmethod
+    def _apply_martingale(session: Session, sequence_id: int, entry_price: float, margin: float,
+                          leverage: Optional[float] = None) -> PositionSequence:
+        """Add a martingale entry to a sequence in the session (caller commits)"""
+        sequence = session.query(PositionSequence).filter_by(id=sequence_id).first()
+        if not sequence:
+            raise ValueError(f"Sequence {sequence_id} not found")
+
+        if sequence.status != SequenceStatus.ACTIVE:
+            raise ValueError(f"Sequence {sequence_id} is not active")
+
+        # Recalculate weighted average
+        current_total_value = sequence.weighted_avg_entry * sequence.total_margin
+        new_total_value = current_total_value + (entry_price * margin)
+        new_total_margin = sequence.total_margin + margin
+        new_weighted_avg = new_total_value / new_total_margin
+
+        # Recalculate TPs from new weighted avg
+        if sequence.direction == TradeDirection.SHORT:
+            # SHORT: TP below entry
+            new_tp1 = new_weighted_avg * 0.90  # -10%
+            new_tp2 = new_weighted_avg * 0.85  # -15%
+        else:  # LONG
+            # LONG: TP above entry
+            new_tp1 = new_weighted_avg * 1.10  # +10%
+            new_tp2 = new_weighted_avg * 1.15  # +15%
+
+        # Update sequence
+        sequence.current_step += 1
+        sequence.last_entry_price = entry_price
+        sequence.weighted_avg_entry = new_weighted_avg
+        sequence.total_margin = new_total_margin
+        sequence.current_tp1 = new_tp1
+        sequence.current_tp2 = new_tp2
+
+        if leverage:
+            sequence.total_leverage = leverage
+
+        sequence.updated_at = datetime.utcnow()
+        return sequence
+
     def get_active_sequences(self) -> List[PositionSequence]:
         """Get all active position sequences with eagerly loaded signals"""
         from sqlalchemy.orm import joinedload
@@ -473,66 +607,74 @@ class DatabaseManager:
         """
         session = self.Session()
         try:
-            sequence = session.query(PositionSequence).filter_by(id=sequence_id).first()
-            if not sequence:
-                raise ValueError(f"Sequence {sequence_id} not found")
-
-            # Calculate PnL from weighted average (NOT first entry!)
-            if sequence.direction == TradeDirection.SHORT:
-                # SHORT profits when price drops
-                pnl_pct = ((sequence.weighted_avg_entry - exit_price) / sequence.weighted_avg_entry) * 100
-            else:  # LONG
-                # LONG profits when price rises
-                pnl_pct = ((exit_price - sequence.weighted_avg_entry) / sequence.weighted_avg_entry) * 100
-
-            # Total PnL in USDT
-            leverage = sequence.total_leverage or 20
-            total_pnl = sequence.total_margin * leverage * (pnl_pct / 100)
-
-            # Update sequence
-            sequence.status = SequenceStatus[outcome]
-            sequence.closed_at = datetime.utcnow()
-            sequence.final_exit_price = exit_price
-            sequence.total_pnl = total_pnl
-            sequence.total_pnl_pct = pnl_pct
-            sequence.updated_at = datetime.utcnow()
-
-            # Close all signals in sequence
-            for signal in sequence.signals:
-                if signal.status == 'ACTIVE':
-                    signal.status = 'CLOSED'
-
-                    # Create result for each signal
-                    if signal.direction == 'LONG':
-                        signal_pnl_pct = ((exit_price - signal.entry_price) / signal.entry_price) * 100
-                    else:  # SHORT
-                        signal_pnl_pct = ((signal.entry_price - exit_price) / signal.entry_price) * 100
-
-                    signal_margin = signal.actual_margin or signal.recommended_margin
-                    signal_leverage = signal.recommended_leverage or 20
-                    signal_pnl = signal_margin * signal_leverage * (signal_pnl_pct / 100)
-
-                    result = SignalResult(
-                        signal_id=signal.id,
-                        outcome=outcome,
-                        actual_entry_price=signal.entry_price,
-                        actual_exit_price=exit_price,
-                        theoretical_pnl=signal_pnl,
-                        theoretical_pnl_pct=signal_pnl_pct,
-                        entry_time=signal.signal_time,
-                        exit_time=datetime.utcnow(),
-                        duration_hours=(datetime.utcnow() - signal.signal_time).total_seconds() / 3600,
-                        is_win=outcome in ['HIT_TP1', 'HIT_TP2']
-                    )
-                    session.add(result)
-
+            sequence = self._apply_sequence_close(session, sequence_id, exit_price, outcome)
             session.commit()
             session.refresh(sequence)
 
+            self._notify(SEQUENCE_CLOSED, sequence)
             return sequence
         finally:
             session.close()
 
+    @staticmethod
+    def _apply_sequence_close(session: Session, sequence_id: int, exit_price: float,
+                              outcome: str) -> PositionSequence:
+        """Close a sequence and its active signals in the session (caller commits)"""
+        sequence = session.query(PositionSequence).filter_by(id=sequence_id).first()
+        if not sequence:
+            raise ValueError(f"Sequence {sequence_id} not found")
+
+        # Calculate PnL from weighted average (NOT first entry!)
+        if sequence.direction == TradeDirection.SHORT:
+            # SHORT profits when price drops
+            pnl_pct = ((sequence.weighted_avg_entry - exit_price) / sequence.weighted_avg_entry) * 100
+        else:  # LONG
+            # LONG profits when price rises
+            pnl_pct = ((exit_price - sequence.weighted_avg_entry) / sequence.weighted_avg_entry) * 100
+
+        # Total PnL in USDT
+        leverage = sequence.total_leverage or 20
+        total_pnl = sequence.total_margin * leverage * (pnl_pct / 100)
+
+        # Update sequence
+        sequence.status = SEQUENCE_OUTCOME_STATUS.get(outcome) or SequenceStatus[outcome]
+        sequence.closed_at = datetime.utcnow()
+        sequence.final_exit_price = exit_price
+        sequence.total_pnl = total_pnl
+        sequence.total_pnl_pct = pnl_pct
+        sequence.updated_at = datetime.utcnow()
+
+        # Close all signals in sequence
+        for signal in sequence.signals:
+            if signal.status == 'ACTIVE':
+                signal.status = 'CLOSED'
+
+                # Create result for each signal
+                if signal.direction == 'LONG':
+                    signal_pnl_pct = ((exit_price - signal.entry_price) / signal.entry_price) * 100
+                else:  # SHORT
+                    signal_pnl_pct = ((signal.entry_price - exit_price) / signal.entry_price) * 100
+
+                signal_margin = signal.actual_margin or signal.recommended_margin
+                signal_leverage = signal.recommended_leverage or 20
+                signal_pnl = signal_margin * signal_leverage * (signal_pnl_pct / 100)
+
+                result = SignalResult(
+                    signal_id=signal.id,
+                    outcome=outcome,
+                    actual_entry_price=signal.entry_price,
+                    actual_exit_price=exit_price,
+                    theoretical_pnl=signal_pnl,
+                    theoretical_pnl_pct=signal_pnl_pct,
+                    entry_time=signal.signal_time,
+                    exit_time=datetime.utcnow(),
+                    duration_hours=(datetime.utcnow() - signal.signal_time).total_seconds() / 3600,
+                    is_win=outcome in ['HIT_TP1', 'HIT_TP2']
+                )
+                session.add(result)
+
+        return sequence
+
     def update_sequence_martingale_suggestion_time(self, sequence_id: int):
         """Update last martingale suggestion time to prevent spam"""
         session = self.Session()
@@ -544,6 +686,48 @@ class DatabaseManager:
         finally:
             session.close()
 
+    # ==================== SUBSCRIBERS ====================
+
+    def add_subscriber(self, chat_id, title: Optional[str] = None) -> Subscriber:
+        """Subscribe a chat/channel to signals (reactivates a previous subscription)"""
+        session = self.Session()
+        session.expire_on_commit = False
+        try:
+            subscriber = session.query(Subscriber).filter_by(chat_id=str(chat_id)).first()
+            if subscriber is None:
+                subscriber = Subscriber(chat_id=str(chat_id))
+                session.add(subscriber)
+            subscriber.is_active = True
+            subscriber.last_error = None
+            if title:
+                subscriber.title = title
+            session.commit()
+            return subscriber
+        finally:
+            session.close()
+
+    def remove_subscriber(self, chat_id, reason: Optional[str] = None) -> bool:
+        """Deactivate a subscriber; returns False if it was not subscribed"""
+        session = self.Session()
+        try:
+            subscriber = session.query(Subscriber).filter_by(chat_id=str(chat_id), is_active=True).first()
+            if subscriber is None:
+                return False
+            subscriber.is_active = False
+            subscriber.last_error = reason
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    def get_active_subscribers(self) -> List[Subscriber]:
+        """All chats/channels that receive signals"""
+        session = self.Session()
+        try:
+            return session.query(Subscriber).filter_by(is_active=True).all()
+        finally:
+            session.close()
+
     # ==================== PERFORMANCE ====================
 
     def get_bot_performance(self, days: int = 30) -> Dict:
@@ -0,0 +1,290 @@
+"""
+Kline Store - On-disk columnar candle history partitioned by symbol/interval/month
+
+Layout: {root}/{symbol}/{interval}/{YYYY-MM}/{column}.bin
+
+Each column is a raw little-endian array (time int64 ms, OHLCV float64)
+that only ever grows by appending, and is read back with np.memmap.
+Range reads inside one month return memmap slices (no copy, pages are
+loaded lazily by the OS); ranges spanning months are concatenated once.
+"""
+
+import logging
+import os
+import threading
+import time as time_module
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.timeframes import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+COLUMN_DTYPES = {
+    'time': np.dtype('<i8'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+COLUMNS = list(COLUMN_DTYPES)
+
+
+def month_key(time_ms: int) -> str:
+    """Partition name (YYYY-MM, UTC) for a candle open time"""
+    return str(np.datetime64(int(time_ms), 'ms').astype('datetime64[M]'))
+
+
+class KlineStore:
+    """
+    Append-only kline history on local disk
+
+    - append() only accepts closed candles newer than what is stored, so
+      re-ingesting overlapping pages is harmless
+    - read() / tail() return NumPy arrays keyed by column
+    - find_gaps() lists missing candle ranges (for backfills)
+    """
+
+    def __init__(self, root: Union[str, Path] = 'data/klines'):
+        """
+        Initialize kline store
+
+        Args:
+            root: Directory holding the partitions (created on first append)
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    # ==================== WRITE ====================
+
+    def append(self, symbol: str, interval: str, klines, now_ms: Optional[int] = None) -> int:
+        """
+        Append closed candles newer than the last stored candle
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline timeframe
+            klines: DataFrame or list of BingX kline dicts (time, open, high, low, close, volume)
+            now_ms: Current time; candles still open at this time are skipped
+
+        Returns:
+            Number of candles written
+        """
+        data = self._to_columns(klines)
+        if len(data['time']) == 0:
+            return 0
+
+        step = interval_to_ms(interval)
+        now_ms = now_ms if now_ms is not None else int(time_module.time() * 1000)
+
+        # Sorted, unique, closed candles only
+        times, first_idx = np.unique(data['time'], return_index=True)
+        data = {col: values[first_idx] for col, values in data.items()}
+        keep = times + step <= now_ms
+
+        with self._lock:
+            last = self.last_time(symbol, interval)
+            if last is not None:
+                keep &= times > last
+            if not keep.any():
+                return 0
+            data = {col: values[keep] for col, values in data.items()}
+
+            if last is not None and data['time'][0] > last + step:
+                logger.warning(
+                    f"{symbol} {interval}: appending after a gap "
+                    f"({(data['time'][0] - last) // step - 1} candles missing)"
+                )
+
+            months = data['time'].astype('datetime64[ms]').astype('datetime64[M]')
+            boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+            for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(months)]):
+                self._append_partition(
+                    self._partition_dir(symbol, interval, str(months[start])),
+                    {col: values[start:end] for col, values in data.items()}
+                )
+
+        return len(data['time'])
+
+    def _append_partition(self, directory: Path, data: Dict[str, np.ndarray]):
+        """Append rows to one month; time is written last so it bounds valid rows"""
+        directory.mkdir(parents=True, exist_ok=True)
+        rows = self._repair(directory)
+        for col in COLUMNS[1:] + ['time']:
+            with open(directory / f"{col}.bin", 'ab') as f:
+                f.write(np.ascontiguousarray(data[col], dtype=COLUMN_DTYPES[col]).tobytes())
+        logger.debug(f"{directory}: {rows} + {len(data['time'])} candles")
+
+    @staticmethod
+    def _repair(directory: Path) -> int:
+        """Truncate columns left longer than others by an interrupted append"""
+        lengths = {}
+        for col, dtype in COLUMN_DTYPES.items():
+            path = directory / f"{col}.bin"
+            lengths[col] = path.stat().st_size // dtype.itemsize if path.exists() else 0
+
+        rows = min(lengths.values())
+        for col, length in lengths.items():
+            if length > rows:
+                logger.warning(f"{directory}: truncating {col} from {length} to {rows} rows")
+                os.truncate(directory / f"{col}.bin", rows * COLUMN_DTYPES[col].itemsize)
+        return rows
+
+    # ==================== READ ====================
+
+    def read(self, symbol: str, interval: str, start: Optional[int] = None, end: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Read candles with start <= time <= end
+
+        Returns:
+            column -> array. Read-only memmap views when the range falls in
+            one month, concatenated arrays otherwise. Empty arrays if no data.
+        """
+        columns = list(columns or COLUMNS)
+        if 'time' not in columns:
+            columns = ['time'] + columns
+
+        parts = []
+        for month in self.partitions(symbol, interval):
+            if start is not None and month < month_key(start):
+                continue
+            if end is not None and month > month_key(end):
+                break
+
+            mapped = self._map_partition(self._partition_dir(symbol, interval, month), columns)
+            if mapped is None:
+                continue
+            times = mapped['time']
+            lo = int(np.searchsorted(times, start, side='left')) if start is not None else 0
+            hi = int(np.searchsorted(times, end, side='right')) if end is not None else len(times)
+            if hi > lo:
+                parts.append({col: values[lo:hi] for col, values in mapped.items()})
+
+        if not parts:
+            return {col: np.empty(0, dtype=COLUMN_DTYPES[col]) for col in columns}
+        if len(parts) == 1:
+            return parts[0]
+        return {col: np.concatenate([p[col] for p in parts]) for col in columns}
+
+    def read_dataframe(self, symbol: str, interval: str, start: Optional[int] = None,
+                       end: Optional[int] = None) -> pd.DataFrame:
+        """read() as a DataFrame with the usual kline columns"""
+        return pd.DataFrame(self.read(symbol, interval, start, end), columns=COLUMNS)
+
+    def tail(self, symbol: str, interval: str, n: int) -> Dict[str, np.ndarray]:
+        """Last n stored candles (walks back across months as needed)"""
+        parts, remaining = [], n
+        for month in reversed(self.partitions(symbol, interval)):
+            mapped = self._map_partition(self._partition_dir(symbol, interval, month), COLUMNS)
+            if mapped is None:
+                continue
+            take = min(remaining, len(mapped['time']))
+            parts.append({col: values[-take:] for col, values in mapped.items()})
+            remaining -= take
+            if remaining <= 0:
+                break
+
+        if not parts:
+            return {col: np.empty(0, dtype=dtype) for col, dtype in COLUMN_DTYPES.items()}
+        if len(parts) == 1:
+            return parts[0]
+        return {col: np.concatenate([p[col] for p in reversed(parts)]) for col in COLUMNS}
+
+    def last_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time of the newest stored candle"""
+        for month in reversed(self.partitions(symbol, interval)):
+            mapped = self._map_partition(self._partition_dir(symbol, interval, month), ['time'])
+            if mapped is not None:
+                return int(mapped['time'][-1])
+        return None
+
+    def first_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time of the oldest stored candle"""
+        for month in self.partitions(symbol, interval):
+            mapped = self._map_partition(self._partition_dir(symbol, interval, month), ['time'])
+            if mapped is not None:
+                return int(mapped['time'][0])
+        return None
+
+    def find_gaps(self, symbol: str, interval: str, start: Optional[int] = None,
+                  end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Missing candles as (first missing open time, last missing open time)
+
+        With start/end, missing candles before the first / after the last
+        stored candle inside that range are reported too.
+        """
+        step = interval_to_ms(interval)
+        times = self.read(symbol, interval, start, end, columns=['time'])['time']
+
+        if len(times) == 0:
+            if start is not None and end is not None and end >= start:
+                return [(start, end)]
+            return []
+
+        gaps = []
+        if start is not None and times[0] > start:
+            gaps.append((start, int(times[0]) - step))
+
+        jumps = np.flatnonzero(np.diff(times) > step)
+        gaps.extend((int(times[i]) + step, int(times[i + 1]) - step) for i in jumps)
+
+        if end is not None and times[-1] + step <= end:
+            gaps.append((int(times[-1]) + step, end))
+        return gaps
+
+    def partitions(self, symbol: str, interval: str) -> List[str]:
+        """Month partitions (YYYY-MM) stored for symbol/interval, oldest first"""
+        directory = self.root / symbol / interval
+        if not directory.is_dir():
+            return []
+        return sorted(p.name for p in directory.iterdir() if p.is_dir())
+
+    def symbols(self) -> List[str]:
+        """Symbols with stored history"""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    # ==================== HELPERS ====================
+
+    def _partition_dir(self, symbol: str, interval: str, month: str) -> Path:
+        return self.root / symbol / interval / month
+
+    @staticmethod
+    def _map_partition(directory: Path, columns: Sequence[str]) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-map the valid rows of each column (None if empty/missing)"""
+        sizes = {}
+        for col, dtype in COLUMN_DTYPES.items():
+            path = directory / f"{col}.bin"
+            if not path.exists():
+                return None
+            sizes[col] = path.stat().st_size // dtype.itemsize
+
+        rows = min(sizes.values())
+        if rows == 0:
+            return None
+        return {
+            col: np.memmap(directory / f"{col}.bin", dtype=COLUMN_DTYPES[col], mode='r', shape=(rows,))
+            for col in columns
+        }
+
+    @staticmethod
+    def _to_columns(klines) -> Dict[str, np.ndarray]:
+        """DataFrame / list of kline dicts -> typed column arrays"""
+        df = klines if isinstance(klines, pd.DataFrame) else pd.DataFrame(list(klines))
+        if df.empty:
+            return {col: np.empty(0, dtype=dtype) for col, dtype in COLUMN_DTYPES.items()}
+
+        data = {}
+        for col, dtype in COLUMN_DTYPES.items():
+            if col in df.columns:
+                data[col] = df[col].to_numpy().astype(float).astype(dtype)
+            else:
+                data[col] = np.zeros(len(df), dtype=dtype)
+        return data
@@ -2,12 +2,14 @@
 Database models cho SignalA Trading Bot
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
+from .connection import create_db_engine, session_factory
+
 Base = declarative_base()
 
 
@@ -49,6 +51,10 @@ class SequenceStatus(enum.Enum):
 class UserTrade(Base):
     """Lịch sử giao dịch thực tế của user từ BingX"""
     __tablename__ = 'user_trades'
+    __table_args__ = (
+        # get_user_trades: symbol filter + entry_time range/order
+        Index('ix_user_trades_symbol_entry_time', 'symbol', 'entry_time'),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -94,6 +100,9 @@ class UserTrade(Base):
 class PositionSequence(Base):
     """Martingale position sequence - tracks chain of related entries"""
     __tablename__ = 'position_sequences'
+    __table_args__ = (
+        Index('ix_position_sequences_status', 'status'),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -156,6 +165,13 @@ class PositionSequence(Base):
 class BotSignal(Base):
     """Tín hiệu mà bot đã gửi đi"""
     __tablename__ = 'bot_signals'
+    __table_args__ = (
+        # Tracker: active standalone signals / signals of a sequence
+        Index('ix_bot_signals_status_sequence_id', 'status', 'sequence_id'),
+        Index('ix_bot_signals_sequence_id', 'sequence_id'),
+        # Performance reports: signals since a date
+        Index('ix_bot_signals_signal_time', 'signal_time'),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -200,6 +216,10 @@ class BotSignal(Base):
     step_number = Column(Integer, default=1)
     actual_margin = Column(Float)  # Actual margin used (may differ from recommended)
 
+    # Running price extremes, updated with every price update (MFE/MAE on close)
+    max_price_reached = Column(Float)
+    min_price_reached = Column(Float)
+
     # Relationships
     sequence = relationship("PositionSequence", back_populates="signals")
     result = relationship("SignalResult", back_populates="signal", uselist=False)
@@ -212,6 +232,9 @@ class BotSignal(Base):
 class SignalResult(Base):
     """Kết quả của một signal (ăn/lỗ)"""
     __tablename__ = 'signal_results'
+    __table_args__ = (
+        Index('ix_signal_results_signal_id', 'signal_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     signal_id = Column(Integer, ForeignKey('bot_signals.id'), nullable=False)
@@ -256,6 +279,10 @@ class SignalResult(Base):
 class SignalPriceUpdate(Base):
     """Tracking giá theo thời gian thực cho mỗi signal"""
     __tablename__ = 'signal_price_updates'
+    __table_args__ = (
+        # Price history of one signal in time order
+        Index('ix_signal_price_updates_signal_id_timestamp', 'signal_id', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True)
     signal_id = Column(Integer, ForeignKey('bot_signals.id'), nullable=False)
@@ -279,6 +306,31 @@ class SignalPriceUpdate(Base):
         return f"<SignalPriceUpdate signal_id={self.signal_id} price={self.current_price}>"
 
 
+class SignalPriceSummary(Base):
+    """OHLC rollup của signal_price_updates cũ (xem database/retention.py)"""
+    __tablename__ = 'signal_price_summaries'
+    __table_args__ = (
+        Index('ix_signal_price_summaries_signal_id_bucket', 'signal_id', 'bucket_start'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    signal_id = Column(Integer, ForeignKey('bot_signals.id'), nullable=False)
+
+    # Bucket
+    bucket_start = Column(DateTime, nullable=False)
+    bucket = Column(String(10), nullable=False)  # 1h, 1d
+
+    # Prices within the bucket
+    open_price = Column(Float, nullable=False)
+    high_price = Column(Float, nullable=False)
+    low_price = Column(Float, nullable=False)
+    close_price = Column(Float, nullable=False)
+    samples = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<SignalPriceSummary signal_id={self.signal_id} {self.bucket} @ {self.bucket_start}>"
+
+
 class Strategy(Base):
     """Các strategies khác nhau"""
     __tablename__ = 'strategies'
@@ -348,15 +400,40 @@ class PerformanceMetric(Base):
         return f"<PerformanceMetric {self.period_type} {self.date}>"
 
 
+class Subscriber(Base):
+    """Telegram chat/channel nhận signals (fan-out)"""
+    __tablename__ = 'subscribers'
+    __table_args__ = (
+        Index('ix_subscribers_is_active', 'is_active'),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    # Telegram chat id (-100... for channels) or @channelusername
+    chat_id = Column(String(64), unique=True, nullable=False)
+    title = Column(String(200))
+
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Delivery errors (a chat that blocked the bot is deactivated)
+    last_error = Column(Text)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Subscriber {self.chat_id} active={self.is_active}>"
+
+
 # Database helper functions
-def init_db(database_url='sqlite:///signala.db'):
-    """Initialize database"""
-    engine = create_engine(database_url)
+def init_db(database_url='sqlite:///signala.db', **engine_options):
+    """Initialize database (engine options: see connection.create_db_engine)"""
+    engine = create_db_engine(database_url, **engine_options)
     Base.metadata.create_all(engine)
     return engine
 
 
 def get_session(engine):
     """Get database session"""
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return session_factory(engine)()
@@ -0,0 +1,209 @@
+"""
+Price Retention - Roll old signal_price_updates into OHLC summaries
+
+The tracker writes one SignalPriceUpdate per active signal per minute.
+Rows older than `raw_days` are aggregated into SignalPriceSummary rows
+(one per signal per hour/day bucket), deleted, and the freed pages are
+returned to the OS with incremental VACUUM (SQLite files created with
+auto_vacuum=INCREMENTAL; older files need
+migrations/enable_incremental_vacuum.py, which runs the one-off full
+VACUUM while the bot is stopped).
+
+Closing a signal no longer needs the raw history (running extremes live
+on BotSignal), so dropping old rows loses nothing the bot reads.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+
+from .db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Bucket -> (timedelta, SQLite strftime format, PostgreSQL date_trunc unit)
+# SQLite formats match how SQLAlchemy stores DateTime, so bucket_start compares equal
+BUCKETS = {
+    '1h': (timedelta(hours=1), '%Y-%m-%d %H:00:00.000000', 'hour'),
+    '1d': (timedelta(days=1), '%Y-%m-%d 00:00:00.000000', 'day'),
+}
+
+
+class PriceRetention:
+    """Background compaction of signal_price_updates"""
+
+    def __init__(self, db_manager: DatabaseManager, raw_days: float = 7, bucket: str = '1h',
+                 interval_hours: float = 6, chunk_hours: float = 24, vacuum: bool = True,
+                 vacuum_pages: int = 1000):
+        """
+        Initialize retention job
+
+        Args:
+            db_manager: Database manager (its engine is used directly)
+            raw_days: Keep raw per-minute rows this long
+            bucket: Summary resolution ('1h' or '1d')
+            interval_hours: Time between background runs
+            chunk_hours: Time range compacted per transaction (keeps write locks short)
+            vacuum: Return freed pages to the OS (SQLite in incremental auto_vacuum mode only)
+            vacuum_pages: Pages released per incremental_vacuum step (keeps write locks short)
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unsupported bucket: {bucket} (use one of {list(BUCKETS)})")
+
+        self.engine = db_manager.engine
+        self.raw_days = raw_days
+        self.bucket = bucket
+        self.interval_hours = interval_hours
+        # Whole buckets per chunk so no bucket is split across transactions
+        step = BUCKETS[bucket][0]
+        self.chunk = max(timedelta(hours=chunk_hours) // step, 1) * step
+        self.vacuum = vacuum
+        self.vacuum_pages = vacuum_pages
+        self._vacuum_mode_warned = False
+        self.is_running = False
+        self.last_run: Dict = {}
+
+    @property
+    def _is_sqlite(self) -> bool:
+        return self.engine.dialect.name == 'sqlite'
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Raw rows before this time are compacted (aligned to a bucket boundary)"""
+        now = now or datetime.utcnow()
+        step = BUCKETS[self.bucket][0]
+        cutoff = now - timedelta(days=self.raw_days)
+        return datetime.min + ((cutoff - datetime.min) // step) * step
+
+    # ==================== COMPACTION ====================
+
+    def compact(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Roll up and delete raw rows older than the cutoff, then vacuum
+
+        Returns:
+            Dict with rows_deleted, summaries_written, bytes_reclaimed
+        """
+        cutoff = self.cutoff(now)
+        size_before = self._database_bytes()
+        rows_deleted = summaries = 0
+
+        with self.engine.connect() as conn:
+            oldest = conn.execute(text("SELECT MIN(timestamp) FROM signal_price_updates")).scalar()
+
+        if oldest is not None:
+            start = oldest if isinstance(oldest, datetime) else datetime.fromisoformat(str(oldest))
+            start = datetime.min + ((start - datetime.min) // BUCKETS[self.bucket][0]) * BUCKETS[self.bucket][0]
+
+            while start < cutoff:
+                end = min(start + self.chunk, cutoff)
+                written, deleted = self._compact_range(start, end)
+                summaries += written
+                rows_deleted += deleted
+                start = end
+
+        if self.vacuum and self._is_sqlite and rows_deleted:
+            self._incremental_vacuum()
+
+        bytes_reclaimed = max(size_before - self._database_bytes(), 0)
+        self.last_run = {
+            'cutoff': cutoff,
+            'rows_deleted': rows_deleted,
+            'summaries_written': summaries,
+            'bytes_reclaimed': bytes_reclaimed,
+        }
+        if rows_deleted:
+            logger.info(
+                f"Price retention: {rows_deleted} raw rows -> {summaries} {self.bucket} summaries, "
+                f"{bytes_reclaimed / 1024 / 1024:.1f} MB reclaimed"
+            )
+        return self.last_run
+
+    def _compact_range(self, start: datetime, end: datetime):
+        """Aggregate and delete raw rows with start <= timestamp < end in one transaction"""
+        if self._is_sqlite:
+            bucket_expr = f"strftime('{BUCKETS[self.bucket][1]}', timestamp)"
+        else:
+            bucket_expr = f"date_trunc('{BUCKETS[self.bucket][2]}', timestamp)"
+
+        params = [bindparam('start', type_=DateTime), bindparam('end', type_=DateTime)]
+        rollup = text(f"""
+            INSERT INTO signal_price_summaries
+                (signal_id, bucket_start, bucket, open_price, high_price, low_price, close_price, samples)
+            SELECT signal_id, bucket_start, :bucket, MIN(open_price), MAX(current_price),
+                   MIN(current_price), MIN(close_price), COUNT(*)
+            FROM (
+                SELECT signal_id, current_price, {bucket_expr} AS bucket_start,
+                       FIRST_VALUE(current_price) OVER (
+                           PARTITION BY signal_id, {bucket_expr} ORDER BY timestamp, id
+                       ) AS open_price,
+                       FIRST_VALUE(current_price) OVER (
+                           PARTITION BY signal_id, {bucket_expr} ORDER BY timestamp DESC, id DESC
+                       ) AS close_price
+                FROM signal_price_updates
+                WHERE timestamp >= :start AND timestamp < :end
+            ) AS ranked
+            GROUP BY signal_id, bucket_start
+        """).bindparams(*params)
+        delete = text(
+            "DELETE FROM signal_price_updates WHERE timestamp >= :start AND timestamp < :end"
+        ).bindparams(*params)
+
+        with self.engine.begin() as conn:
+            written = conn.execute(rollup, {'start': start, 'end': end, 'bucket': self.bucket}).rowcount
+            deleted = conn.execute(delete, {'start': start, 'end': end}).rowcount
+        return written, deleted
+
+    # ==================== VACUUM ====================
+
+    def _database_bytes(self) -> int:
+        """Allocated database size (page_count * page_size); 0 when not SQLite"""
+        if not self._is_sqlite:
+            return 0
+        with self.engine.connect() as conn:
+            page_count = conn.execute(text("PRAGMA page_count")).scalar()
+            page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        return int(page_count) * int(page_size)
+
+    def _incremental_vacuum(self):
+        """Release free pages `vacuum_pages` at a time (never a full VACUUM)"""
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+                if not self._vacuum_mode_warned:
+                    logger.warning(
+                        "Database is not in incremental auto_vacuum mode; freed pages are reused but "
+                        "not returned to the OS (run migrations/enable_incremental_vacuum.py while stopped)"
+                    )
+                    self._vacuum_mode_warned = True
+                return
+
+            free = conn.execute(text("PRAGMA freelist_count")).scalar()
+            while free:
+                conn.execute(text(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})"))
+                remaining = conn.execute(text("PRAGMA freelist_count")).scalar()
+                if remaining >= free:
+                    break
+                free = remaining
+
+    # ==================== BACKGROUND ====================
+
+    async def start(self):
+        """Run compact() every interval_hours in a worker thread"""
+        self.is_running = True
+        logger.info(
+            f"Price retention started (raw: {self.raw_days}d, bucket: {self.bucket}, "
+            f"every {self.interval_hours}h)"
+        )
+
+        while self.is_running:
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.error(f"Error in price retention: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_hours * 3600)
+
+    def stop(self):
+        """Stop the background loop"""
+        self.is_running = False
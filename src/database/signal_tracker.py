@@ -3,10 +3,20 @@ Signal Tracker - Monitor active signals và update results
 """
 
 import asyncio
+import inspect
 import logging
-from typing import List, Optional
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .active_state import (
+    ActiveStateStore, SIGNAL_CREATED, SIGNALS_CLOSED, SEQUENCE_CREATED, SEQUENCE_UPDATED, SEQUENCE_CLOSED
+)
 from .db_manager import DatabaseManager
-from ..api.bingx_client import BingXClient
+from .models import SequenceStatus
+from ..strategies.trigger_index import TriggerIndex, SIGNAL, SEQUENCE
 
 logger = logging.getLogger(__name__)
 
@@ -15,19 +25,137 @@ class SignalTracker:
     """
     Track active signals và update kết quả khi hit TP/SL
     Also monitors position sequences for martingale opportunities
+
+    With a MarketDataStream attached, TP/SL and martingale triggers are
+    also evaluated on every streamed tick for the symbols being tracked.
+    In snapshot mode each cycle fetches all prices with one bulk ticker
+    call instead of one call per signal/sequence.
+
+    Active signals/sequences are served from an ActiveStateStore fed by
+    the DB manager's state events; the DB is only re-read every
+    reconcile_interval seconds. The same events keep the tick index
+    current, so a position opened between cycles is checked on its next
+    tick rather than after the next cycle.
     """
 
-    def __init__(self, db_manager: DatabaseManager, bingx_client: BingXClient,
-                 telegram_bot=None, martingale_manager=None):
+    def __init__(self, db_manager: DatabaseManager, bingx_client,
+                 telegram_bot=None, martingale_manager=None, market_stream=None,
+                 snapshot_mode: bool = True, reconcile_interval: float = 600):
         self.db = db_manager
         self.bingx = bingx_client
         self.telegram = telegram_bot
         self.martingale = martingale_manager
+        self.stream = market_stream
+        self.snapshot_mode = snapshot_mode
         self.is_running = False
 
+        # Write-through cache of what is open; reconciled against the DB periodically
+        self.state = ActiveStateStore()
+        self.db.add_state_listener(self.state.on_db_event)
+        self.reconcile_interval = reconcile_interval
+        self._next_reconcile = 0.0
+
+        # Active items from the last cycle, grouped by symbol for tick checks
+        self._signals_by_symbol: Dict[str, List] = {}
+        self._sequences_by_symbol: Dict[str, List] = {}
+        # Sorted TP/SL/martingale levels: ticks only evaluate owners whose level was crossed
+        self.triggers = TriggerIndex()
+        # Column arrays of active sequences for MartingaleManager.evaluate_batch
+        self._batch = None
+        self._eval_lock = asyncio.Lock()
+        # Events from worker threads are applied to the tick index on this loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.db.add_state_listener(self._on_state_event)
+
+        if self.stream:
+            self.stream.add_price_listener(self.on_price_tick)
+
+    async def _fetch_ticker(self, symbol: Optional[str] = None):
+        """Get ticker from an async client, or from a sync client in a worker thread"""
+        if inspect.iscoroutinefunction(self.bingx.get_ticker_price):
+            return await self.bingx.get_ticker_price(symbol)
+        return await asyncio.to_thread(self.bingx.get_ticker_price, symbol)
+
+    async def _db(self, method: str, *args):
+        """Call an AsyncDatabaseManager method, or a DatabaseManager one in a worker thread"""
+        func = getattr(self.db, method)
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    def _parse_ticker_price(ticker) -> Optional[float]:
+        """Parse price from ticker response"""
+        if not ticker:
+            return None
+
+        if isinstance(ticker, dict):
+            if 'price' in ticker:
+                return float(ticker['price'])
+            elif 'lastPrice' in ticker:
+                return float(ticker['lastPrice'])
+            logger.warning(f"Cannot parse price from ticker: {ticker}")
+        else:
+            logger.warning(f"Unexpected ticker format: {ticker}")
+        return None
+
+    async def _fetch_price_snapshot(self) -> Dict[str, float]:
+        """One bulk ticker call -> {symbol: price} for every symbol"""
+        tickers = await self._fetch_ticker(None)
+        if isinstance(tickers, dict):
+            tickers = [tickers]
+
+        prices = {}
+        for ticker in tickers or []:
+            symbol = ticker.get('symbol') if isinstance(ticker, dict) else None
+            if not symbol:
+                continue
+            price = self._parse_ticker_price(ticker)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    async def _get_prices(self, symbols) -> Dict[str, float]:
+        """
+        Resolve current prices for symbols
+
+        Streamed prices are used when fresh. Remaining symbols come from one
+        bulk snapshot in snapshot mode, or one ticker call each otherwise.
+        """
+        prices = {}
+        missing = []
+        for symbol in symbols:
+            price = self.stream.get_price(symbol) if self.stream else None
+            if price is None:
+                missing.append(symbol)
+            else:
+                prices[symbol] = price
+
+        if not missing:
+            return prices
+
+        if self.snapshot_mode:
+            snapshot = await self._fetch_price_snapshot()
+            for symbol in missing:
+                if symbol in snapshot:
+                    prices[symbol] = snapshot[symbol]
+                else:
+                    logger.warning(f"No price for {symbol} in ticker snapshot")
+        else:
+            for symbol in missing:
+                try:
+                    price = self._parse_ticker_price(await self._fetch_ticker(symbol))
+                    if price is not None:
+                        prices[symbol] = price
+                except Exception as e:
+                    logger.error(f"Error getting price for {symbol}: {e}")
+
+        return prices
+
     async def start_tracking(self):
         """Start tracking loop"""
         self.is_running = True
+        self._loop = asyncio.get_running_loop()
         logger.info("Signal tracker started")
 
         while self.is_running:
@@ -38,126 +166,251 @@ class SignalTracker:
                 logger.error(f"Error in signal tracking: {e}", exc_info=True)
                 await asyncio.sleep(60)
 
+    async def reconcile(self) -> Dict:
+        """Reload active signals/sequences from the DB into the state store"""
+        self.state.start_reload()
+        try:
+            active_signals = await self._db('get_active_signals')
+            active_sequences = await self._db('get_active_sequences') if self.martingale else []
+        except Exception:
+            self.state.finish_reload(self.state.signals(), self.state.sequences())
+            raise
+        drift = self.state.finish_reload(active_signals, active_sequences)
+        self._next_reconcile = time.monotonic() + self.reconcile_interval
+        return drift
+
     async def _check_all_active_signals(self):
-        """Check all active signals and sequences"""
-        # Check individual signals (for STANDALONE signals)
-        await self._check_individual_signals()
+        """Check all active signals and sequences against one price map"""
+        if not self.state.loaded or time.monotonic() >= self._next_reconcile:
+            await self.reconcile()
 
-        # Check sequences for martingale triggers and TP/SL
-        if self.martingale:
-            await self._check_sequences_for_martingale()
+        # Standalone signals (sequence signals are checked via their sequence)
+        standalone_signals = self.state.signals()
+        self._signals_by_symbol = self._group_by_symbol(standalone_signals)
+
+        active_sequences = self.state.sequences() if self.martingale else []
+        self._sequences_by_symbol = self._group_by_symbol(active_sequences)
+        self.triggers.rebuild(standalone_signals, active_sequences, self.martingale)
 
-    async def _check_individual_signals(self):
-        """Check standalone signals (not part of martingale sequences)"""
-        active_signals = self.db.get_active_signals()
+        symbols = set(self._signals_by_symbol) | set(self._sequences_by_symbol)
 
-        if not active_signals:
+        # Stream exactly the symbols we are tracking
+        if self.stream:
+            self.stream.set_price_symbols(symbols)
+
+        if not symbols:
             return
 
-        # Filter for standalone signals only (sequences are checked separately)
-        standalone_signals = [s for s in active_signals if s.sequence_id is None]
+        prices = await self._get_prices(symbols)
+
+        # Check individual signals (for STANDALONE signals)
+        await self._check_individual_signals(standalone_signals, prices)
+
+        # Check sequences for martingale triggers and TP/SL
+        if self.martingale:
+            await self._check_sequences_for_martingale(prices)
 
+    async def _check_individual_signals(self, standalone_signals: List, prices: Dict[str, float]):
+        """Check standalone signals (not part of martingale sequences) in one DB batch"""
         if not standalone_signals:
             return
 
         logger.info(f"Checking {len(standalone_signals)} standalone signals...")
 
-        for signal in standalone_signals:
-            try:
-                # Get current price
-                ticker = self.bingx.get_ticker_price(signal.symbol)
-
-                if not ticker:
-                    continue
-
-                # Parse price based on response format
-                if isinstance(ticker, dict):
-                    if 'price' in ticker:
-                        current_price = float(ticker['price'])
-                    elif 'lastPrice' in ticker:
-                        current_price = float(ticker['lastPrice'])
-                    else:
-                        logger.warning(f"Cannot parse price from ticker: {ticker}")
-                        continue
-                else:
-                    logger.warning(f"Unexpected ticker format: {ticker}")
-                    continue
-
-                # Store old status before update
-                old_status = signal.status
+        signal_prices = {
+            signal.id: prices[signal.symbol]
+            for signal in standalone_signals if signal.symbol in prices
+        }
 
-                # Update price and check outcome
-                self.db.update_signal_price(signal.id, current_price)
+        async with self._eval_lock:
+            try:
+                closed = await self._db('update_signal_prices', signal_prices)
+            except Exception as e:
+                logger.error(f"Error updating {len(signal_prices)} signal prices: {e}")
+                return
+            await self._handle_closed_signals(closed)
+
+    async def _process_signal_price(self, signal, current_price: float):
+        """Store price update for a standalone signal and notify if it closed"""
+        closed = await self._db('update_signal_prices', {signal.id: current_price})
+        await self._handle_closed_signals(closed)
+        logger.debug(f"Updated signal {signal.id}: {signal.symbol} @ {current_price}")
+
+    async def _handle_closed_signals(self, closed: List):
+        """Drop closed signals from the tick index and send notifications"""
+        for signal in closed:
+            logger.info(f"Signal {signal.id} closed: {signal.symbol}")
+            for tracked in list(self._signals_by_symbol.get(signal.symbol, [])):
+                if tracked.id == signal.id:
+                    tracked.status = 'CLOSED'
+                    self._forget(self._signals_by_symbol, tracked)
+            self.triggers.remove((SIGNAL, signal.id))
+            await self._send_signal_closed_notification(signal)
+
+    async def _check_sequences_for_martingale(self, prices: Dict[str, float]):
+        """Check all active sequences in the state cache for martingale triggers and TP/SL hits"""
+        sequences, symbols, codes, arrays = self._sequence_batch()
+        if not sequences:
+            return
 
-                # Refresh signal to get updated status
-                updated_signal = self.db.get_signal_by_id(signal.id)
+        logger.info(f"Checking {len(sequences)} active sequences...")
 
-                # If status changed from ACTIVE to CLOSED, send Telegram notification
-                if old_status == 'ACTIVE' and updated_signal and updated_signal.status == 'CLOSED':
-                    logger.info(f"Signal {signal.id} closed: {signal.symbol}")
-                    await self._send_signal_closed_notification(updated_signal)
+        # One vectorized pass; only sequences that close or trigger take the scalar path
+        symbol_prices = np.array([prices.get(symbol, np.nan) for symbol in symbols])
+        batch = self.martingale.evaluate_batch(symbol_prices[codes], **arrays)
+        hits = np.flatnonzero(batch['close'] | batch['trigger'])
 
-                logger.debug(f"Updated signal {signal.id}: {signal.symbol} @ {current_price}")
+        for i in hits:
+            sequence = sequences[i]
+            try:
+                async with self._eval_lock:
+                    await self._process_sequence_price(sequence, prices[sequence.symbol])
 
             except Exception as e:
-                logger.error(f"Error checking signal {signal.id}: {e}")
-
-    async def _check_sequences_for_martingale(self):
-        """Check active sequences for martingale triggers and TP/SL hits"""
-        active_sequences = self.db.get_active_sequences()
+                logger.error(f"Error checking sequence {sequence.id}: {e}", exc_info=True)
 
-        if not active_sequences:
+    def _sequence_batch(self):
+        """(sequences, symbols, symbol index per sequence, arrays), rebuilt when the state changes"""
+        if self._batch is None or self._batch[0] != self.state.version:
+            sequences = self.state.sequences()
+            symbols = sorted({seq.symbol for seq in sequences})
+            position = {symbol: i for i, symbol in enumerate(symbols)}
+            codes = np.array([position[seq.symbol] for seq in sequences], dtype=int)
+            self._batch = (
+                self.state.version, sequences, symbols, codes, self.martingale.sequence_arrays(sequences)
+            )
+        return self._batch[1:]
+
+    async def _process_sequence_price(self, sequence, current_price: float):
+        """Check one sequence for TP/SL close or martingale trigger"""
+        # Check if TP/SL hit
+        should_close, outcome = self.martingale.check_sequence_close(sequence, current_price)
+        if should_close:
+            logger.info(f"Sequence {sequence.id} hit {outcome}: {sequence.symbol} @ {current_price}")
+            # Close sequence
+            closed_sequence = await self._db('close_sequence', sequence.id, current_price, outcome)
+            self._forget(self._sequences_by_symbol, sequence)
+            self.triggers.remove((SEQUENCE, sequence.id))
+            # Send notification
+            await self._send_sequence_closed_notification(closed_sequence)
             return
 
-        logger.info(f"Checking {len(active_sequences)} active sequences...")
+        # Check if martingale should be suggested
+        should_add, suggestion = self.martingale.should_add_martingale(sequence, current_price)
+        if should_add:
+            logger.info(
+                f"Martingale trigger for sequence {sequence.id}: "
+                f"{sequence.symbol} moved {suggestion['price_move_pct']:+.2f}%"
+            )
+            # Update suggestion time to prevent spam
+            await self._db('update_sequence_martingale_suggestion_time', sequence.id)
+            sequence.last_martingale_suggestion_at = datetime.utcnow()
+            self._batch = None  # Cooldown column changed
+            # Send suggestion
+            await self._send_martingale_suggestion(sequence, suggestion)
+
+        logger.debug(f"Checked sequence {sequence.id}: {sequence.symbol} @ {current_price}")
+
+    async def on_price_tick(self, symbol: str, price: float):
+        """Evaluate tracked signals/sequences for symbol on a streamed tick"""
+        # Bisect the symbol's trigger levels; most ticks cross nothing
+        crossed = self.triggers.crossed_owners(symbol, price)
+        if not crossed:
+            return
 
-        for sequence in active_sequences:
+        signals = [s for s in self._signals_by_symbol.get(symbol, []) if (SIGNAL, s.id) in crossed]
+        sequences = [
+            s for s in self._sequences_by_symbol.get(symbol, []) if (SEQUENCE, s.id) in crossed
+        ] if self.martingale else []
+
+        async with self._eval_lock:
+            # Only touch the DB when a level is actually crossed
+            for signal in signals:
+                try:
+                    if signal.status == 'ACTIVE' and DatabaseManager._check_signal_outcome(signal, price):
+                        await self._process_signal_price(signal, price)
+                except Exception as e:
+                    logger.error(f"Error checking signal {signal.id} on tick: {e}")
+
+            for sequence in sequences:
+                try:
+                    await self._process_sequence_price(sequence, price)
+                except Exception as e:
+                    logger.error(f"Error checking sequence {sequence.id} on tick: {e}", exc_info=True)
+
+    # ==================== TICK INDEX EVENTS ====================
+
+    def _on_state_event(self, event: str, payload):
+        """State listener: keep the tick index current between cycles"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
             try:
-                # Get current price
-                ticker = self.bingx.get_ticker_price(sequence.symbol)
-
-                if not ticker:
-                    continue
-
-                # Parse price
-                if isinstance(ticker, dict):
-                    if 'price' in ticker:
-                        current_price = float(ticker['price'])
-                    elif 'lastPrice' in ticker:
-                        current_price = float(ticker['lastPrice'])
-                    else:
-                        logger.warning(f"Cannot parse price from ticker: {ticker}")
-                        continue
+                in_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                in_loop = False
+            if not in_loop:
+                loop.call_soon_threadsafe(self._index_event, event, payload)
+                return
+        self._index_event(event, payload)
+
+    def _index_event(self, event: str, payload):
+        """Apply one state event to the by-symbol maps and trigger index"""
+        if event == SIGNAL_CREATED:
+            if payload.status != 'ACTIVE':
+                return
+            if payload.sequence_id is None:
+                self._track(self._signals_by_symbol, payload)
+                self.triggers.add_signal(payload)
+            elif self.martingale:
+                # New member entry moves the sequence's martingale level
+                for sequence in self._sequences_by_symbol.get(payload.symbol, []):
+                    if sequence.id == payload.sequence_id:
+                        self.triggers.add_sequence(sequence, self.martingale)
+        elif event == SIGNALS_CLOSED:
+            for signal_id in payload:
+                self.triggers.remove((SIGNAL, signal_id))
+                self._drop_by_id(self._signals_by_symbol, signal_id)
+        elif event in (SEQUENCE_CREATED, SEQUENCE_UPDATED, SEQUENCE_CLOSED) and self.martingale:
+            self._drop_by_id(self._sequences_by_symbol, payload.id)
+            if event != SEQUENCE_CLOSED and payload.status == SequenceStatus.ACTIVE:
+                self._track(self._sequences_by_symbol, payload)
+                self.triggers.add_sequence(payload, self.martingale)
+            else:
+                self.triggers.remove((SEQUENCE, payload.id))
+
+    def _track(self, index: Dict[str, List], item):
+        """Add an item to a by-symbol index and stream its symbol"""
+        self._drop_by_id(index, item.id)
+        index.setdefault(item.symbol, []).append(item)
+        if self.stream and item.symbol not in self.stream.price_symbols:
+            self.stream.subscribe_price(item.symbol)
+
+    @staticmethod
+    def _drop_by_id(index: Dict[str, List], item_id: int):
+        for symbol, items in list(index.items()):
+            remaining = [i for i in items if i.id != item_id]
+            if len(remaining) != len(items):
+                if remaining:
+                    index[symbol] = remaining
                 else:
-                    logger.warning(f"Unexpected ticker format: {ticker}")
-                    continue
-
-                # Check if TP/SL hit
-                should_close, outcome = self.martingale.check_sequence_close(sequence, current_price)
-                if should_close:
-                    logger.info(f"Sequence {sequence.id} hit {outcome}: {sequence.symbol} @ {current_price}")
-                    # Close sequence
-                    closed_sequence = self.db.close_sequence(sequence.id, current_price, outcome)
-                    # Send notification
-                    await self._send_sequence_closed_notification(closed_sequence)
-                    continue
-
-                # Check if martingale should be suggested
-                should_add, suggestion = self.martingale.should_add_martingale(sequence, current_price)
-                if should_add:
-                    logger.info(
-                        f"Martingale trigger for sequence {sequence.id}: "
-                        f"{sequence.symbol} moved {suggestion['price_move_pct']:+.2f}%"
-                    )
-                    # Update suggestion time to prevent spam
-                    self.db.update_sequence_martingale_suggestion_time(sequence.id)
-                    # Send suggestion
-                    await self._send_martingale_suggestion(sequence, suggestion)
-
-                logger.debug(f"Checked sequence {sequence.id}: {sequence.symbol} @ {current_price}")
+                    del index[symbol]
+                return
 
-            except Exception as e:
-                logger.error(f"Error checking sequence {sequence.id}: {e}", exc_info=True)
+    @staticmethod
+    def _group_by_symbol(items) -> Dict[str, List]:
+        grouped = {}
+        for item in items:
+            grouped.setdefault(item.symbol, []).append(item)
+        return grouped
+
+    @staticmethod
+    def _forget(index: Dict[str, List], item):
+        """Remove a closed item from a by-symbol index"""
+        items = index.get(item.symbol)
+        if items and item in items:
+            items.remove(item)
+            if not items:
+                del index[item.symbol]
 
     async def _send_martingale_suggestion(self, sequence, suggestion):
         """Send Telegram notification for martingale opportunity"""
@@ -205,7 +458,7 @@ This is a suggestion only. To add martingale entry:
 <i>Weighted average calculation ensures optimal risk/reward</i>
 """
 
-            await self.telegram.send_message(message)
+            await self.telegram.send_message(message, broadcast=True)
             logger.info(f"Sent martingale suggestion for sequence {sequence.id}")
 
         except Exception as e:
@@ -257,7 +510,7 @@ This is a suggestion only. To add martingale entry:
 <i>PnL calculated from weighted average entry: ${sequence.weighted_avg_entry:.6f}</i>
 """
 
-            await self.telegram.send_message(message)
+            await self.telegram.send_message(message, broadcast=True)
             logger.info(f"Sent close notification for sequence {sequence.id}")
 
         except Exception as e:
@@ -270,7 +523,7 @@ This is a suggestion only. To add martingale entry:
 
     async def track_signal_manual(self, signal_id: int, current_price: float):
         """Manually update a signal (for testing)"""
-        self.db.update_signal_price(signal_id, current_price)
+        await self._db('update_signal_prices', {signal_id: current_price})
         logger.info(f"Manually updated signal {signal_id} with price {current_price}")
 
     async def _send_signal_closed_notification(self, signal):
@@ -310,7 +563,7 @@ This is a suggestion only. To add martingale entry:
 🤖 <b>Strategy:</b> {signal.strategy_name}
 """
 
-            await self.telegram.send_message(message)
+            await self.telegram.send_message(message, broadcast=True)
             logger.info(f"Sent close notification for signal {signal.id}")
 
         except Exception as e:
@@ -2,16 +2,19 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 import pandas as pd
 import logging
+from .indicator_cache import IndicatorCache, shared_indicator_cache
 
 logger = logging.getLogger(__name__)
 
 class BaseStrategy(ABC):
     """Base class cho tất cả trading strategies"""
 
-    def __init__(self, name: str, config: Optional[Dict] = None):
+    def __init__(self, name: str, config: Optional[Dict] = None,
+                 indicator_cache: Optional[IndicatorCache] = None):
         self.name = name
         self.config = config or {}
         self.signals = []
+        self.indicator_cache = indicator_cache
 
     @abstractmethod
     def generate_signal(self, market_data: pd.DataFrame) -> Optional[Dict]:
@@ -26,6 +29,27 @@ class BaseStrategy(ABC):
         """
         pass
 
+    def get_indicator(self, symbol: str, interval: Optional[str], df: pd.DataFrame,
+                      name: str, **params):
+        """
+        Get indicator series from the shared cache
+
+        Strategies evaluating the same candles (same symbol, interval and
+        last candle) reuse one computation per indicator.
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline timeframe
+            df: Klines with 'close' (and 'time')
+            name: 'ema', 'rsi' or 'macd'
+            **params: Indicator parameters
+
+        Returns:
+            Read-only NumPy array ((macd, signal) tuple for 'macd')
+        """
+        cache = self.indicator_cache if self.indicator_cache is not None else shared_indicator_cache
+        return cache.get(symbol, interval, df, name, **params)
+
     def validate_signal(self, signal: Dict) -> bool:
         """Validate signal before sending"""
         required_fields = ['symbol', 'side', 'entry_price', 'confidence']
@@ -0,0 +1,83 @@
+"""
+Batch Indicators - RSI / MACD / EMA over a (symbols × candles) NumPy panel
+
+Every function takes a 2-D float array where each row is one symbol's
+close series (oldest → newest) and returns arrays of the same shape.
+The recursions run along the candle axis once, vectorized over all
+symbols, and use the same formulas as IndicatorEngine.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def stack_closes(frames: List[pd.DataFrame], length: int) -> np.ndarray:
+    """
+    Stack the last `length` closes of each DataFrame into a panel
+
+    Args:
+        frames: Kline DataFrames (each must have at least `length` rows)
+        length: Candles per symbol
+
+    Returns:
+        Array of shape (len(frames), length)
+    """
+    panel = np.empty((len(frames), length), dtype=float)
+    for i, df in enumerate(frames):
+        panel[i] = df['close'].to_numpy(dtype=float)[-length:]
+    return panel
+
+
+def ema_panel(closes: np.ndarray, period: int) -> np.ndarray:
+    """EMA per row (pandas ewm(span=period, adjust=False) recursion)"""
+    alpha = 2 / (period + 1)
+    out = np.empty_like(closes, dtype=float)
+    out[:, 0] = closes[:, 0]
+    for t in range(1, closes.shape[1]):
+        out[:, t] = alpha * closes[:, t] + (1 - alpha) * out[:, t - 1]
+    return out
+
+
+def macd_panel(closes: np.ndarray, fast: int = 12, slow: int = 26,
+               signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal line per row"""
+    macd_line = ema_panel(closes, fast) - ema_panel(closes, slow)
+    signal_line = ema_panel(macd_line, signal)
+    return macd_line, signal_line
+
+
+def rsi_panel(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Wilder RSI per row
+
+    First `period` columns are NaN (not enough price changes yet).
+    """
+    n_symbols, n_candles = closes.shape
+    out = np.full((n_symbols, n_candles), np.nan)
+    if n_candles <= period:
+        return out
+
+    delta = np.diff(closes, axis=1)
+    gains = np.clip(delta, 0, None)
+    losses = np.clip(-delta, 0, None)
+
+    avg_gain = gains[:, :period].mean(axis=1)
+    avg_loss = losses[:, :period].mean(axis=1)
+    out[:, period] = _rsi_from_averages(avg_gain, avg_loss)
+
+    for t in range(period, n_candles - 1):
+        avg_gain = (avg_gain * (period - 1) + gains[:, t]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, t]) / period
+        out[:, t + 1] = _rsi_from_averages(avg_gain, avg_loss)
+
+    return out
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """RSI from Wilder averages (100 when no losses, 50 when flat)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+    return rsi
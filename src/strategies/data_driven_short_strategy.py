@@ -4,10 +4,11 @@ Based on analysis of 95 SHORT trades with 81.1% win rate
 """
 
 import logging
-import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_strategy import BaseStrategy
+from .indicator_engine import IndicatorEngine
+from .batch_indicators import stack_closes, ema_panel, macd_panel, rsi_panel
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +26,16 @@ class DataDrivenShortStrategy(BaseStrategy):
     - SL: +5% from entry
     """
 
-    def __init__(self, enable_martingale: bool = True):
-        super().__init__(name="Data-Driven SHORT Strategy")
+    def __init__(self, enable_martingale: bool = True, indicator_cache=None):
+        """
+        Args:
+            enable_martingale: Emit INITIAL signals for martingale sequences
+            indicator_cache: Shared IndicatorCache. When given, indicators come
+                from the cache so strategies running side by side share one
+                computation; otherwise the incremental engine is used
+                (O(1) per closed candle - what the live bot runs).
+        """
+        super().__init__(name="Data-Driven SHORT Strategy", indicator_cache=indicator_cache)
 
         # From analysis
         self.optimal_leverage = 25
@@ -35,7 +44,11 @@ class DataDrivenShortStrategy(BaseStrategy):
         self.tp2_percent = 13  # -13% from entry
         self.sl_percent = 5   # +5% from entry
 
+        # Incremental indicators (RSI 14, MACD 12/26/9, EMA 50) per symbol
+        self.indicator_engine = IndicatorEngine(ema_period=50)
+
         # Signal criteria
+        self.min_candles = 200
         self.rsi_overbought = 65
         self.min_confidence = 0.7
 
@@ -78,14 +91,14 @@ class DataDrivenShortStrategy(BaseStrategy):
             df = market_data['klines']
 
             # Validate data
-            if len(df) < 200:
+            if len(df) < self.min_candles:
                 logger.warning(f"{symbol}: Not enough data ({len(df)} candles)")
                 return None
 
-            # Calculate indicators
-            rsi = self._calculate_rsi(df)
-            macd, macd_signal = self._calculate_macd(df)
-            ema50 = self._calculate_ema(df, period=50)
+            values = self._indicator_values(symbol, market_data.get('interval'), df)
+            rsi = values['rsi']
+            macd, macd_signal = values['macd'], values['macd_signal']
+            ema50 = values['ema']
 
             current_price = float(df['close'].iloc[-1])
 
@@ -93,7 +106,7 @@ class DataDrivenShortStrategy(BaseStrategy):
             conditions = {
                 'rsi_overbought': rsi > self.rsi_overbought,
                 'macd_bearish': macd < macd_signal,
-                'macd_crossunder': self._check_macd_crossunder(df),
+                'macd_crossunder': self._is_macd_crossunder(values),
                 'below_ema50': current_price < ema50,
             }
 
@@ -104,192 +117,226 @@ class DataDrivenShortStrategy(BaseStrategy):
                 logger.debug(f"{symbol}: Confidence too low ({confidence:.2f})")
                 return None
 
-            # Determine leverage and margin based on confidence
-            if confidence >= 0.85:
-                leverage = 25
-                margin = 20
-            elif confidence >= 0.7:
-                leverage = 20
-                margin = 15
-            else:
-                return None
-
-            # Calculate TP/SL based on data analysis
-            entry_price = current_price
-            tp1 = entry_price * (1 - self.tp1_percent / 100)
-            tp2 = entry_price * (1 - self.tp2_percent / 100)
-            sl = entry_price * (1 + self.sl_percent / 100)
-
-            signal = {
-                'symbol': symbol,
-                'side': 'SHORT',
-                'entry_price': entry_price,
-                'stop_loss': sl,
-                'take_profit_1': tp1,
-                'take_profit_2': tp2,
-                'confidence': confidence,
-                'strategy': self.name,
-                'recommended_leverage': leverage,
-                'recommended_margin': margin,
-                'indicators': {
-                    'rsi': round(rsi, 2),
-                    'macd': round(macd, 4),
-                    'macd_signal': round(macd_signal, 4),
-                    'ema_50': round(ema50, 2),
-                    'price': current_price
-                }
-            }
-
-            # Add martingale fields if enabled
-            if self.enable_martingale:
-                signal['signal_type'] = 'INITIAL'
-                signal['step_number'] = 1
-                signal['max_steps'] = self.max_martingale_steps
-                signal['trigger_percent'] = self.martingale_trigger_pct
-                signal['step1_multiplier'] = self.step1_multiplier
-                signal['step2_plus_multiplier'] = self.step2_plus_multiplier
-                logger.info(
-                    f"✅ {symbol} SHORT signal (INITIAL) generated "
-                    f"(confidence: {confidence:.2f}, leverage: {leverage}x, "
-                    f"martingale: enabled, max steps: {self.max_martingale_steps})"
-                )
-            else:
-                signal['signal_type'] = 'STANDALONE'
-                logger.info(
-                    f"✅ {symbol} SHORT signal (STANDALONE) generated "
-                    f"(confidence: {confidence:.2f}, leverage: {leverage}x)"
-                )
-
-            return signal
+            return self._build_signal(symbol, current_price, confidence, values)
 
         except Exception as e:
             logger.error(f"Error generating signal for {symbol}: {e}", exc_info=True)
             return None
 
-    def _calculate_confidence(self, conditions: Dict, symbol: str) -> float:
+    def _indicator_values(self, symbol: str, interval: Optional[str], df) -> Dict:
+        """RSI / MACD (current + previous bar) / EMA50 for the last candle"""
+        if self.indicator_cache is None:
+            # Incremental indicators (O(1) per newly closed candle)
+            return self.indicator_engine.update(symbol, df)
+
+        rsi = self.get_indicator(symbol, interval, df, 'rsi', period=14)
+        macd_line, signal_line = self.get_indicator(symbol, interval, df, 'macd', fast=12, slow=26, signal=9)
+        ema50 = self.get_indicator(symbol, interval, df, 'ema', period=50)
+        return {
+            'rsi': float(rsi[-1]),
+            'macd': float(macd_line[-1]),
+            'macd_signal': float(signal_line[-1]),
+            'ema': float(ema50[-1]),
+            'prev_macd': float(macd_line[-2]),
+            'prev_macd_signal': float(signal_line[-2]),
+        }
+
+    def generate_signals_batch(self, market_data_list: List[Dict]) -> List[Dict]:
         """
-        Calculate confidence score
+        Generate SHORT signals for many symbols in one vectorized pass
 
         Args:
-            conditions: Dict of boolean conditions
-            symbol: Trading symbol
+            market_data_list: List of dicts with 'symbol' and 'klines' (DataFrame)
 
         Returns:
-            Confidence score (0-1)
+            List of signal dicts (only symbols that pass min_confidence)
         """
-        # Base confidence from conditions met
-        conditions_met = sum(conditions.values())
-        base_confidence = conditions_met / len(conditions)
-
-        # Boost for high-performing symbols from analysis
-        boost = self.symbol_boost.get(symbol, 0)
-
-        # Final confidence (capped at 1.0)
-        confidence = min(base_confidence + boost, 1.0)
-
-        return confidence
-
-    def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> float:
+        valid = []
+        for market_data in market_data_list:
+            if len(market_data['klines']) < self.min_candles:
+                logger.warning(
+                    f"{market_data['symbol']}: Not enough data ({len(market_data['klines'])} candles)"
+                )
+                continue
+            valid.append(market_data)
+
+        if not valid:
+            return []
+
+        # Warm up on each symbol's full history, like the incremental engine, so
+        # batch and single-symbol scans agree; panel rows must share a length
+        groups: Dict[int, List[Dict]] = {}
+        for market_data in valid:
+            groups.setdefault(len(market_data['klines']), []).append(market_data)
+
+        scores = []
+        for length, group in groups.items():
+            closes = stack_closes([m['klines'] for m in group], length)
+            scores.extend(self.evaluate_batch([m['symbol'] for m in group], closes))
+
+        signals = []
+        for score in scores:
+            if score['confidence'] < self.min_confidence:
+                logger.debug(f"{score['symbol']}: Confidence too low ({score['confidence']:.2f})")
+                continue
+            signal = self._build_signal(score['symbol'], score['price'], score['confidence'], score)
+            if signal:
+                signals.append(signal)
+
+        return signals
+
+    def evaluate_batch(self, symbols: List[str], closes: np.ndarray) -> List[Dict]:
         """
-        Calculate Relative Strength Index
+        Score all symbols at once from a (symbols × candles) close panel
 
         Args:
-            df: DataFrame with 'close' prices
-            period: RSI period (default 14)
+            symbols: Symbol for each panel row
+            closes: Close prices, shape (len(symbols), n_candles), oldest first
 
         Returns:
-            Current RSI value
+            Per-symbol dicts with confidence, price and indicator values
         """
-        close = df['close'].astype(float)
-
-        # Calculate price changes
-        delta = close.diff()
-
-        # Separate gains and losses
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-
-        # Calculate average gain and loss
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-
-        # Calculate RS and RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return float(rsi.iloc[-1])
+        rsi = rsi_panel(closes)[:, -1]
+        macd_line, signal_line = macd_panel(closes)
+        ema50 = ema_panel(closes, 50)[:, -1]
+        price = closes[:, -1]
+
+        macd, macd_signal = macd_line[:, -1], signal_line[:, -1]
+        prev_macd, prev_macd_signal = macd_line[:, -2], signal_line[:, -2]
+
+        # Same four SHORT conditions as generate_signal, one column each
+        conditions = np.column_stack([
+            rsi > self.rsi_overbought,
+            macd < macd_signal,
+            (prev_macd >= prev_macd_signal) & (macd < macd_signal),
+            price < ema50,
+        ])
+        boost = np.array([self.symbol_boost.get(symbol, 0) for symbol in symbols])
+        confidence = np.minimum(conditions.sum(axis=1) / conditions.shape[1] + boost, 1.0)
+
+        return [
+            {
+                'symbol': symbol,
+                'confidence': float(confidence[i]),
+                'price': float(price[i]),
+                'rsi': float(rsi[i]),
+                'macd': float(macd[i]),
+                'macd_signal': float(macd_signal[i]),
+                'ema': float(ema50[i]),
+                'prev_macd': float(prev_macd[i]),
+                'prev_macd_signal': float(prev_macd_signal[i]),
+            }
+            for i, symbol in enumerate(symbols)
+        ]
 
-    def _calculate_macd(self, df: pd.DataFrame,
-                       fast=12, slow=26, signal=9) -> tuple:
+    def _build_signal(self, symbol: str, current_price: float, confidence: float,
+                      values: Dict) -> Optional[Dict]:
         """
-        Calculate MACD (Moving Average Convergence Divergence)
+        Build signal dict (TP/SL, sizing, martingale fields) for a symbol
+        that passed the confidence filter
 
         Args:
-            df: DataFrame with 'close' prices
-            fast: Fast EMA period
-            slow: Slow EMA period
-            signal: Signal line period
+            symbol: Trading symbol
+            current_price: Entry price
+            confidence: Confidence score (0-1)
+            values: Indicator values (rsi, macd, macd_signal, ema)
 
         Returns:
-            Tuple of (macd, signal_line)
+            Signal dict or None
         """
-        close = df['close'].astype(float)
-
-        # Calculate EMAs
-        ema_fast = close.ewm(span=fast, adjust=False).mean()
-        ema_slow = close.ewm(span=slow, adjust=False).mean()
-
-        # MACD line
-        macd_line = ema_fast - ema_slow
+        # Determine leverage and margin based on confidence
+        if confidence >= 0.85:
+            leverage = 25
+            margin = 20
+        elif confidence >= 0.7:
+            leverage = 20
+            margin = 15
+        else:
+            return None
 
-        # Signal line
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        # Calculate TP/SL based on data analysis
+        entry_price = current_price
+        tp1 = entry_price * (1 - self.tp1_percent / 100)
+        tp2 = entry_price * (1 - self.tp2_percent / 100)
+        sl = entry_price * (1 + self.sl_percent / 100)
+
+        signal = {
+            'symbol': symbol,
+            'side': 'SHORT',
+            'entry_price': entry_price,
+            'stop_loss': sl,
+            'take_profit_1': tp1,
+            'take_profit_2': tp2,
+            'confidence': confidence,
+            'strategy': self.name,
+            'recommended_leverage': leverage,
+            'recommended_margin': margin,
+            'indicators': {
+                'rsi': round(values['rsi'], 2),
+                'macd': round(values['macd'], 4),
+                'macd_signal': round(values['macd_signal'], 4),
+                'ema_50': round(values['ema'], 2),
+                'price': current_price
+            }
+        }
 
-        return float(macd_line.iloc[-1]), float(signal_line.iloc[-1])
+        # Add martingale fields if enabled
+        if self.enable_martingale:
+            signal['signal_type'] = 'INITIAL'
+            signal['step_number'] = 1
+            signal['max_steps'] = self.max_martingale_steps
+            signal['trigger_percent'] = self.martingale_trigger_pct
+            signal['step1_multiplier'] = self.step1_multiplier
+            signal['step2_plus_multiplier'] = self.step2_plus_multiplier
+            logger.info(
+                f"✅ {symbol} SHORT signal (INITIAL) generated "
+                f"(confidence: {confidence:.2f}, leverage: {leverage}x, "
+                f"martingale: enabled, max steps: {self.max_martingale_steps})"
+            )
+        else:
+            signal['signal_type'] = 'STANDALONE'
+            logger.info(
+                f"✅ {symbol} SHORT signal (STANDALONE) generated "
+                f"(confidence: {confidence:.2f}, leverage: {leverage}x)"
+            )
+
+        return signal
 
-    def _calculate_ema(self, df: pd.DataFrame, period: int = 50) -> float:
+    def _calculate_confidence(self, conditions: Dict, symbol: str) -> float:
         """
-        Calculate Exponential Moving Average
+        Calculate confidence score
 
         Args:
-            df: DataFrame with 'close' prices
-            period: EMA period
+            conditions: Dict of boolean conditions
+            symbol: Trading symbol
 
         Returns:
-            Current EMA value
+            Confidence score (0-1)
         """
-        close = df['close'].astype(float)
-        ema = close.ewm(span=period, adjust=False).mean()
-        return float(ema.iloc[-1])
+        # Base confidence from conditions met
+        conditions_met = sum(conditions.values())
+        base_confidence = conditions_met / len(conditions)
+
+        # Boost for high-performing symbols from analysis
+        boost = self.symbol_boost.get(symbol, 0)
 
-    def _check_macd_crossunder(self, df: pd.DataFrame) -> bool:
+        # Final confidence (capped at 1.0)
+        confidence = min(base_confidence + boost, 1.0)
+
+        return confidence
+
+    @staticmethod
+    def _is_macd_crossunder(values: Dict) -> bool:
         """
         Check if MACD just crossed under signal line (bearish)
 
         Args:
-            df: DataFrame with 'close' prices
+            values: Indicator values with current and previous-bar MACD
 
         Returns:
-            True if bearish crossunder occurred
+            True if prev MACD >= Signal and current MACD < Signal
         """
-        try:
-            close = df['close'].astype(float)
-
-            # Calculate MACD for last 2 candles
-            ema_fast = close.ewm(span=12, adjust=False).mean()
-            ema_slow = close.ewm(span=26, adjust=False).mean()
-            macd_line = ema_fast - ema_slow
-            signal_line = macd_line.ewm(span=9, adjust=False).mean()
-
-            # Check crossunder: prev MACD >= Signal, current MACD < Signal
-            prev_macd = macd_line.iloc[-2]
-            prev_signal = signal_line.iloc[-2]
-            curr_macd = macd_line.iloc[-1]
-            curr_signal = signal_line.iloc[-1]
-
-            crossunder = (prev_macd >= prev_signal) and (curr_macd < curr_signal)
-
-            return crossunder
-
-        except:
-            return False
+        return bool(
+            values['prev_macd'] >= values['prev_macd_signal']
+            and values['macd'] < values['macd_signal']
+        )
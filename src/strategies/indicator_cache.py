@@ -0,0 +1,136 @@
+"""
+Indicator Cache - Memoized indicator series shared across strategies
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .batch_indicators import ema_panel, macd_panel, rsi_panel
+
+logger = logging.getLogger(__name__)
+
+
+def _ema(closes: np.ndarray, period: int = 50, sma_seed: bool = False) -> np.ndarray:
+    if not sma_seed:
+        return ema_panel(closes[None, :], period)[0]
+
+    # pandas_ta seeding: SMA of the first `period` closes, NaN before it
+    out = np.full(len(closes), np.nan)
+    if len(closes) >= period:
+        seeded = closes[period - 1:].copy()
+        seeded[0] = closes[:period].mean()
+        out[period - 1:] = ema_panel(seeded[None, :], period)[0]
+    return out
+
+
+def _rsi(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    return rsi_panel(closes[None, :], period)[0]
+
+
+def _macd(closes: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9,
+          sma_seed: bool = False):
+    if not sma_seed:
+        macd_line, signal_line = macd_panel(closes[None, :], fast, slow, signal)
+        return macd_line[0], signal_line[0]
+
+    # pandas_ta: SMA-seeded EMAs, signal line seeded from the first valid MACD value
+    macd_line = _ema(closes, fast, sma_seed=True) - _ema(closes, slow, sma_seed=True)
+    signal_line = np.full(len(closes), np.nan)
+    if len(closes) >= slow:
+        signal_line[slow - 1:] = _ema(macd_line[slow - 1:], signal, sma_seed=True)
+    return macd_line, signal_line
+
+
+# Indicator name -> function(closes, **params)
+INDICATORS: Dict[str, Callable] = {
+    'ema': _ema,
+    'rsi': _rsi,
+    'macd': _macd,
+}
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator series
+
+    Key: (symbol, interval, last candle time, last close, candles, indicator, params).
+    The last close is part of the key because the still-open candle keeps
+    its open time while its price moves. Strategies evaluating the same
+    candles share one computation per indicator.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize indicator cache
+
+        Args:
+            max_entries: Max cached series before least-recently-used eviction
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # Scanner evaluates symbols in worker threads
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, interval: Optional[str], df: pd.DataFrame, name: str, **params):
+        """
+        Get indicator series for the candles in df (computed once per key)
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline timeframe (None if unknown)
+            df: Klines with 'close' (and 'time')
+            name: Indicator name ('ema', 'rsi', 'macd')
+            **params: Indicator parameters (e.g. period=50)
+
+        Returns:
+            NumPy array aligned with df rows ((macd, signal) tuple for 'macd')
+        """
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+
+        last_time = int(df['time'].iloc[-1]) if 'time' in df.columns else None
+        key = (
+            symbol, interval, last_time, float(df['close'].iloc[-1]), len(df),
+            name, tuple(sorted(params.items()))
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = INDICATORS[name](df['close'].to_numpy(dtype=float), **params)
+
+        # Shared between strategies - must not be modified in place
+        for array in (value if isinstance(value, tuple) else (value,)):
+            array.flags.writeable = False
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        """Drop all cached series"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache used by strategies that are not given their own
+shared_indicator_cache = IndicatorCache()
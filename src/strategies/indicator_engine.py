@@ -0,0 +1,229 @@
+"""
+Incremental Indicator Engine - O(1) EMA / Wilder RSI / MACD updates per candle
+"""
+
+import logging
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class EMAState:
+    """Exponential moving average (same recursion as pandas ewm(adjust=False))"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value: Optional[float] = None
+
+    def peek(self, x: float) -> float:
+        """EMA if x were the next value (state unchanged)"""
+        if self.value is None:
+            return x
+        return self.alpha * x + (1 - self.alpha) * self.value
+
+    def update(self, x: float) -> float:
+        """Commit x and return new EMA"""
+        self.value = self.peek(x)
+        return self.value
+
+
+class RSIState:
+    """
+    Wilder RSI
+
+    First average gain/loss is the simple mean of the first `period`
+    changes, then avg = (avg × (period - 1) + change) / period.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0  # Number of price changes seen
+
+    def _next(self, close: float):
+        """Return (avg_gain, avg_loss, count) after adding close"""
+        if self.prev_close is None:
+            return self.avg_gain, self.avg_loss, self.count
+
+        change = close - self.prev_close
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+        count = self.count + 1
+
+        if count <= self.period:
+            # Seed phase: running simple mean
+            avg_gain = self.avg_gain + (gain - self.avg_gain) / count
+            avg_loss = self.avg_loss + (loss - self.avg_loss) / count
+        else:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        return avg_gain, avg_loss, count
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def peek(self, close: float) -> float:
+        """RSI if close were the next value (NaN until warmed up)"""
+        avg_gain, avg_loss, count = self._next(close)
+        if count < self.period:
+            return math.nan
+        return self._rsi(avg_gain, avg_loss)
+
+    def update(self, close: float) -> float:
+        """Commit close and return new RSI"""
+        self.avg_gain, self.avg_loss, self.count = self._next(close)
+        self.prev_close = close
+        if self.count < self.period:
+            return math.nan
+        return self._rsi(self.avg_gain, self.avg_loss)
+
+
+class MACDState:
+    """MACD line + signal line from three chained EMAs"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+
+    def peek(self, close: float):
+        """(macd, signal) if close were the next value"""
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        return macd, self.signal.peek(macd)
+
+    def update(self, close: float):
+        """Commit close and return (macd, signal)"""
+        macd = self.fast.update(close) - self.slow.update(close)
+        return macd, self.signal.update(macd)
+
+
+class SymbolIndicators:
+    """Indicator state for one symbol, advanced once per closed candle"""
+
+    def __init__(self, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9, ema_period: int = 50):
+        self.rsi = RSIState(rsi_period)
+        self.macd = MACDState(macd_fast, macd_slow, macd_signal)
+        self.ema = EMAState(ema_period)
+
+        self.last_time: Optional[int] = None  # Open time of last closed candle
+        self.prev_macd = math.nan             # Values at last closed candle
+        self.prev_macd_signal = math.nan
+
+    def update(self, close: float, candle_time: Optional[int] = None):
+        """Advance state with a closed candle"""
+        self.rsi.update(close)
+        self.prev_macd, self.prev_macd_signal = self.macd.update(close)
+        self.ema.update(close)
+        self.last_time = candle_time
+
+    def evaluate(self, current_close: float) -> Dict:
+        """Indicator values for the current (open) candle plus previous-bar MACD"""
+        macd, macd_signal = self.macd.peek(current_close)
+        return {
+            'rsi': self.rsi.peek(current_close),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'ema': self.ema.peek(current_close),
+            'prev_macd': self.prev_macd,
+            'prev_macd_signal': self.prev_macd_signal,
+        }
+
+
+class IndicatorEngine:
+    """
+    Per-symbol incremental indicators
+
+    The last row of the klines DataFrame is treated as the still-open
+    candle: it is evaluated with peek() but never committed. Closed
+    candles are committed once, so a scan where one candle closed costs
+    one O(1) update regardless of history length. State is rebuilt from
+    the DataFrame when the history does not line up (first call, gap,
+    data rewound).
+    """
+
+    def __init__(self, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9, ema_period: int = 50):
+        self.params = {
+            'rsi_period': rsi_period,
+            'macd_fast': macd_fast,
+            'macd_slow': macd_slow,
+            'macd_signal': macd_signal,
+            'ema_period': ema_period,
+        }
+        self._states: Dict[str, SymbolIndicators] = {}
+
+        # Stats
+        self.rebuilds = 0
+        self.incremental_updates = 0
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop state for one symbol or all symbols"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def update(self, symbol: str, df: pd.DataFrame) -> Dict:
+        """
+        Bring symbol state up to date with df and evaluate current candle
+
+        Args:
+            symbol: Trading symbol
+            df: Klines with 'close' (and 'time' for incremental updates)
+
+        Returns:
+            Dict with rsi, macd, macd_signal, ema, prev_macd, prev_macd_signal
+        """
+        closes = df['close'].to_numpy(dtype=float)
+        current_close = float(closes[-1])
+
+        if 'time' not in df.columns:
+            # No candle identity - cannot keep state between calls
+            return self._rebuild(closes[:-1]).evaluate(current_close)
+
+        times = df['time'].to_numpy(dtype=np.int64)
+        closed_times = times[:-1]
+        state = self._states.get(symbol)
+
+        if state is None or not self._is_continuous(state, closed_times):
+            state = self._rebuild(closes[:-1], closed_times)
+            self._states[symbol] = state
+            return state.evaluate(current_close)
+
+        start = int(np.searchsorted(closed_times, state.last_time, side='right'))
+        for i in range(start, len(closed_times)):
+            state.update(float(closes[i]), int(closed_times[i]))
+            self.incremental_updates += 1
+
+        return state.evaluate(current_close)
+
+    @staticmethod
+    def _is_continuous(state: SymbolIndicators, closed_times: np.ndarray) -> bool:
+        """State's last candle is inside the closed part of this window"""
+        if state.last_time is None or len(closed_times) == 0:
+            return False
+        if state.last_time < closed_times[0] or state.last_time > closed_times[-1]:
+            return False
+        idx = int(np.searchsorted(closed_times, state.last_time))
+        return closed_times[idx] == state.last_time
+
+    def _rebuild(self, closes: np.ndarray, times: Optional[np.ndarray] = None) -> SymbolIndicators:
+        """Seed state from a full history of closed candles"""
+        self.rebuilds += 1
+        state = SymbolIndicators(**self.params)
+        for i, close in enumerate(closes):
+            state.update(float(close), int(times[i]) if times is not None else None)
+        return state
@@ -1,6 +1,5 @@
 import pandas as pd
-import pandas_ta as ta
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 import logging
 from .base_strategy import BaseStrategy
 
@@ -12,8 +11,9 @@ class LearnedStrategy(BaseStrategy):
     Tự động điều chỉnh dựa trên patterns đã phân tích
     """
 
-    def __init__(self, analysis_results: Dict, config: Optional[Dict] = None):
-        super().__init__("Learned Strategy", config)
+    def __init__(self, analysis_results: Dict, config: Optional[Dict] = None,
+                 indicator_cache=None):
+        super().__init__("Learned Strategy", config, indicator_cache=indicator_cache)
         self.analysis = analysis_results
         self.best_hours = analysis_results.get('time_analysis', {}).get('best_trading_hours', [])
         self.best_symbols = self._get_best_symbols()
@@ -47,33 +47,46 @@ class LearnedStrategy(BaseStrategy):
         else:
             return 'BOTH'
 
-    def generate_signal(self, market_data: pd.DataFrame) -> Optional[Dict]:
+    def generate_signal(self, market_data: Union[Dict, pd.DataFrame]) -> Optional[Dict]:
         """
         Generate signal dựa trên learned patterns
 
         Args:
-            market_data: DataFrame with columns [time, open, high, low, close, volume]
+            market_data: Dict with 'symbol', 'interval', 'klines' (DataFrame),
+                or a bare DataFrame with columns [time, open, high, low, close, volume]
 
         Returns:
             Trading signal or None
         """
-        if market_data.empty or len(market_data) < 50:
+        if isinstance(market_data, dict):
+            symbol = market_data.get('symbol', 'BTC-USDT')
+            interval = market_data.get('interval')
+            klines = market_data['klines']
+        else:
+            symbol, interval, klines = 'BTC-USDT', None, market_data
+
+        if klines.empty or len(klines) < 50:
             return None
 
         # Ensure required columns
-        df = market_data.copy()
-        df.columns = ['time', 'open', 'high', 'low', 'close', 'volume']
+        df = klines.copy()
+        if not isinstance(market_data, dict):
+            df.columns = ['time', 'open', 'high', 'low', 'close', 'volume']
 
         # Convert to numeric
         for col in ['open', 'high', 'low', 'close', 'volume']:
             df[col] = pd.to_numeric(df[col], errors='coerce')
 
-        # Calculate indicators
-        df['rsi'] = ta.rsi(df['close'], length=14)
-        df['macd'] = ta.macd(df['close'])['MACD_12_26_9']
-        df['macd_signal'] = ta.macd(df['close'])['MACDs_12_26_9']
-        df['ema_50'] = ta.ema(df['close'], length=50)
-        df['ema_200'] = ta.ema(df['close'], length=200)
+        # Indicators from the shared cache (MACD computed once, reused by other strategies).
+        # EMAs keep pandas_ta's SMA seeding so early-window values match the original strategy.
+        macd_line, signal_line = self.get_indicator(
+            symbol, interval, df, 'macd', fast=12, slow=26, signal=9, sma_seed=True
+        )
+        df['rsi'] = self.get_indicator(symbol, interval, df, 'rsi', period=14)
+        df['macd'] = macd_line
+        df['macd_signal'] = signal_line
+        df['ema_50'] = self.get_indicator(symbol, interval, df, 'ema', period=50, sma_seed=True)
+        df['ema_200'] = self.get_indicator(symbol, interval, df, 'ema', period=200, sma_seed=True)
 
         # Get latest values
         latest = df.iloc[-1]
@@ -84,11 +97,12 @@ class LearnedStrategy(BaseStrategy):
         is_good_hour = current_hour in self.best_hours if self.best_hours else True
 
         # Generate signal based on learned preferences
-        signal = self._evaluate_conditions(latest, prev, is_good_hour)
+        signal = self._evaluate_conditions(latest, prev, is_good_hour, symbol)
 
         return signal
 
-    def _evaluate_conditions(self, latest: pd.Series, prev: pd.Series, is_good_hour: bool) -> Optional[Dict]:
+    def _evaluate_conditions(self, latest: pd.Series, prev: pd.Series, is_good_hour: bool,
+                             symbol: str = "BTC-USDT") -> Optional[Dict]:
         """Đánh giá điều kiện và tạo signal"""
 
         # LONG conditions
@@ -122,13 +136,13 @@ class LearnedStrategy(BaseStrategy):
 
         # Generate signal
         if long_score >= threshold and long_score > short_score:
-            return self._create_long_signal(latest, long_score)
+            return self._create_long_signal(latest, long_score, symbol)
         elif short_score >= threshold and short_score > long_score:
-            return self._create_short_signal(latest, short_score)
+            return self._create_short_signal(latest, short_score, symbol)
 
         return None
 
-    def _create_long_signal(self, latest: pd.Series, confidence: float) -> Dict:
+    def _create_long_signal(self, latest: pd.Series, confidence: float, symbol: str = "BTC-USDT") -> Dict:
         """Tạo LONG signal"""
         entry_price = float(latest['close'])
 
@@ -139,14 +153,14 @@ class LearnedStrategy(BaseStrategy):
         }
 
         return self.format_signal(
-            symbol="BTC-USDT",  # TODO: Dynamic symbol
+            symbol=symbol,
             side="LONG",
             entry_price=entry_price,
             indicators=indicators,
             confidence=confidence
         )
 
-    def _create_short_signal(self, latest: pd.Series, confidence: float) -> Dict:
+    def _create_short_signal(self, latest: pd.Series, confidence: float, symbol: str = "BTC-USDT") -> Dict:
         """Tạo SHORT signal"""
         entry_price = float(latest['close'])
 
@@ -157,7 +171,7 @@ class LearnedStrategy(BaseStrategy):
         }
 
         return self.format_signal(
-            symbol="BTC-USDT",
+            symbol=symbol,
             side="SHORT",
             entry_price=entry_price,
             indicators=indicators,
@@ -11,12 +11,22 @@ Key principles:
 - Max 5 steps to prevent runaway losses
 """
 
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterable, Tuple, Optional
 from datetime import datetime, timedelta
+from operator import attrgetter
 import logging
+import math
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# evaluate_batch outcome codes -> check_sequence_close outcomes
+BATCH_OUTCOMES = (None, 'HIT_TP1', 'HIT_TP2', 'HIT_SL')
+
+_step_number = attrgetter('step_number')
+_EPOCH = datetime(1970, 1, 1)
+
 
 class MartingaleManager:
     """Manages martingale position sequences and calculations"""
@@ -144,6 +154,28 @@ class MartingaleManager:
 
         return True, suggestion
 
+    def trigger_price(self, sequence) -> Optional[float]:
+        """
+        Price at which should_add_martingale starts firing (None at max steps)
+
+        SHORT: last_entry × (1 + trigger%), LONG: last_entry × (1 - trigger%),
+        moved by a few ulps where rounding would leave the move % just short
+        of trigger_percent, so the price itself fires the trigger
+        """
+        if sequence.current_step >= self.max_steps:
+            return None
+
+        last_entry = sequence.last_entry_price or sequence.first_entry_price
+        direction = sequence.direction.value
+        if direction == 'SHORT':
+            price, away = last_entry * (1 + self.trigger_percent / 100), math.inf
+        else:
+            price, away = last_entry * (1 - self.trigger_percent / 100), -math.inf
+
+        while self._calculate_price_move_pct(last_entry, price, direction) < self.trigger_percent:
+            price = math.nextafter(price, away)
+        return price
+
     def _calculate_price_move_pct(
         self,
         entry_price: float,
@@ -171,13 +203,7 @@ class MartingaleManager:
         - First martingale (step 1→2): 2-3x previous margin
         - Subsequent steps: 1.2-1.5x previous margin
         """
-        # Get the last signal's margin
-        if sequence.signals:
-            last_signal = sorted(sequence.signals, key=lambda s: s.step_number)[-1]
-            last_margin = last_signal.actual_margin or last_signal.recommended_margin
-        else:
-            # Fallback to total_margin / current_step
-            last_margin = sequence.total_margin / sequence.current_step
+        last_margin = self._last_margin(sequence)
 
         # Calculate multiplier based on current step
         if sequence.current_step == 1:
@@ -195,6 +221,14 @@ class MartingaleManager:
 
         return round(next_margin, 2)
 
+    @staticmethod
+    def _last_margin(sequence) -> float:
+        """Margin of the latest entry (fallback: total_margin / current_step)"""
+        if sequence.signals:
+            last_signal = max(sequence.signals, key=_step_number)
+            return last_signal.actual_margin or last_signal.recommended_margin
+        return sequence.total_margin / sequence.current_step
+
     def _calculate_new_weighted_avg(
         self,
         sequence,
@@ -344,3 +378,126 @@ class MartingaleManager:
                 return True, 'HIT_SL'
 
         return False, None
+
+    # ==================== BATCH ====================
+
+    def sequence_arrays(self, sequences: Iterable) -> Dict[str, np.ndarray]:
+        """
+        Column arrays of sequence state for evaluate_batch()
+
+        Works on PositionSequence rows and backtest SimulatedSequence objects.
+        Missing TP/SL and suggestion times become NaN. Nothing here depends
+        on the clock, so callers can cache the arrays until sequences change.
+        """
+        sequences = list(sequences)
+        n = len(sequences)
+
+        def column(values, dtype=float):
+            return np.fromiter(values, dtype=dtype, count=n)
+
+        # Enum .value is slow per row; resolve each distinct member once
+        directions = [seq.direction for seq in sequences]
+        short = {d: d.value == 'SHORT' for d in set(directions)}
+        statuses = [seq.status for seq in sequences]
+        active = {s: s.value == 'ACTIVE' for s in set(statuses)}
+
+        return {
+            'is_short': column((short[d] for d in directions), bool),
+            'active': column((active[s] for s in statuses), bool),
+            'weighted_avg_entry': column(seq.weighted_avg_entry for seq in sequences),
+            'total_margin': column(seq.total_margin for seq in sequences),
+            'last_entry': column(seq.last_entry_price or seq.first_entry_price for seq in sequences),
+            'current_step': column((seq.current_step for seq in sequences), int),
+            'last_margin': column(self._last_margin(seq) for seq in sequences),
+            'tp1': column(seq.current_tp1 or np.nan for seq in sequences),
+            'tp2': column(seq.current_tp2 or np.nan for seq in sequences),
+            'sl': column(seq.current_sl or np.nan for seq in sequences),
+            'last_suggestion': column(
+                (seq.last_martingale_suggestion_at - _EPOCH).total_seconds()
+                if seq.last_martingale_suggestion_at else np.nan
+                for seq in sequences
+            ),
+        }
+
+    def evaluate_batch(
+        self,
+        prices: np.ndarray,
+        is_short: np.ndarray,
+        weighted_avg_entry: np.ndarray,
+        total_margin: np.ndarray,
+        last_entry: np.ndarray,
+        current_step: np.ndarray,
+        tp1: np.ndarray,
+        tp2: np.ndarray,
+        sl: np.ndarray,
+        last_margin: Optional[np.ndarray] = None,
+        last_suggestion: Optional[np.ndarray] = None,
+        active: Optional[np.ndarray] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        check_sequence_close + should_add_martingale for many sequences at once
+
+        Same formulas as the scalar methods, one vectorized pass. Missing
+        TP/SL are NaN. Callers give close priority over triggers, like
+        SignalTracker.
+
+        Args:
+            prices: Current price per sequence (NaN = no price, never hits)
+            is_short: Direction per sequence (True = SHORT)
+            last_margin: Margin of the latest entry (default: total_margin / current_step)
+            last_suggestion: Last suggestion time, UTC epoch seconds (NaN = never)
+            active: Sequence status is ACTIVE (default: all)
+            now: Time for the cooldown check (default: utcnow)
+
+        Returns:
+            Dict of arrays: outcome (index into BATCH_OUTCOMES), close, trigger,
+            price_move_pct, next_margin, new_weighted_avg, new_tp1, new_tp2
+        """
+        prices = np.asarray(prices, dtype=float)
+        is_short = np.asarray(is_short, dtype=bool)
+        current_step = np.asarray(current_step)
+        active = np.ones(prices.shape, dtype=bool) if active is None else np.asarray(active, dtype=bool)
+        if last_margin is None:
+            last_margin = total_margin / current_step
+        if last_suggestion is None:
+            in_cooldown = np.zeros(prices.shape, dtype=bool)
+        else:
+            now = now or datetime.utcnow()
+            cooldown_start = (now - _EPOCH).total_seconds() - self.cooldown_minutes * 60
+            in_cooldown = np.asarray(last_suggestion) > cooldown_start
+
+        # +1 when price moving up is good for the position (LONG), -1 for SHORT
+        sign = np.where(is_short, -1.0, 1.0)
+
+        # TP2 before TP1 before SL; NaN compares False so missing levels never hit
+        with np.errstate(invalid='ignore'):
+            hit_tp2 = sign * (prices - tp2) >= 0
+            hit_tp1 = sign * (prices - tp1) >= 0
+            hit_sl = sign * (prices - sl) <= 0
+        outcome = np.select([hit_tp2, hit_tp1, hit_sl], [2, 1, 3], default=0).astype(np.int8)
+        outcome[~active] = 0
+
+        price_move_pct = -sign * (prices - last_entry) / last_entry * 100
+        trigger = (
+            active
+            & ~in_cooldown
+            & (current_step < self.max_steps)
+            & (price_move_pct >= self.trigger_percent)
+        )
+
+        multiplier = np.where(current_step == 1, self.step1_multiplier, self.step2_plus_multiplier)
+        next_margin = np.round(last_margin * multiplier, 2)
+        new_total_margin = total_margin + next_margin
+        new_weighted_avg = (weighted_avg_entry * total_margin + prices * next_margin) / new_total_margin
+
+        return {
+            'outcome': outcome,
+            'close': outcome > 0,
+            'trigger': trigger,
+            'price_move_pct': price_move_pct,
+            'next_margin': next_margin,
+            'new_weighted_avg': new_weighted_avg,
+            'new_tp1': new_weighted_avg * (1 + sign * self.tp1_percent / 100),
+            'new_tp2': new_weighted_avg * (1 + sign * self.tp2_percent / 100),
+        }
@@ -0,0 +1,146 @@
+"""
+Trigger Index - Per-symbol sorted price levels for TP/SL/martingale checks
+
+Every open signal and sequence contributes its trigger prices (TP1, TP2,
+SL and, for sequences, the next martingale entry). Levels are kept in
+two sorted arrays per symbol:
+
+    above: fire when price >= level  -> crossed = levels[:bisect_right(price)]
+    below: fire when price <= level  -> crossed = levels[bisect_left(price):]
+
+so a tick costs two bisections plus the crossed levels, independent of
+how many positions are open. The index is a prefilter: owners it returns
+are still evaluated by MartingaleManager / DatabaseManager, which own
+the rules (TP2 before TP1, cooldowns, max steps, expiry).
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SIGNAL = 'signal'
+SEQUENCE = 'sequence'
+
+ABOVE = 'above'
+BELOW = 'below'
+
+# (owner kind, owner id)
+Owner = Tuple[str, int]
+
+
+class _Levels:
+    """Sorted levels for one symbol and side, with a parallel (owner, label) array"""
+
+    __slots__ = ('prices', 'entries')
+
+    def __init__(self):
+        self.prices: List[float] = []
+        self.entries: List[Tuple[Owner, str]] = []
+
+    def insert(self, price: float, owner: Owner, label: str):
+        pos = bisect_right(self.prices, price)
+        self.prices.insert(pos, price)
+        self.entries.insert(pos, (owner, label))
+
+    def remove(self, price: float, owner: Owner, label: str):
+        lo = bisect_left(self.prices, price)
+        hi = bisect_right(self.prices, price)
+        for pos in range(lo, hi):
+            if self.entries[pos] == (owner, label):
+                del self.prices[pos]
+                del self.entries[pos]
+                return
+
+
+class TriggerIndex:
+    """Sorted trigger levels by symbol"""
+
+    def __init__(self):
+        self._levels: Dict[Tuple[str, str], _Levels] = {}
+        # owner -> [(symbol, side, price, label)] for removal
+        self._owners: Dict[Owner, List[Tuple[str, str, float, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def __contains__(self, owner: Owner) -> bool:
+        return owner in self._owners
+
+    # ==================== UPDATES ====================
+
+    def add(self, owner: Owner, symbol: str, levels: Iterable[Tuple[str, Optional[float], str]]):
+        """
+        Index an owner's trigger levels (replaces any previous ones)
+
+        Args:
+            owner: (SIGNAL | SEQUENCE, id)
+            symbol: Trading pair
+            levels: (label, price, ABOVE | BELOW); None prices are skipped
+        """
+        self.remove(owner)
+        indexed = []
+        for label, price, side in levels:
+            if price is None:
+                continue
+            book = self._levels.get((symbol, side))
+            if book is None:
+                book = self._levels[(symbol, side)] = _Levels()
+            book.insert(price, owner, label)
+            indexed.append((symbol, side, price, label))
+        if indexed:
+            self._owners[owner] = indexed
+
+    def remove(self, owner: Owner):
+        """Drop all levels of an owner"""
+        for symbol, side, price, label in self._owners.pop(owner, ()):
+            book = self._levels[(symbol, side)]
+            book.remove(price, owner, label)
+            if not book.prices:
+                del self._levels[(symbol, side)]
+
+    def add_signal(self, signal):
+        """Index a standalone signal's TP1/TP2/SL"""
+        short = signal.direction != 'LONG'
+        profit, loss = (BELOW, ABOVE) if short else (ABOVE, BELOW)
+        self.add((SIGNAL, signal.id), signal.symbol, (
+            ('HIT_TP1', signal.take_profit_1, profit),
+            ('HIT_TP2', signal.take_profit_2, profit),
+            ('HIT_SL', signal.stop_loss, loss),
+        ))
+
+    def add_sequence(self, sequence, martingale=None):
+        """Index a sequence's current TP1/TP2/SL and next martingale entry"""
+        short = sequence.direction.value == 'SHORT'
+        profit, loss = (BELOW, ABOVE) if short else (ABOVE, BELOW)
+        trigger = martingale.trigger_price(sequence) if martingale else None
+        self.add((SEQUENCE, sequence.id), sequence.symbol, (
+            ('HIT_TP1', sequence.current_tp1, profit),
+            ('HIT_TP2', sequence.current_tp2, profit),
+            ('HIT_SL', sequence.current_sl, loss),
+            ('MARTINGALE', trigger, loss),
+        ))
+
+    def rebuild(self, signals: Iterable = (), sequences: Iterable = (), martingale=None):
+        """Replace the index with the given open signals and sequences"""
+        self._levels.clear()
+        self._owners.clear()
+        for signal in signals:
+            self.add_signal(signal)
+        for sequence in sequences:
+            self.add_sequence(sequence, martingale)
+
+    # ==================== QUERIES ====================
+
+    def crossed(self, symbol: str, price: float) -> List[Tuple[Owner, str]]:
+        """(owner, label) of every level the price is at or beyond"""
+        hits = []
+        above = self._levels.get((symbol, ABOVE))
+        if above is not None:
+            hits.extend(above.entries[:bisect_right(above.prices, price)])
+        below = self._levels.get((symbol, BELOW))
+        if below is not None:
+            hits.extend(below.entries[bisect_left(below.prices, price):])
+        return hits
+
+    def crossed_owners(self, symbol: str, price: float) -> Set[Owner]:
+        """Owners with at least one crossed level"""
+        return {owner for owner, _ in self.crossed(symbol, price)}
@@ -0,0 +1,34 @@
+"""
+Timeframes - BingX kline interval arithmetic
+"""
+
+UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+# Weekly candles open on Monday 00:00 UTC; the Unix epoch was a Thursday
+WEEK_OFFSET_MS = 4 * UNIT_MS['d']
+
+
+def interval_to_ms(interval: str) -> int:
+    """
+    Convert a BingX kline interval ('15m', '4h', '1d', '1w') to milliseconds
+
+    Raises:
+        ValueError: Unsupported interval (e.g. monthly candles)
+    """
+    try:
+        count, unit = int(interval[:-1]), interval[-1]
+        return count * UNIT_MS[unit]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Unsupported kline interval: {interval}")
+
+
+def candle_open_ms(timestamp_ms: int, interval: str) -> int:
+    """Open time of the candle containing timestamp_ms (candles align to UTC)"""
+    step = interval_to_ms(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith('w') else 0
+    return (timestamp_ms - offset) // step * step + offset
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the tracker's write-through active state
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import tempfile
+import unittest
+from src.database.db_manager import DatabaseManager
+from src.database.signal_tracker import SignalTracker
+from src.strategies.martingale_manager import MartingaleManager
+
+
+def short_signal(symbol, entry=100.0):
+    return {
+        'symbol': symbol, 'side': 'SHORT', 'entry_price': entry,
+        'stop_loss': entry * 1.05, 'take_profit_1': entry * 0.92, 'take_profit_2': entry * 0.87,
+        'confidence': 0.8, 'strategy': 'Test',
+    }
+
+
+class TestActiveState(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/test.db"
+        self.db = DatabaseManager(self.url)
+        self.tracker = SignalTracker(self.db, bingx_client=None, martingale_manager=MartingaleManager())
+        self.state = self.tracker.state
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_writes_update_state_without_reload(self):
+        asyncio.run(self.tracker.reconcile())
+
+        # Any further DB read would fail the test
+        self.db.get_active_signals = self.db.get_active_sequences = None
+
+        signal = self.db.create_signal(short_signal('A-USDT'))
+        sequence = self.db.create_sequence(short_signal('B-USDT'))
+        member = self.db.create_signal(short_signal('B-USDT'), sequence_id=sequence.id)
+
+        self.assertEqual([s.id for s in self.state.signals()], [signal.id])
+        self.assertEqual([s.id for s in self.state.sequences()], [sequence.id])
+        self.assertEqual([s.id for s in self.state.sequences()[0].signals], [member.id])
+
+        self.db.add_martingale_to_sequence(sequence.id, 110.0, 20.0)
+        updated = self.state.sequences()[0]
+        self.assertEqual(updated.current_step, 2)
+        self.assertEqual([s.id for s in updated.signals], [member.id])
+
+        self.db.update_signal_prices({signal.id: 91.0})  # TP1
+        self.db.close_sequence(sequence.id, 90.0, 'HIT_TP1')
+        self.assertEqual(self.state.signals(), [])
+        self.assertEqual(self.state.sequences(), [])
+
+    def test_reconcile_picks_up_external_writes(self):
+        asyncio.run(self.tracker.reconcile())
+
+        other = DatabaseManager(self.url)
+        try:
+            external = other.create_signal(short_signal('A-USDT'))
+        finally:
+            other.engine.dispose()
+
+        self.assertEqual(self.state.signals(), [])
+        drift = asyncio.run(self.tracker.reconcile())
+        self.assertEqual(drift['signals_added'], 1)
+        self.assertEqual([s.id for s in self.state.signals()], [external.id])
+
+    def test_events_during_reload_are_replayed(self):
+        self.state.start_reload()
+        signal = self.db.create_signal(short_signal('A-USDT'))
+        # Snapshot read before the write committed
+        self.state.finish_reload([], [])
+        self.assertEqual([s.id for s in self.state.signals()], [signal.id])
+
+    def test_cycle_is_served_from_state(self):
+        signal = self.db.create_signal(short_signal('A-USDT'))
+        asyncio.run(self.tracker.reconcile())
+        self.db.get_active_signals = self.db.get_active_sequences = None
+
+        async def prices(symbols):
+            return {'A-USDT': 91.0}
+        self.tracker._get_prices = prices
+
+        asyncio.run(self.tracker._check_all_active_signals())
+        self.assertEqual(self.state.signals(), [])
+        self.assertEqual(self.db.get_signal_by_id(signal.id).status, 'CLOSED')
+
+    def test_cycle_closes_sequences_in_batch(self):
+        hit = self.db.create_sequence(short_signal('A-USDT'))
+        self.db.create_sequence(short_signal('B-USDT'))
+        asyncio.run(self.tracker.reconcile())
+
+        async def prices(symbols):
+            return {'A-USDT': 89.0, 'B-USDT': 99.0}  # A below TP1 (90)
+        self.tracker._get_prices = prices
+
+        asyncio.run(self.tracker._check_all_active_signals())
+        self.assertEqual([s.symbol for s in self.state.sequences()], ['B-USDT'])
+        self.assertEqual(self.db.get_sequence_by_id(hit.id).final_exit_price, 89.0)
+
+
+    def test_positions_opened_between_cycles_are_checked_on_ticks(self):
+        async def prices(symbols):
+            return {}
+        self.tracker._get_prices = prices
+
+        async def scenario():
+            self.tracker._loop = asyncio.get_running_loop()
+            await self.tracker._check_all_active_signals()   # Index built with nothing open
+
+            # Created from a worker thread, as the sync DatabaseManager does
+            signal = await asyncio.to_thread(self.db.create_signal, short_signal('A-USDT'))
+            sequence = await asyncio.to_thread(self.db.create_sequence, short_signal('B-USDT'))
+            await asyncio.sleep(0)
+            self.assertIn(('signal', signal.id), self.tracker.triggers)
+            self.assertIn(('sequence', sequence.id), self.tracker.triggers)
+
+            await self.tracker.on_price_tick('A-USDT', 91.0)   # TP1
+            await self.tracker.on_price_tick('B-USDT', 89.0)   # TP1 (90)
+            return signal, sequence
+
+        signal, sequence = asyncio.run(scenario())
+        self.assertEqual(self.db.get_signal_by_id(signal.id).status, 'CLOSED')
+        self.assertEqual(self.db.get_sequence_by_id(sequence.id).final_exit_price, 89.0)
+        self.assertEqual(len(self.tracker.triggers), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
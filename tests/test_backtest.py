@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the backtest engine
+
+The vectorized prefilter must not change which signals fire, and
+sequences must follow MartingaleManager's weighted-average math.
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+from src.backtest.engine import BacktestEngine, indicator_series
+from src.backtest.optimizer import ParameterOptimizer, build_strategy, build_martingale
+from src.strategies.data_driven_short_strategy import DataDrivenShortStrategy
+from src.strategies.indicator_engine import IndicatorEngine
+from src.strategies.martingale_manager import MartingaleManager
+
+MINUTE_MS = 60 * 1000
+
+
+def make_ohlc(n, seed=1, vol=0.004):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        'time': np.arange(n, dtype=np.int64) * MINUTE_MS,
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': 1.0,
+    })
+
+
+def bars_from_closes(closes):
+    """Bars that open at the previous close and trade straight to the close"""
+    closes = np.asarray(closes, dtype=float)
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    return {
+        'open': opens, 'high': np.maximum(opens, closes),
+        'low': np.minimum(opens, closes), 'close': closes,
+    }
+
+
+class TestBacktestEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_indicator_series_matches_engine(self):
+        df = make_ohlc(1000)
+        rsi, macd, signal, ema = indicator_series(df['close'].to_numpy())
+        values = IndicatorEngine().update('X', df)
+        self.assertAlmostEqual(values['rsi'], rsi[-1], places=9)
+        self.assertAlmostEqual(values['macd'], macd[-1], places=9)
+        self.assertAlmostEqual(values['macd_signal'], signal[-1], places=9)
+        self.assertAlmostEqual(values['ema'], ema[-1], places=9)
+
+    def test_prefilter_finds_same_trades_as_every_bar(self):
+        data = {f'S{k}': make_ohlc(6000, seed=k) for k in range(3)}
+        fast = BacktestEngine(DataDrivenShortStrategy(), MartingaleManager()).run(data)
+        full = BacktestEngine(DataDrivenShortStrategy(), MartingaleManager(), prefilter=False).run(data)
+        self.assertGreater(len(full.trades), 0)
+        pd.testing.assert_frame_equal(fast.trades, full.trades)
+
+    def test_martingale_step_then_tp_from_weighted_avg(self):
+        engine = BacktestEngine(DataDrivenShortStrategy(), MartingaleManager(), sequence_stop_loss=False)
+        signal = {
+            'symbol': 'X-USDT', 'side': 'SHORT', 'signal_type': 'INITIAL',
+            'entry_price': 100.0, 'recommended_margin': 20, 'recommended_leverage': 20,
+            'take_profit_1': 92.0, 'take_profit_2': 87.0, 'stop_loss': 105.0,
+        }
+        closes = [100, 108, 116, 112, 104, 99, 98]
+        times = np.arange(len(closes), dtype=np.int64) * MINUTE_MS
+
+        row, events, close_idx = engine._simulate(signal, 0, times, bars_from_closes(closes))
+
+        # Step 2 at the +15% trigger (115) with 2.5x margin
+        self.assertEqual(row['steps'], 2)
+        self.assertAlmostEqual(row['total_margin'], 70.0)
+        expected_avg = (100 * 20 + 115 * 50) / 70
+        self.assertAlmostEqual(row['weighted_avg_entry'], expected_avg, places=6)
+
+        # TP1 recalculated from weighted avg (-10%) and hit at 99
+        self.assertEqual(row['outcome'], 'HIT_TP1')
+        self.assertAlmostEqual(row['exit_price'], expected_avg * 0.9, places=6)
+        self.assertEqual(close_idx, 5)
+        self.assertEqual([delta for _, delta in events], [20, 50, -70.0])
+
+    def test_live_stop_loss_closes_before_martingale(self):
+        engine = BacktestEngine(DataDrivenShortStrategy(), MartingaleManager())
+        signal = {
+            'symbol': 'X-USDT', 'side': 'SHORT', 'signal_type': 'INITIAL',
+            'entry_price': 100.0, 'recommended_margin': 20, 'recommended_leverage': 20,
+            'take_profit_1': 92.0, 'take_profit_2': 87.0, 'stop_loss': 105.0,
+        }
+        times = np.arange(4, dtype=np.int64) * MINUTE_MS
+        row, _, _ = engine._simulate(signal, 0, times, bars_from_closes([100, 103, 120, 90]))
+        self.assertEqual(row['outcome'], 'HIT_SL')
+        self.assertEqual(row['exit_price'], 105.0)
+        self.assertEqual(row['steps'], 1)
+
+    def test_quiet_logs_restored_after_error(self):
+        engine = BacktestEngine(DataDrivenShortStrategy(), MartingaleManager())
+        strategy_log = logging.getLogger(DataDrivenShortStrategy.__module__)
+        strategy_log.setLevel(logging.DEBUG)
+        try:
+            with self.assertRaises(RuntimeError):
+                with engine._quiet_logs():
+                    self.assertEqual(strategy_log.level, logging.WARNING)
+                    raise RuntimeError("boom")
+            self.assertEqual(strategy_log.level, logging.DEBUG)
+        finally:
+            strategy_log.setLevel(logging.NOTSET)
+
+
+class TestParameterOptimizer(unittest.TestCase):
+
+    def test_parallel_sweep_matches_serial_backtest(self):
+        data = {f'S{k}': make_ohlc(3000, seed=k) for k in range(2)}
+        grid = {'sl_percent': [3, 5], 'min_confidence': [0.75], 'trigger_percent': [15]}
+
+        results = ParameterOptimizer(data, max_workers=2).grid_search(grid)
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results['error'].isna().all())
+        self.assertGreaterEqual(results['total_pnl'].iloc[0], results['total_pnl'].iloc[1])
+
+        logging.disable(logging.CRITICAL)
+        try:
+            for _, row in results.iterrows():
+                params = {name: row[name] for name in grid}
+                expected = BacktestEngine(build_strategy(params), build_martingale(params)).run(data).summary()
+                self.assertAlmostEqual(row['total_pnl'], expected['total_pnl'], places=9)
+                self.assertEqual(row['sequences'], expected['sequences'])
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the candle-close scheduler
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import unittest
+from unittest import mock
+from src.bot.candle_scheduler import (
+    CandleScheduler, interval_to_ms, candle_open_ms, STARTUP, CANDLE_CLOSE, INTRABAR
+)
+
+HOUR_MS = 3600 * 1000
+# 2024-01-01 05:30 UTC (a Monday)
+NOW_S = 1704087000
+
+
+class TestCandleMath(unittest.TestCase):
+
+    def test_interval_to_ms(self):
+        self.assertEqual(interval_to_ms('15m'), 15 * 60 * 1000)
+        self.assertEqual(interval_to_ms('4h'), 4 * HOUR_MS)
+        self.assertEqual(interval_to_ms('1d'), 24 * HOUR_MS)
+        with self.assertRaises(ValueError):
+            interval_to_ms('1M')
+
+    def test_candle_open_aligns_to_utc(self):
+        now_ms = NOW_S * 1000
+        self.assertEqual(candle_open_ms(now_ms, '4h'), (NOW_S - 5.5 * 3600) * 1000 + 4 * HOUR_MS)
+        self.assertEqual(candle_open_ms(now_ms, '1d'), (NOW_S - 5.5 * 3600) * 1000)
+        self.assertEqual(candle_open_ms(now_ms, '1w'), (NOW_S - 5.5 * 3600) * 1000)
+
+
+class TestCandleScheduler(unittest.TestCase):
+
+    def _scheduler(self, **kwargs):
+        with mock.patch('time.time', return_value=NOW_S):
+            scheduler = CandleScheduler(interval='4h', **kwargs)
+            scheduler.watch(['A-USDT', 'B-USDT'])
+        return scheduler
+
+    def test_startup_then_candle_close(self):
+        scheduler = self._scheduler(close_delay=5)
+        with mock.patch('time.time', return_value=NOW_S):
+            self.assertEqual(asyncio.run(scheduler.wait()), (STARTUP, None))
+
+        # 08:00:05 UTC - the 04:00 candle has closed
+        with mock.patch('time.time', return_value=NOW_S + 2.5 * 3600 + 5):
+            self.assertEqual(asyncio.run(scheduler.wait()), (CANDLE_CLOSE, None))
+        self.assertEqual(scheduler.candle_evaluations, 1)
+        self.assertEqual(scheduler.skipped, 29)  # 30 fixed 5-minute scans replaced by one
+
+    def test_kline_with_new_open_time_fires_close_early(self):
+        scheduler = self._scheduler(close_delay=5)
+        with mock.patch('time.time', return_value=NOW_S):
+            asyncio.run(scheduler.wait())
+            next_open = candle_open_ms(NOW_S * 1000, '4h') + 4 * HOUR_MS
+            scheduler.on_kline('A-USDT', '4h', {'T': next_open, 'c': '1.0'})
+            self.assertEqual(asyncio.run(scheduler.wait()), (CANDLE_CLOSE, None))
+
+    def test_intrabar_move_scans_only_moved_symbols(self):
+        scheduler = self._scheduler(intrabar_move_pct=2.0, intrabar_cooldown=0)
+        with mock.patch('time.time', return_value=NOW_S):
+            asyncio.run(scheduler.wait())
+            scheduler.on_price('A-USDT', 100.0)
+            scheduler.on_price('B-USDT', 50.0)
+            scheduler.on_price('A-USDT', 101.0)   # +1% - ignored
+            scheduler.on_price('B-USDT', 48.5)    # -3% - triggers
+            scheduler.on_price('C-USDT', 1.0)     # not watched
+
+            self.assertEqual(asyncio.run(scheduler.wait()), (INTRABAR, {'B-USDT'}))
+            self.assertEqual(scheduler.ignored_ticks, 1)
+
+            # Reference moves to the evaluated price
+            scheduler.on_price('B-USDT', 48.0)
+            self.assertEqual(scheduler._moved, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
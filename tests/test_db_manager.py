@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for DatabaseManager signal price updates
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import tempfile
+import unittest
+from sqlalchemy import text
+from src.database.async_db_manager import AsyncDatabaseManager
+from src.database.connection import async_database_url, create_db_engine, session_factory
+from src.database.db_manager import DatabaseManager
+from src.database.models import SignalPriceUpdate
+
+
+def short_signal(symbol, entry=100.0):
+    return {
+        'symbol': symbol, 'side': 'SHORT', 'entry_price': entry,
+        'stop_loss': entry * 1.05, 'take_profit_1': entry * 0.92, 'take_profit_2': entry * 0.87,
+        'confidence': 0.8, 'strategy': 'Test',
+    }
+
+
+class TestSignalPriceUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{self.tmp.name}/test.db")
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_batch_update_closes_hits_and_returns_them(self):
+        open_signal = self.db.create_signal(short_signal('A-USDT'))
+        tp_signal = self.db.create_signal(short_signal('B-USDT'))
+        sl_signal = self.db.create_signal(short_signal('C-USDT'))
+
+        closed = self.db.update_signal_prices({
+            open_signal.id: 99.0, tp_signal.id: 91.0, sl_signal.id: 106.0,
+        })
+
+        outcomes = {s.id: s.result.outcome for s in closed}
+        self.assertEqual(outcomes, {tp_signal.id: 'HIT_TP1', sl_signal.id: 'HIT_SL'})
+        self.assertTrue(all(s.status == 'CLOSED' for s in closed))
+        self.assertEqual([s.id for s in self.db.get_active_signals()], [open_signal.id])
+
+        session = self.db.Session()
+        try:
+            self.assertEqual(session.query(SignalPriceUpdate).count(), 3)
+        finally:
+            session.close()
+
+    def test_running_extremes_feed_result(self):
+        signal = self.db.create_signal(short_signal('A-USDT'))
+        self.db.update_signal_prices({signal.id: 99.0})
+        self.db.update_signal_price(signal.id, 103.0)
+        closed = self.db.update_signal_prices({signal.id: 91.0})
+
+        self.assertEqual(closed[0].max_price_reached, 103.0)
+        self.assertEqual(closed[0].min_price_reached, 91.0)
+        self.assertEqual(closed[0].result.max_price_reached, 103.0)
+        self.assertEqual(closed[0].result.min_price_reached, 91.0)
+
+    def test_closed_signals_are_not_updated_again(self):
+        signal = self.db.create_signal(short_signal('A-USDT'))
+        self.assertEqual(len(self.db.update_signal_prices({signal.id: 80.0})), 1)
+        self.assertEqual(self.db.update_signal_prices({signal.id: 120.0}), [])
+        self.assertEqual(self.db.update_signal_prices({}), [])
+
+
+class TestConnection(unittest.TestCase):
+
+    def test_sqlite_file_uses_wal_and_one_sessionmaker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_db_engine(f"sqlite:///{tmp}/test.db", busy_timeout=2.0)
+            try:
+                with engine.connect() as conn:
+                    self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), 'wal')
+                    self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+                    self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 2000)
+                self.assertIs(session_factory(engine), session_factory(engine))
+            finally:
+                engine.dispose()
+
+    def test_in_memory_database_is_shared(self):
+        db = DatabaseManager('sqlite://')
+        signal = db.create_signal(short_signal('A-USDT'))
+        self.assertEqual(db.get_signal_by_id(signal.id).symbol, 'A-USDT')
+
+
+class TestAsyncDatabaseManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/test.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_async(self, scenario):
+        async def wrapper():
+            db = AsyncDatabaseManager(self.url)
+            await db.init()
+            try:
+                return await scenario(db)
+            finally:
+                await db.close()
+        return asyncio.run(wrapper())
+
+    def test_url_maps_to_async_driver(self):
+        self.assertEqual(async_database_url('sqlite:///a.db').drivername, 'sqlite+aiosqlite')
+        self.assertEqual(async_database_url('postgresql://u@h/db').drivername, 'postgresql+asyncpg')
+
+    def test_signal_lifecycle_matches_sync_manager(self):
+        async def scenario(db):
+            open_signal = await db.create_signal(short_signal('A-USDT'))
+            tp_signal = await db.create_signal(short_signal('B-USDT'))
+            closed = await db.update_signal_prices({open_signal.id: 99.0, tp_signal.id: 91.0})
+            active = await db.get_active_signals()
+            loaded = await db.get_signal_by_id(tp_signal.id)
+            return open_signal, closed, active, loaded
+
+        open_signal, closed, active, loaded = self.run_async(scenario)
+        self.assertEqual([s.result.outcome for s in closed], ['HIT_TP1'])
+        self.assertEqual([s.id for s in active], [open_signal.id])
+        self.assertEqual(loaded.result.outcome, 'HIT_TP1')
+
+        # Rows written through the async engine are visible to the sync manager
+        sync_db = DatabaseManager(self.url)
+        try:
+            self.assertEqual(sync_db.get_signal_by_id(open_signal.id).status, 'ACTIVE')
+        finally:
+            sync_db.engine.dispose()
+
+    def test_sequence_lifecycle(self):
+        signal = short_signal('A-USDT')
+
+        async def scenario(db):
+            sequence = await db.create_sequence(signal)
+            await db.create_signal(signal, sequence.id)
+            active = await db.get_active_sequences()
+            closed = await db.close_sequence(sequence.id, 90.0, 'HIT_TP1')
+            return active, closed, await db.get_active_sequences()
+
+        active, closed, remaining = self.run_async(scenario)
+        self.assertEqual(len(active), 1)
+        self.assertEqual(len(active[0].signals), 1)
+        self.assertEqual(closed.final_exit_price, 90.0)
+        self.assertGreater(closed.total_pnl, 0)
+        self.assertEqual(remaining, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the paginated history downloader
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+import logging
+import tempfile
+import unittest
+from src.api.history_downloader import HistoryDownloader
+from src.api.rate_limiter import RequestBudget, TokenBucket
+from src.database.kline_store import KlineStore
+
+HOUR_MS = 3600 * 1000
+START_MS = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+class FakeClient:
+    """Serves hourly candles and orders for any time window"""
+
+    def __init__(self, fail_after=None):
+        self.kline_calls = []
+        self.order_calls = []
+        self.fail_after = fail_after
+        self.orders = [{'orderId': i, 'time': START_MS + i * HOUR_MS} for i in range(30)]
+
+    async def get_klines(self, symbol, interval, limit, start_time, end_time):
+        if self.fail_after is not None and len(self.kline_calls) >= self.fail_after:
+            raise ConnectionError("network down")
+        self.kline_calls.append((symbol, start_time, end_time))
+        times = range(start_time, end_time + 1, HOUR_MS)
+        return [{'time': t, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10.0}
+                for t in list(times)[:limit]]
+
+    async def get_trade_history(self, symbol, start_time, end_time, limit):
+        self.order_calls.append((start_time, end_time))
+        matching = [o for o in self.orders if start_time <= o['time'] <= end_time]
+        return matching[:limit]
+
+
+class TestHistoryDownloader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = KlineStore(self.root / 'klines')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_downloader(self, client, **kwargs):
+        return HistoryDownloader(
+            client, self.store, checkpoint_path=self.root / 'checkpoint.json',
+            rate_limiter=TokenBucket(10000.0), **kwargs
+        )
+
+    def test_pages_through_windows(self):
+        client = FakeClient()
+        end_ms = START_MS + 99 * HOUR_MS
+        downloader = self.make_downloader(client, kline_page=24)
+
+        stats = asyncio.run(downloader.download_klines(['A-USDT', 'B-USDT'], '1h', START_MS, end_ms))
+
+        self.assertEqual(stats['failed'], {})
+        self.assertEqual(stats['candles'], 200)
+        self.assertEqual(len(client.kline_calls), 10)  # 5 windows of <= 24 candles per symbol
+        self.assertEqual(self.store.find_gaps('A-USDT', '1h', START_MS, end_ms), [])
+        checkpoint = json.loads((self.root / 'checkpoint.json').read_text())
+        self.assertEqual(checkpoint['klines']['A-USDT|1h'], end_ms)
+
+    def test_resume_skips_completed_windows(self):
+        end_ms = START_MS + 99 * HOUR_MS
+
+        failing = FakeClient(fail_after=2)
+        stats = asyncio.run(self.make_downloader(failing, kline_page=24)
+                            .download_klines(['A-USDT'], '1h', START_MS, end_ms))
+        self.assertIn('A-USDT', stats['failed'])
+        self.assertEqual(self.store.last_time('A-USDT', '1h'), START_MS + 47 * HOUR_MS)
+
+        client = FakeClient()
+        asyncio.run(self.make_downloader(client, kline_page=24)
+                    .download_klines(['A-USDT'], '1h', START_MS, end_ms))
+
+        self.assertEqual(client.kline_calls[0][1], START_MS + 48 * HOUR_MS)
+        self.assertEqual(len(client.kline_calls), 3)
+        self.assertEqual(self.store.find_gaps('A-USDT', '1h', START_MS, end_ms), [])
+
+    def test_live_candles_do_not_block_backfill(self):
+        end_ms = START_MS + 99 * HOUR_MS
+        live = KlineStore(self.root / 'live')
+        recent = [{'time': end_ms - i * HOUR_MS, 'open': 1.0, 'high': 2.0, 'low': 0.5,
+                   'close': 1.5, 'volume': 10.0} for i in range(5)]
+        live.append('A-USDT', '1h', recent)
+
+        # Backfilling into the live store would silently drop every older candle
+        stats = asyncio.run(HistoryDownloader(
+            FakeClient(), live, checkpoint_path=self.root / 'live.json',
+            rate_limiter=TokenBucket(10000.0)
+        ).download_klines(['A-USDT'], '1h', START_MS, end_ms))
+        self.assertIn('A-USDT', stats['failed'])
+
+        # Its own store backfills the whole range regardless of the live candles
+        stats = asyncio.run(self.make_downloader(FakeClient(), kline_page=24)
+                            .download_klines(['A-USDT'], '1h', START_MS, end_ms))
+        self.assertEqual(stats['failed'], {})
+        self.assertEqual(self.store.first_time('A-USDT', '1h'), START_MS)
+        self.assertEqual(self.store.find_gaps('A-USDT', '1h', START_MS, end_ms), [])
+
+    def test_budgeted_client_is_not_throttled_twice(self):
+        client = FakeClient()
+        client.rate_budget = RequestBudget()
+        self.assertIsNone(HistoryDownloader(client, self.store, checkpoint_path=self.root / 'c.json').rate_limiter)
+        self.assertIsNotNone(HistoryDownloader(FakeClient(), self.store, checkpoint_path=self.root / 'c.json').rate_limiter)
+
+    def test_orders_follow_full_pages(self):
+        client = FakeClient()
+        downloader = self.make_downloader(client, order_page=10, order_window_days=1)
+        end_ms = START_MS + 2 * 24 * HOUR_MS - 1
+
+        stats = asyncio.run(downloader.download_orders(['A-USDT'], START_MS, end_ms, self.root / 'orders'))
+
+        self.assertEqual(stats['orders'], 30)
+        orders = HistoryDownloader.load_orders(self.root / 'orders' / 'A-USDT.jsonl')
+        self.assertEqual([o['orderId'] for o in orders], list(range(30)))
+
+        # Completed windows are not fetched again
+        calls = len(client.order_calls)
+        asyncio.run(self.make_downloader(client).download_orders(['A-USDT'], START_MS, end_ms, self.root / 'orders'))
+        self.assertEqual(len(client.order_calls), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
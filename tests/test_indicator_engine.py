@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the incremental indicator engine
+
+Incremental updates must give the same numbers as a full recompute.
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import math
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.strategies.indicator_engine import IndicatorEngine, RSIState
+from src.strategies.batch_indicators import stack_closes, ema_panel, macd_panel, rsi_panel
+from src.strategies.indicator_cache import IndicatorCache
+from src.strategies.data_driven_short_strategy import DataDrivenShortStrategy
+from src.strategies.learned_strategy import LearnedStrategy
+
+HOUR_MS = 3600 * 1000
+
+
+def make_klines(n, seed=1, start=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({'time': (np.arange(n) + start) * HOUR_MS, 'close': close})
+
+
+def wilder_rsi_reference(close, period=14):
+    """Textbook Wilder RSI on a full series"""
+    delta = np.diff(close)
+    gains = np.clip(delta, 0, None)
+    losses = np.clip(-delta, 0, None)
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+    for g, l in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + g) / period
+        avg_loss = (avg_loss * (period - 1) + l) / period
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def pandas_ta_ema(close, length):
+    """pandas_ta.ema: SMA of the first `length` closes as seed, NaN before it"""
+    close = close.copy()
+    close.iloc[length - 1] = close.iloc[:length].mean()
+    close.iloc[:length - 1] = np.nan
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def pandas_ta_macd(close, fast=12, slow=26, signal=9):
+    """pandas_ta.macd: (MACD_12_26_9, MACDs_12_26_9)"""
+    macd = pandas_ta_ema(close, fast) - pandas_ta_ema(close, slow)
+    return macd, pandas_ta_ema(macd.loc[macd.first_valid_index():], signal)
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    """Test IndicatorEngine values and incremental behaviour"""
+
+    def setUp(self):
+        self.engine = IndicatorEngine()
+        self.df = make_klines(300)
+
+    def test_ema_and_macd_match_pandas(self):
+        values = self.engine.update('BTC-USDT', self.df)
+
+        close = self.df['close']
+        ema50 = close.ewm(span=50, adjust=False).mean()
+        macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+        signal_line = macd_line.ewm(span=9, adjust=False).mean()
+
+        self.assertAlmostEqual(values['ema'], ema50.iloc[-1], places=9)
+        self.assertAlmostEqual(values['macd'], macd_line.iloc[-1], places=9)
+        self.assertAlmostEqual(values['macd_signal'], signal_line.iloc[-1], places=9)
+        self.assertAlmostEqual(values['prev_macd'], macd_line.iloc[-2], places=9)
+        self.assertAlmostEqual(values['prev_macd_signal'], signal_line.iloc[-2], places=9)
+
+    def test_rsi_is_wilder(self):
+        values = self.engine.update('BTC-USDT', self.df)
+
+        expected = wilder_rsi_reference(self.df['close'].to_numpy())
+        self.assertAlmostEqual(values['rsi'], expected, places=9)
+
+    def test_rsi_nan_until_warm(self):
+        state = RSIState(14)
+        for close in range(1, 15):
+            self.assertTrue(math.isnan(state.update(float(close))))
+        self.assertEqual(state.update(15.0), 100.0)
+
+    def test_incremental_matches_rebuild(self):
+        full = make_klines(400)
+
+        # Seed on a 200-candle window, then slide forward one candle at a time
+        for end in range(200, 260):
+            window = full.iloc[:end + 1]
+            values = self.engine.update('BTC-USDT', window)
+
+        fresh = IndicatorEngine().update('BTC-USDT', full.iloc[:260])
+        self.assertEqual(self.engine.rebuilds, 1)
+        for key in ('rsi', 'macd', 'macd_signal', 'ema', 'prev_macd', 'prev_macd_signal'):
+            self.assertAlmostEqual(values[key], fresh[key], places=9)
+
+    def test_open_candle_update_does_not_commit(self):
+        self.engine.update('BTC-USDT', self.df)
+        state_before = self.engine._states['BTC-USDT'].last_time
+
+        moved = self.df.copy()
+        moved.loc[moved.index[-1], 'close'] *= 1.05
+        self.engine.update('BTC-USDT', moved)
+
+        self.assertEqual(self.engine._states['BTC-USDT'].last_time, state_before)
+        self.assertEqual(self.engine.incremental_updates, 0)
+
+    def test_gap_triggers_rebuild(self):
+        self.engine.update('BTC-USDT', self.df)
+        later = make_klines(300, start=1000)
+
+        self.engine.update('BTC-USDT', later)
+
+        self.assertEqual(self.engine.rebuilds, 2)
+
+    def test_live_strategy_work_per_candle_independent_of_history(self):
+        history = make_klines(1300)
+        work = {}
+        for window in (200, 1000):
+            # Built the way main.py builds the live strategy
+            strategy = DataDrivenShortStrategy(enable_martingale=False)
+            engine = strategy.indicator_engine
+            for end in range(window, window + 20):
+                strategy.generate_signal({
+                    'symbol': 'BTC-USDT', 'interval': '1h',
+                    'klines': history.iloc[end - window:end].reset_index(drop=True),
+                })
+            work[window] = (engine.rebuilds, engine.incremental_updates)
+
+        # One warm-up, then one O(1) update per newly closed candle
+        self.assertEqual(work[200], (1, 19))
+        self.assertEqual(work[1000], work[200])
+
+
+class TestBatchIndicators(unittest.TestCase):
+    """Panel indicators must match the per-symbol engine row by row"""
+
+    def test_panel_matches_engine(self):
+        frames = [make_klines(200, seed=i) for i in range(5)]
+        closes = stack_closes(frames, 200)
+
+        rsi = rsi_panel(closes)
+        macd_line, signal_line = macd_panel(closes)
+        ema50 = ema_panel(closes, 50)
+
+        for i, df in enumerate(frames):
+            values = IndicatorEngine().update(f'S{i}', df)
+            self.assertAlmostEqual(rsi[i, -1], values['rsi'], places=9)
+            self.assertAlmostEqual(macd_line[i, -1], values['macd'], places=9)
+            self.assertAlmostEqual(signal_line[i, -1], values['macd_signal'], places=9)
+            self.assertAlmostEqual(macd_line[i, -2], values['prev_macd'], places=9)
+            self.assertAlmostEqual(ema50[i, -1], values['ema'], places=9)
+
+    def test_rsi_panel_warmup(self):
+        closes = stack_closes([make_klines(30)], 30)
+        rsi = rsi_panel(closes, period=14)
+
+        self.assertTrue(np.isnan(rsi[0, :14]).all())
+        self.assertFalse(np.isnan(rsi[0, 14:]).any())
+
+
+class TestBatchSignals(unittest.TestCase):
+    """generate_signals_batch must agree with generate_signal"""
+
+    def test_batch_matches_scalar_on_long_history(self):
+        strategy = DataDrivenShortStrategy(enable_martingale=False)
+        market_data = [
+            {'symbol': f'S{i}-USDT', 'interval': '1h', 'klines': make_klines(n, seed=i)}
+            for i, n in enumerate([500, 500, 320, 1000, 201])
+        ]
+        # Let every symbol through the confidence filter and record the raw values
+        strategy.symbol_boost = {m['symbol']: 1.0 for m in market_data}
+        batch = {}
+        strategy._build_signal = lambda symbol, price, confidence, values: batch.setdefault(symbol, values)
+
+        strategy.generate_signals_batch(market_data)
+
+        self.assertEqual(len(batch), len(market_data))
+        for m in market_data:
+            scalar = strategy._indicator_values(m['symbol'], m['interval'], m['klines'])
+            for name, value in scalar.items():
+                self.assertAlmostEqual(batch[m['symbol']][name], value, places=9, msg=f"{m['symbol']} {name}")
+
+
+class TestIndicatorCache(unittest.TestCase):
+    """Shared memoized indicator series"""
+
+    def test_same_candles_hit_cache(self):
+        cache = IndicatorCache()
+        df = make_klines(100)
+        first = cache.get('X', '1h', df, 'ema', period=50)
+        second = cache.get('X', '1h', df.copy(), 'ema', period=50)
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertFalse(first.flags.writeable)
+
+    def test_open_candle_price_change_misses(self):
+        cache = IndicatorCache()
+        df = make_klines(100)
+        cache.get('X', '1h', df, 'rsi', period=14)
+        moved = df.copy()
+        moved.loc[moved.index[-1], 'close'] *= 1.01
+        cache.get('X', '1h', moved, 'rsi', period=14)
+        self.assertEqual(cache.misses, 2)
+
+    def test_lru_eviction(self):
+        cache = IndicatorCache(max_entries=2)
+        df = make_klines(60)
+        for period in (5, 10, 20):
+            cache.get('X', '1h', df, 'ema', period=period)
+        self.assertEqual(len(cache), 2)
+        cache.get('X', '1h', df, 'ema', period=5)
+        self.assertEqual(cache.misses, 4)
+
+    def test_strategies_share_one_computation(self):
+        cache = IndicatorCache()
+        market_data = {'symbol': 'X-USDT', 'interval': '1h', 'klines': make_klines(300)}
+        for _ in range(2):
+            DataDrivenShortStrategy(enable_martingale=False, indicator_cache=cache).generate_signal(market_data)
+        self.assertEqual((cache.misses, cache.hits), (3, 3))   # rsi, macd, ema once each
+
+
+    def test_learned_strategy_keeps_pandas_ta_seeding(self):
+        df = make_klines(60)
+        for col in ('open', 'high', 'low', 'volume'):
+            df[col] = df['close']
+        df = df[['time', 'open', 'high', 'low', 'close', 'volume']]
+        strategy = LearnedStrategy({}, indicator_cache=IndicatorCache())
+
+        with mock.patch.object(LearnedStrategy, '_evaluate_conditions', return_value=None) as evaluate:
+            strategy.generate_signal({'symbol': 'X-USDT', 'interval': '1h', 'klines': df})
+        latest = evaluate.call_args[0][0]
+
+        ema50 = pandas_ta_ema(df['close'], 50)
+        macd, macd_signal = pandas_ta_macd(df['close'])
+        self.assertAlmostEqual(latest['ema_50'], ema50.iloc[-1], places=9)
+        self.assertAlmostEqual(latest['macd'], macd.iloc[-1], places=9)
+        self.assertAlmostEqual(latest['macd_signal'], macd_signal.iloc[-1], places=9)
+        self.assertTrue(math.isnan(latest['ema_200']))   # pandas_ta: too short for EMA 200
+        # Early in the window the seeding matters
+        first_value_seed = df['close'].ewm(span=50, adjust=False).mean().iloc[-1]
+        self.assertGreater(abs(latest['ema_50'] - first_value_seed), 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
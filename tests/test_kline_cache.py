@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Unit tests for KlineCache incremental updates
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from src.api.kline_cache import KlineCache
+from src.database.kline_store import KlineStore
+
+HOUR_MS = 3600 * 1000
+
+
+def make_candle(t, close):
+    return {'time': t, 'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1}
+
+
+class FakeClient:
+    """Async client that serves candles from a list and records requests"""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.requests = []
+
+    async def get_klines(self, symbol, interval, limit, start_time=None):
+        self.requests.append({'limit': limit, 'start_time': start_time})
+        rows = [c for c in self.candles if start_time is None or c['time'] >= start_time]
+        # BingX returns newest candles when startTime is not given
+        return rows[-limit:] if start_time is None else rows[:limit]
+
+
+class TestKlineCache(unittest.TestCase):
+    """Test KlineCache window maintenance"""
+
+    def setUp(self):
+        self.candles = [make_candle(i * HOUR_MS, 100.0 + i) for i in range(10)]
+        self.client = FakeClient(self.candles)
+        self.cache = KlineCache(self.client, max_candles=5, update_limit=3)
+
+    def get(self):
+        return asyncio.run(self.cache.get('BTC-USDT', '1h'))
+
+    def test_first_load_is_full_window(self):
+        df = self.get()
+
+        self.assertEqual(len(df), 5)
+        self.assertEqual(self.client.requests[0], {'limit': 5, 'start_time': None})
+        self.assertEqual(df['close'].iloc[-1], 109.0)
+
+    def test_open_candle_replaced_in_place(self):
+        self.get()
+        self.candles[-1]['close'] = 50.0
+
+        df = self.get()
+
+        self.assertEqual(len(df), 5)
+        self.assertEqual(df['close'].iloc[-1], 50.0)
+        self.assertEqual(self.client.requests[-1], {'limit': 3, 'start_time': 9 * HOUR_MS})
+        self.assertEqual(self.cache.incremental_loads, 1)
+
+    def test_previous_frame_not_modified(self):
+        first = self.get()
+        self.candles[-1]['close'] = 50.0
+
+        second = self.get()
+
+        self.assertEqual(first['close'].iloc[-1], 109.0)
+        self.assertEqual(second['close'].iloc[-1], 50.0)
+
+    def test_short_history_updates_incrementally(self):
+        # Newly listed symbol: fewer candles than the window
+        del self.candles[3:]
+        self.get()
+        self.candles.append(make_candle(3 * HOUR_MS, 103.0))
+
+        df = self.get()
+
+        self.assertEqual(self.cache.full_loads, 1)
+        self.assertEqual(self.cache.incremental_loads, 1)
+        self.assertEqual(self.client.requests[-1], {'limit': 3, 'start_time': 2 * HOUR_MS})
+        self.assertEqual(list(df['close']), [100.0, 101.0, 102.0, 103.0])
+
+    def test_new_candle_appended_and_window_trimmed(self):
+        self.get()
+        self.candles.append(make_candle(10 * HOUR_MS, 200.0))
+
+        df = self.get()
+
+        self.assertEqual(len(df), 5)
+        self.assertEqual(int(df['time'].iloc[0]), 6 * HOUR_MS)
+        self.assertEqual(df['close'].iloc[-1], 200.0)
+        self.assertEqual(df['close'].iloc[-2], 109.0)
+
+    def test_large_gap_triggers_reload(self):
+        self.get()
+        for i in range(10, 15):
+            self.candles.append(make_candle(i * HOUR_MS, 100.0 + i))
+
+        df = self.get()
+
+        self.assertEqual(self.cache.full_loads, 2)
+        self.assertEqual(int(df['time'].iloc[-1]), 14 * HOUR_MS)
+        self.assertEqual(len(df), 5)
+
+
+class TestKlineCacheWarmStart(unittest.TestCase):
+    """Test KlineCache seeding from an on-disk KlineStore"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp.name)
+        self.candles = [make_candle(i * HOUR_MS, 100.0 + i) for i in range(12)]
+        self.client = FakeClient(self.candles)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restart_fetches_only_candles_after_store(self):
+        self.store.append('BTC-USDT', '1h', self.candles[:10])
+        cache = KlineCache(self.client, max_candles=5, update_limit=5, store=self.store)
+
+        df = asyncio.run(cache.get('BTC-USDT', '1h'))
+
+        self.assertEqual(cache.warm_starts, 1)
+        self.assertEqual(cache.full_loads, 0)
+        self.assertEqual(self.client.requests, [{'limit': 5, 'start_time': 9 * HOUR_MS}])
+        self.assertEqual(list(df['close']), [107.0, 108.0, 109.0, 110.0, 111.0])
+        # New closed candles written through
+        self.assertEqual(self.store.last_time('BTC-USDT', '1h'), 11 * HOUR_MS)
+
+    def test_empty_store_falls_back_to_full_load(self):
+        cache = KlineCache(self.client, max_candles=5, update_limit=5, store=self.store)
+
+        asyncio.run(cache.get('BTC-USDT', '1h'))
+
+        self.assertEqual(cache.full_loads, 1)
+        self.assertEqual(len(self.store.read('BTC-USDT', '1h')['time']), 5)
+
+    def test_store_writes_run_off_the_event_loop(self):
+        cache = KlineCache(self.client, max_candles=5, update_limit=5, store=self.store)
+        writer_threads = []
+        append = self.store.append
+
+        def recording_append(*args, **kwargs):
+            writer_threads.append(threading.get_ident())
+            return append(*args, **kwargs)
+
+        self.store.append = recording_append
+
+        async def load():
+            await cache.get('BTC-USDT', '1h')
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(load())
+
+        self.assertEqual(len(writer_threads), 1)
+        self.assertNotEqual(writer_threads[0], loop_thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk KlineStore
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.database.kline_store import KlineStore
+
+HOUR_MS = 3600 * 1000
+# 2024-01-31 20:00 UTC - a few candles before a month boundary
+START_MS = 1706731200000
+
+
+def make_klines(start_index, n):
+    times = START_MS + (np.arange(n) + start_index) * HOUR_MS
+    close = 100.0 + np.arange(n) + start_index
+    return pd.DataFrame({
+        'time': times, 'open': close, 'high': close + 1,
+        'low': close - 1, 'close': close, 'volume': 1.0,
+    })
+
+
+class TestKlineStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_partitions_by_month(self):
+        written = self.store.append('BTC-USDT', '1h', make_klines(0, 10))
+
+        self.assertEqual(written, 10)
+        self.assertEqual(self.store.partitions('BTC-USDT', '1h'), ['2024-01', '2024-02'])
+        data = self.store.read('BTC-USDT', '1h')
+        np.testing.assert_array_equal(data['time'], make_klines(0, 10)['time'].to_numpy())
+        self.assertEqual(data['close'][-1], 109.0)
+
+    def test_append_only_newer_closed_candles(self):
+        self.store.append('BTC-USDT', '1h', make_klines(0, 5))
+
+        # Overlapping page: only candles 5..7 are new
+        written = self.store.append('BTC-USDT', '1h', make_klines(3, 5))
+        self.assertEqual(written, 3)
+
+        # Still-open candle is not stored
+        now = START_MS + 9 * HOUR_MS + 60 * 1000
+        written = self.store.append('BTC-USDT', '1h', make_klines(8, 2), now_ms=now)
+        self.assertEqual(written, 1)
+        self.assertEqual(self.store.last_time('BTC-USDT', '1h'), START_MS + 8 * HOUR_MS)
+
+    def test_range_read_inside_month_is_zero_copy(self):
+        self.store.append('BTC-USDT', '1h', make_klines(0, 10))
+
+        data = self.store.read('BTC-USDT', '1h', start=START_MS + 5 * HOUR_MS, end=START_MS + 7 * HOUR_MS)
+
+        self.assertIsInstance(data['close'], np.memmap)
+        self.assertFalse(data['close'].flags.writeable)
+        np.testing.assert_array_equal(data['close'], [105.0, 106.0, 107.0])
+
+    def test_find_gaps(self):
+        self.store.append('BTC-USDT', '1h', make_klines(0, 3))
+        self.store.append('BTC-USDT', '1h', make_klines(6, 2))
+
+        gaps = self.store.find_gaps('BTC-USDT', '1h', end=START_MS + 10 * HOUR_MS)
+
+        self.assertEqual(gaps, [
+            (START_MS + 3 * HOUR_MS, START_MS + 5 * HOUR_MS),
+            (START_MS + 8 * HOUR_MS, START_MS + 10 * HOUR_MS),
+        ])
+
+    def test_interrupted_append_is_repaired(self):
+        self.store.append('BTC-USDT', '1h', make_klines(0, 3))
+        partition = Path(self.tmp.name) / 'BTC-USDT' / '1h' / '2024-01'
+        with open(partition / 'close.bin', 'ab') as f:
+            f.write(np.array([999.0]).tobytes())  # Crash after one column
+
+        self.assertEqual(len(self.store.read('BTC-USDT', '1h')['close']), 3)
+        self.store.append('BTC-USDT', '1h', make_klines(3, 1))
+        self.assertEqual(os.path.getsize(partition / 'close.bin'), 4 * 8)
+        self.assertEqual(self.store.read('BTC-USDT', '1h')['close'][-1], 103.0)
+
+    def test_tail_across_months(self):
+        self.store.append('BTC-USDT', '1h', make_klines(0, 10))
+
+        data = self.store.tail('BTC-USDT', '1h', 6)
+
+        np.testing.assert_array_equal(data['close'], np.arange(104.0, 110.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,7 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import unittest
 from unittest.mock import Mock
-from src.strategies.martingale_manager import MartingaleManager
+from src.strategies.martingale_manager import MartingaleManager, BATCH_OUTCOMES
 from src.database.models import PositionSequence, BotSignal, TradeDirection, SequenceStatus, SignalType
 from datetime import datetime
 
@@ -378,6 +378,80 @@ class TestMartingaleManager(unittest.TestCase):
         self.assertGreater(pnl['total_pnl'], 0, "Historical trade was profitable")
         self.assertGreater(pnl['pnl_pct'], 0, "PnL % should be positive")
 
+    def test_last_margin_uses_highest_step(self):
+        """Latest entry margin without relying on signal order"""
+        sequence = Mock()
+        sequence.signals = [Mock(step_number=2, actual_margin=50.0), Mock(step_number=1, actual_margin=20.0)]
+        self.assertEqual(self.manager._last_margin(sequence), 50.0)
+
+    def test_batch_matches_scalar(self):
+        """evaluate_batch agrees with check_sequence_close / should_add_martingale"""
+        import random
+        import numpy as np
+        from src.backtest.engine import SimulatedSequence
+
+        rng = random.Random(3)
+        sequences, prices = [], []
+        for i in range(300):
+            entry = rng.uniform(0.001, 100)
+            side = rng.choice(['SHORT', 'LONG'])
+            sign = -1 if side == 'SHORT' else 1
+            seq = SimulatedSequence(i, {
+                'symbol': 'X-USDT', 'side': side, 'entry_price': entry,
+                'recommended_margin': rng.choice([10, 20, 35]),
+                'take_profit_1': entry * (1 + sign * 0.10), 'take_profit_2': entry * (1 + sign * 0.15),
+                'stop_loss': entry * (1 - sign * 0.30) if rng.random() < 0.5 else None,
+            }, opened_at=0, max_steps=5)
+            for _ in range(rng.randint(0, 3)):
+                _, suggestion = self.manager.should_add_martingale(seq, seq.last_entry_price * (1 - sign * 0.2))
+                seq.add_entry(suggestion, 0)
+            if rng.random() < 0.2:
+                seq.last_martingale_suggestion_at = datetime.utcnow()
+            sequences.append(seq)
+            prices.append(seq.last_entry_price * rng.uniform(0.7, 1.3))
+
+        batch = self.manager.evaluate_batch(np.array(prices), **self.manager.sequence_arrays(sequences))
+
+        for i, (seq, price) in enumerate(zip(sequences, prices)):
+            should_close, outcome = self.manager.check_sequence_close(seq, price)
+            should_add, suggestion = self.manager.should_add_martingale(seq, price)
+            self.assertEqual(bool(batch['close'][i]), should_close)
+            self.assertEqual(BATCH_OUTCOMES[batch['outcome'][i]], outcome)
+            self.assertEqual(bool(batch['trigger'][i]), should_add)
+            if should_add:
+                self.assertAlmostEqual(batch['next_margin'][i], suggestion['suggested_margin'], places=6)
+                self.assertAlmostEqual(batch['new_weighted_avg'][i], suggestion['new_weighted_avg'], places=9)
+                self.assertAlmostEqual(batch['new_tp1'][i], suggestion['new_tp1'], places=9)
+                self.assertAlmostEqual(batch['new_tp2'][i], suggestion['new_tp2'], places=9)
+
+    def test_trigger_price_is_exact_threshold(self):
+        """trigger_price fires both kernels; one ulp before it fires neither"""
+        import math
+        import random
+        import numpy as np
+        from src.backtest.engine import SimulatedSequence
+
+        rng = random.Random(5)
+        for i in range(500):
+            side = rng.choice(['SHORT', 'LONG'])
+            seq = SimulatedSequence(i, {'symbol': 'X-USDT', 'side': side, 'entry_price': rng.uniform(1e-4, 1e5)},
+                                    opened_at=0, max_steps=5)
+            trigger = self.manager.trigger_price(seq)
+            before = math.nextafter(trigger, seq.last_entry_price)
+
+            batch = self.manager.evaluate_batch(
+                np.array([trigger, before]), **self.manager.sequence_arrays([seq, seq])
+            )
+            self.assertEqual(list(batch['trigger']), [True, False])
+            self.assertTrue(self.manager.should_add_martingale(seq, trigger)[0])
+            self.assertFalse(self.manager.should_add_martingale(seq, before)[0])
+
+    def test_batch_empty(self):
+        """No sequences -> empty arrays"""
+        import numpy as np
+        batch = self.manager.evaluate_batch(np.array([]), **self.manager.sequence_arrays([]))
+        self.assertEqual(batch['close'].shape, (0,))
+
 
 def run_tests():
     """Run all tests"""
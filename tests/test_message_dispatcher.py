@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Unit tests for MessageDispatcher
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+import unittest
+from telegram.error import RetryAfter
+from src.api.rate_limiter import TokenBucket
+from src.bot.message_dispatcher import MessageDispatcher, HIGH, NORMAL, LOW
+
+
+class FakeTelegram:
+    """Records sends; optionally fails the first N with flood-wait"""
+
+    def __init__(self, flood_waits=0):
+        self.sent = []
+        self.flood_waits = flood_waits
+
+    async def send(self, chat_id, text, parse_mode):
+        if self.flood_waits:
+            self.flood_waits -= 1
+            raise RetryAfter(0)
+        self.sent.append((chat_id, text))
+
+
+class TestMessageDispatcher(unittest.TestCase):
+
+    def run_dispatcher(self, dispatcher, produce, timeout=5.0):
+        async def scenario():
+            produce(dispatcher)
+            dispatcher.start()
+            await dispatcher.stop(timeout=timeout)
+        asyncio.run(scenario())
+
+    def test_priority_order_and_no_merge_for_signals(self):
+        telegram = FakeTelegram()
+        dispatcher = MessageDispatcher(telegram.send, chat_rate=1000, chat_burst=1000)
+
+        def produce(d):
+            d.enqueue(1, 'report', priority=LOW, coalesce=False)
+            d.enqueue(1, 'signal A', priority=HIGH, coalesce=False)
+            d.enqueue(1, 'signal B', priority=HIGH, coalesce=False)
+
+        self.run_dispatcher(dispatcher, produce)
+        self.assertEqual([text for _, text in telegram.sent], ['signal A', 'signal B', 'report'])
+
+    def test_burst_is_coalesced(self):
+        telegram = FakeTelegram()
+        dispatcher = MessageDispatcher(telegram.send, chat_rate=1000, chat_burst=1)
+
+        def produce(d):
+            for i in range(20):
+                d.enqueue(1, f"closed {i}")
+
+        self.run_dispatcher(dispatcher, produce)
+        self.assertLess(len(telegram.sent), 20)
+        merged = '\n\n'.join(text for _, text in telegram.sent)
+        self.assertEqual(merged, '\n\n'.join(f"closed {i}" for i in range(20)))
+        stats = dispatcher.stats()
+        self.assertEqual(stats['sent'], 20)
+        self.assertEqual(stats['coalesced'], 20 - len(telegram.sent))
+
+    def test_slow_chat_does_not_block_others(self):
+        telegram = FakeTelegram()
+        dispatcher = MessageDispatcher(telegram.send, chat_rate=0.5, chat_burst=1)
+
+        def produce(d):
+            d.enqueue('slow', 'a1', coalesce=False)
+            d.enqueue('slow', 'a2', coalesce=False)  # Waits ~2s for the chat bucket
+            for i in range(5):
+                d.enqueue(f"chat{i}", 'b')
+
+        self.run_dispatcher(dispatcher, produce, timeout=0.5)
+        chats = [chat for chat, _ in telegram.sent]
+        self.assertEqual(chats.count('slow'), 1)
+        self.assertEqual(len(chats), 6)
+
+    def test_flood_wait_is_retried(self):
+        telegram = FakeTelegram(flood_waits=2)
+        dispatcher = MessageDispatcher(telegram.send, chat_rate=1000, chat_burst=1000)
+
+        self.run_dispatcher(dispatcher, lambda d: d.enqueue(1, 'hello'))
+        self.assertEqual(telegram.sent, [(1, 'hello')])
+        self.assertEqual(dispatcher.stats()['retries'], 2)
+        self.assertEqual(dispatcher.global_bucket.rate_limited, 2)
+
+    def test_fan_out_sends_chats_concurrently(self):
+        in_flight, peak, sent = set(), [0], []
+
+        async def slow_send(chat_id, text, parse_mode):
+            self.assertNotIn(chat_id, in_flight)   # one send per chat at a time
+            in_flight.add(chat_id)
+            peak[0] = max(peak[0], len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.discard(chat_id)
+            if chat_id == 7:
+                raise ValueError("chat not found")
+            sent.append(chat_id)
+
+        errors = []
+
+        async def on_error(chat_id, error):
+            errors.append(chat_id)
+
+        dispatcher = MessageDispatcher(slow_send, global_rate=1000, chat_rate=1000, chat_burst=1000,
+                                       concurrency=8, on_error=on_error)
+
+        def produce(d):
+            for chat_id in range(40):
+                d.enqueue(chat_id, 'signal', priority=HIGH, coalesce=False)
+
+        started = time.monotonic()
+        self.run_dispatcher(dispatcher, produce)
+        elapsed = time.monotonic() - started
+
+        # 40 x 50ms sequentially would take 2s; 8 at a time takes ~0.25s
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(peak[0], 8)
+        self.assertEqual(sorted(sent), [c for c in range(40) if c != 7])
+        self.assertEqual(errors, [7])
+        self.assertEqual(dispatcher.stats()['failed'], 1)
+
+    def test_full_queue_evicts_lowest_priority(self):
+        dispatcher = MessageDispatcher(FakeTelegram().send, max_queue=2)
+        self.assertTrue(dispatcher.enqueue(1, 'low', priority=LOW))
+        self.assertTrue(dispatcher.enqueue(1, 'normal', priority=NORMAL))
+        self.assertTrue(dispatcher.enqueue(1, 'signal', priority=HIGH))   # evicts 'low'
+        self.assertFalse(dispatcher.enqueue(1, 'low 2', priority=LOW))   # nothing worse to evict
+        self.assertEqual(dispatcher.queue_depth, 2)
+        self.assertEqual(dispatcher.stats()['dropped'], 2)
+
+
+class TestTokenBucketPeek(unittest.TestCase):
+
+    def test_available_in_does_not_consume(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        self.assertEqual(bucket.available_in(), 0)
+        self.assertEqual(bucket.available_in(), 0)
+        bucket.reserve()
+        self.assertGreater(bucket.available_in(), 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared request budget
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import logging
+import threading
+import time
+import unittest
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+from src.api.async_bingx_client import AsyncBingXClient
+from src.api.bingx_client import BingXClient
+from src.api.rate_limiter import RequestBudget, TokenBucket, retry_after_seconds
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        return self.responses.pop(0)
+
+
+class FakeAsyncResponse:
+
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload or {}
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            request_info = aiohttp.RequestInfo(URL('https://bingx.test'), 'GET', CIMultiDictProxy(CIMultiDict()))
+            raise aiohttp.ClientResponseError(request_info, (), status=self.status)
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeAsyncSession(FakeSession):
+    closed = False
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_reservations_queue_in_order(self):
+        bucket = TokenBucket(rate=10.0, capacity=2.0)
+        delays = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.1, places=2)
+        self.assertAlmostEqual(delays[3], 0.2, places=2)
+        self.assertEqual(bucket.throttled, 2)
+
+    def test_penalize_pauses_bucket(self):
+        bucket = TokenBucket(rate=100.0)
+        bucket.penalize(0.5)
+        self.assertGreaterEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.rate_limited, 1)
+
+    def test_queue_depth_counts_waiting_threads(self):
+        bucket = TokenBucket(rate=20.0, capacity=1.0)
+        bucket.reserve()
+        threads = [threading.Thread(target=bucket.acquire_sync) for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.02)
+        self.assertEqual(bucket.queue_depth, 3)
+        for t in threads:
+            t.join()
+        self.assertEqual(bucket.queue_depth, 0)
+
+    def test_retry_after_parsing(self):
+        self.assertEqual(retry_after_seconds('3'), 3.0)
+        self.assertEqual(retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT', 2.0), 2.0)
+        self.assertEqual(retry_after_seconds(None), 1.0)
+
+
+class TestClientBudget(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_429_pauses_shared_bucket_and_retries(self):
+        budget = RequestBudget(public_rate=100.0, signed_rate=100.0)
+        client = BingXClient('key', 'secret', rate_budget=budget)
+        client.session = FakeSession([
+            FakeResponse(429, headers={'Retry-After': '0.05'}),
+            FakeResponse(200, {'code': 0, 'data': {'price': '1.5'}}),
+        ])
+
+        started = time.monotonic()
+        self.assertEqual(client.get_ticker_price('BTC-USDT'), {'price': '1.5'})
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(budget.public.rate_limited, 1)
+        self.assertEqual(budget.signed.requests, 0)
+        self.assertEqual(len(client.session.calls), 2)
+
+    def test_signed_requests_use_signed_bucket(self):
+        budget = RequestBudget()
+        client = BingXClient('key', 'secret', rate_budget=budget)
+        client.session = FakeSession([FakeResponse(200, {'code': 0, 'data': []})])
+
+        client.get_all_positions()
+
+        self.assertEqual(budget.signed.requests, 1)
+        self.assertIn('signature', client.session.calls[0])
+
+
+    def test_async_client_does_not_retry_client_errors(self):
+        client = AsyncBingXClient('key', 'secret', backoff_base=0.001)
+        client._session = FakeAsyncSession([FakeAsyncResponse(400), FakeAsyncResponse(200, {'code': 0})])
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            asyncio.run(client._request('GET', '/openApi/swap/v2/user/positions'))
+        self.assertEqual(len(client._session.calls), 1)
+
+    def test_async_client_retries_server_errors(self):
+        client = AsyncBingXClient('key', 'secret', backoff_base=0.001)
+        client._session = FakeAsyncSession([FakeAsyncResponse(503), FakeAsyncResponse(200, {'code': 0})])
+
+        self.assertEqual(asyncio.run(client._request('GET', '/openApi/swap/v2/user/positions')), {'code': 0})
+        self.assertEqual(len(client._session.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
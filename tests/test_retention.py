@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for signal_price_updates retention
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from src.database.db_manager import DatabaseManager
+from src.database.models import SignalPriceSummary, SignalPriceUpdate
+from src.database.retention import PriceRetention
+
+NOW = datetime(2024, 3, 10, 12, 30)
+
+
+class TestPriceRetention(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{self.tmp.name}/test.db")
+        self.fill()
+
+    def fill(self):
+        self.signal = self.db.create_signal({
+            'symbol': 'A-USDT', 'side': 'SHORT', 'entry_price': 100.0,
+            'stop_loss': 105.0, 'take_profit_1': 92.0, 'take_profit_2': 87.0,
+        })
+
+        # One row per minute for 3 days, price = minute index within the hour
+        start = NOW - timedelta(days=3)
+        with self.db.engine.begin() as conn:
+            conn.execute(SignalPriceUpdate.__table__.insert(), [
+                {
+                    'signal_id': self.signal.id,
+                    'current_price': 100.0 + (start + timedelta(minutes=i)).minute,
+                    'timestamp': start + timedelta(minutes=i),
+                }
+                for i in range(3 * 24 * 60)
+            ])
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def count(self, model):
+        session = self.db.Session()
+        try:
+            return session.query(model).count()
+        finally:
+            session.close()
+
+    def test_rolls_old_rows_into_hourly_ohlc(self):
+        retention = PriceRetention(self.db, raw_days=1, bucket='1h', chunk_hours=5)
+        stats = retention.compact(now=NOW)
+
+        cutoff = datetime(2024, 3, 9, 12, 0)
+        self.assertEqual(stats['cutoff'], cutoff)
+        self.assertEqual(stats['rows_deleted'], 3 * 24 * 60 - (NOW - cutoff) // timedelta(minutes=1))
+        self.assertEqual(self.count(SignalPriceUpdate), (NOW - cutoff) // timedelta(minutes=1))
+        self.assertEqual(stats['summaries_written'], self.count(SignalPriceSummary))
+
+        session = self.db.Session()
+        try:
+            full_hour = session.query(SignalPriceSummary).filter_by(
+                bucket_start=datetime(2024, 3, 8, 3, 0)
+            ).one()
+        finally:
+            session.close()
+        self.assertEqual(full_hour.samples, 60)
+        self.assertEqual((full_hour.open_price, full_hour.close_price), (100.0, 159.0))
+        self.assertEqual((full_hour.low_price, full_hour.high_price), (100.0, 159.0))
+
+    def test_second_run_is_noop_and_space_is_reclaimed(self):
+        retention = PriceRetention(self.db, raw_days=0.5, bucket='1d')
+        first = retention.compact(now=NOW)
+        self.assertGreater(first['bytes_reclaimed'], 0)
+
+        second = retention.compact(now=NOW)
+        self.assertEqual(second['rows_deleted'], 0)
+        self.assertEqual(second['summaries_written'], 0)
+
+    def test_vacuum_releases_pages_in_steps(self):
+        self.assertEqual(self.pragma('auto_vacuum'), 2)   # New files start incremental
+
+        stats = PriceRetention(self.db, raw_days=0.5, bucket='1d', vacuum_pages=5).compact(now=NOW)
+
+        self.assertGreater(stats['bytes_reclaimed'], 0)
+        self.assertEqual(self.pragma('freelist_count'), 0)
+
+    def test_legacy_file_is_never_fully_vacuumed(self):
+        # File created before incremental auto_vacuum was the default
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+        self.tmp = tempfile.TemporaryDirectory()
+        path = f"{self.tmp.name}/legacy.db"
+        legacy = sqlite3.connect(path)
+        legacy.execute("CREATE TABLE legacy (id INTEGER)")
+        legacy.close()
+        self.db = DatabaseManager(f"sqlite:///{path}")
+        self.fill()
+
+        stats = PriceRetention(self.db, raw_days=0.5, bucket='1d').compact(now=NOW)
+
+        self.assertGreater(stats['rows_deleted'], 0)
+        self.assertEqual(self.pragma('auto_vacuum'), 0)   # Conversion is left to the migration
+        self.assertGreater(self.pragma('freelist_count'), 0)
+
+    def pragma(self, name):
+        with self.db.engine.connect() as conn:
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the subscriber registry and signal fan-out
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest import mock
+from telegram.error import Forbidden
+from telegram.ext import ApplicationBuilder
+from telegram.request import BaseRequest
+from src.bot.subscribers import SubscriberRegistry
+from src.bot.telegram_bot import TradingSignalBot
+from src.database.db_manager import DatabaseManager
+
+
+class FakeBotApi(BaseRequest):
+    """Answers Bot API calls locally; getUpdates hands out `updates` once"""
+
+    def __init__(self, updates=()):
+        self.updates = list(updates)
+        self.calls = []
+
+    @property
+    def read_timeout(self):
+        return 1.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit('/', 1)[-1]
+        params = request_data.parameters if request_data else {}
+        self.calls.append((endpoint, params))
+
+        if endpoint == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'SignalA', 'username': 'signala_bot'}
+        elif endpoint == 'getUpdates':
+            result, self.updates = self.updates, []
+            if not result:
+                await asyncio.sleep(0.01)
+        elif endpoint == 'sendMessage':
+            result = {'message_id': len(self.calls), 'date': 0, 'text': params['text'],
+                      'chat': {'id': int(params['chat_id']), 'type': 'private'}}
+        else:
+            result = True
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+
+def command_update(update_id, chat_id, text):
+    command = text.split()[0]
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id, 'date': 0, 'text': text,
+            'chat': {'id': chat_id, 'type': 'private', 'username': f'user{chat_id}'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'User'},
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command)}],
+        },
+    }
+
+
+class TestSubscriberRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{self.tmp.name}/test.db")
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_subscriptions_persist_and_reactivate(self):
+        registry = SubscriberRegistry(self.db)
+
+        async def scenario():
+            self.assertTrue(await registry.subscribe(-1001, 'Channel'))
+            self.assertFalse(await registry.subscribe('-1001'))
+            self.assertTrue(await registry.subscribe(42))
+            self.assertTrue(await registry.unsubscribe(42, 'blocked'))
+            self.assertFalse(await registry.unsubscribe(42))
+
+        asyncio.run(scenario())
+
+        reloaded = SubscriberRegistry(self.db)
+        self.assertEqual(reloaded.load(), 1)
+        self.assertIn(-1001, reloaded)
+        self.assertNotIn(42, reloaded)
+
+        asyncio.run(reloaded.subscribe(42))
+        self.assertEqual(sorted(s.chat_id for s in self.db.get_active_subscribers()), ['-1001', '42'])
+        self.assertIsNone(self.db.get_active_subscribers()[1].last_error)
+
+    def test_broadcast_renders_once_and_drops_blocked_chats(self):
+        registry = SubscriberRegistry(self.db)
+        for chat_id in ('100', '200', '300', 'admin'):
+            self.db.add_subscriber(chat_id)
+        registry.load()
+
+        sent = []
+
+        async def deliver(chat_id, text, parse_mode):
+            if chat_id == '200':
+                raise Forbidden("Forbidden: bot was blocked by the user")
+            sent.append((chat_id, text))
+
+        bot = TradingSignalBot('token', 'admin', chat_rate=1000, subscribers=registry)
+        bot.dispatcher.send = deliver
+
+        async def scenario():
+            bot.dispatcher.start()
+            await bot.send_message('TP hit', broadcast=True)
+            await bot.send_message('admin only')
+            await bot.dispatcher.stop(timeout=5)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(sorted(chat for chat, text in sent if text == 'TP hit'), ['100', '300'])
+        # The primary chat's two notifications are merged into one send
+        self.assertEqual([text for chat, text in sent if chat == 'admin'], ['TP hit\n\nadmin only'])
+        self.assertNotIn('200', registry)
+        self.assertEqual(sorted(s.chat_id for s in self.db.get_active_subscribers()), ['100', '300', 'admin'])
+
+
+    def test_polled_commands_reach_registry(self):
+        registry = SubscriberRegistry(self.db)
+        api = FakeBotApi()
+        polling = FakeBotApi([
+            command_update(1, 100, '/subscribe -1001'),   # Primary (admin) chat approves a channel
+            command_update(2, 55, '/subscribe'),          # Unknown chat asks for itself
+        ])
+        builder = lambda: ApplicationBuilder().request(api).get_updates_request(polling)
+
+        async def scenario():
+            with mock.patch('src.bot.telegram_bot.Application.builder', builder):
+                bot = TradingSignalBot('123:abc', '100', subscribers=registry)
+                await bot.initialize()
+            await bot.start()
+            try:
+                for _ in range(200):
+                    replies = [p['chat_id'] for endpoint, p in api.calls if endpoint == 'sendMessage']
+                    if len(replies) >= 2:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await bot.stop()
+            self.assertFalse(bot.app.updater.running)
+
+        asyncio.run(scenario())
+
+        self.assertIn('-1001', registry)
+        self.assertNotIn(55, registry)
+        self.assertEqual([s.chat_id for s in self.db.get_active_subscribers()], ['-1001'])
+        rejection = [p['text'] for endpoint, p in api.calls if endpoint == 'sendMessage' and p['chat_id'] == 55]
+        self.assertIn('/subscribe 55', rejection[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
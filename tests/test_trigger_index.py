@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Unit tests for TriggerIndex
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+import unittest
+from types import SimpleNamespace
+from src.database.db_manager import DatabaseManager
+from src.database.models import TradeDirection, SequenceStatus
+from src.strategies.martingale_manager import MartingaleManager
+from src.strategies.trigger_index import TriggerIndex, SIGNAL, SEQUENCE
+from datetime import datetime
+
+
+def make_signal(signal_id, symbol, entry, direction='SHORT'):
+    sign = -1 if direction == 'SHORT' else 1
+    return SimpleNamespace(
+        id=signal_id, symbol=symbol, direction=direction, signal_time=datetime.utcnow(),
+        take_profit_1=entry * (1 + sign * 0.08), take_profit_2=entry * (1 + sign * 0.13),
+        stop_loss=entry * (1 - sign * 0.05),
+    )
+
+
+def make_sequence(sequence_id, symbol, entry, direction=TradeDirection.SHORT, step=1):
+    sign = -1 if direction == TradeDirection.SHORT else 1
+    return SimpleNamespace(
+        id=sequence_id, symbol=symbol, direction=direction, status=SequenceStatus.ACTIVE,
+        current_step=step, first_entry_price=entry, last_entry_price=entry,
+        current_tp1=entry * (1 + sign * 0.10), current_tp2=entry * (1 + sign * 0.15),
+        current_sl=None, last_martingale_suggestion_at=None,
+        weighted_avg_entry=entry, total_margin=20.0, max_steps=5, signals=[],
+    )
+
+
+class TestTriggerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.martingale = MartingaleManager(max_steps=5, trigger_percent=15.0)
+        self.index = TriggerIndex()
+
+    def test_short_signal_levels(self):
+        self.index.add_signal(make_signal(1, 'A-USDT', 100.0))
+
+        self.assertEqual(self.index.crossed('A-USDT', 100.0), [])
+        self.assertEqual(self.index.crossed('B-USDT', 50.0), [])
+        self.assertEqual(self.index.crossed('A-USDT', 106.0), [((SIGNAL, 1), 'HIT_SL')])
+        self.assertEqual(
+            sorted(label for _, label in self.index.crossed('A-USDT', 85.0)), ['HIT_TP1', 'HIT_TP2']
+        )
+
+    def test_long_sequence_martingale_level(self):
+        sequence = make_sequence(7, 'A-USDT', 100.0, TradeDirection.LONG)
+        self.index.add_sequence(sequence, self.martingale)
+
+        self.assertEqual(self.index.crossed('A-USDT', 86.0), [])
+        self.assertEqual(self.index.crossed('A-USDT', 85.0), [((SEQUENCE, 7), 'MARTINGALE')])
+
+        # No further martingale level once at max steps
+        sequence.current_step = 5
+        self.index.add_sequence(sequence, self.martingale)
+        self.assertEqual(self.index.crossed('A-USDT', 50.0), [])
+
+    def test_remove_and_replace(self):
+        self.index.add_signal(make_signal(1, 'A-USDT', 100.0))
+        self.index.add_signal(make_signal(2, 'A-USDT', 100.0))
+        self.index.remove((SIGNAL, 1))
+
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.crossed_owners('A-USDT', 200.0), {(SIGNAL, 2)})
+
+        self.index.add_signal(make_signal(2, 'A-USDT', 300.0))  # re-add replaces levels
+        self.assertEqual(self.index.crossed_owners('A-USDT', 200.0), {(SIGNAL, 2)})
+        self.assertEqual(self.index.crossed_owners('A-USDT', 310.0), set())
+
+    def test_matches_linear_checks(self):
+        rng = random.Random(7)
+        signals = [
+            make_signal(i, f"S{i % 5}-USDT", rng.uniform(1, 100), rng.choice(['SHORT', 'LONG']))
+            for i in range(200)
+        ]
+        sequences = [
+            make_sequence(i, f"S{i % 5}-USDT", rng.uniform(1, 100),
+                          rng.choice([TradeDirection.SHORT, TradeDirection.LONG]), rng.randint(1, 5))
+            for i in range(200)
+        ]
+        self.index.rebuild(signals, sequences, self.martingale)
+
+        for _ in range(500):
+            symbol = f"S{rng.randrange(5)}-USDT"
+            price = rng.uniform(0.5, 150)
+            crossed = self.index.crossed_owners(symbol, price)
+
+            for signal in signals:
+                if signal.symbol == symbol and DatabaseManager._check_signal_outcome(signal, price):
+                    self.assertIn((SIGNAL, signal.id), crossed)
+            for sequence in sequences:
+                if sequence.symbol != symbol:
+                    continue
+                should_close, _ = self.martingale.check_sequence_close(sequence, price)
+                should_add, _ = self.martingale.should_add_martingale(sequence, price)
+                self.assertEqual((SEQUENCE, sequence.id) in crossed, should_close or should_add)
+
+
+if __name__ == '__main__':
+    unittest.main()